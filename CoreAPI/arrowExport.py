@@ -0,0 +1,255 @@
+from decimal import Decimal, InvalidOperation
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only needed for Arrow / Parquet export
+    pa = None
+    pq = None
+
+from tallyRecords import Ledger, StockItem, Voucher
+
+# Rows per record batch; each batch is written as one Parquet row group
+DEFAULT_BATCH_ROWS = 65536
+# Amounts are written as decimal128(AMOUNT_PRECISION, AMOUNT_SCALE)
+AMOUNT_PRECISION = 18
+AMOUNT_SCALE = 2
+_AMOUNT_QUANTUM = Decimal(1).scaleb(-AMOUNT_SCALE)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for arrowExport (pip install pyarrow)")
+
+
+def _amount(value):
+    # Exact decimal at the column's scale; amounts that do not fit are written as null
+    if value is None:
+        return None
+    try:
+        return value.quantize(_AMOUNT_QUANTUM)
+    except InvalidOperation:
+        return None
+
+
+def _ledger_row(elem):
+    record = Ledger.from_element(elem)
+    return (record.name, record.parent, record.master_id, record.alter_id, record.guid,
+            _amount(record.opening_balance), _amount(record.closing_balance))
+
+
+def _stock_item_row(elem):
+    record = StockItem.from_element(elem)
+    return (record.name, record.parent, record.base_units, record.master_id, record.alter_id, record.guid,
+            record.opening_balance, record.closing_balance, _amount(record.closing_value))
+
+
+def _voucher_row(elem):
+    record = Voucher.from_element(elem)
+    entries = [
+        {"ledger_name": entry.ledger_name, "amount": _amount(entry.amount),
+         "is_deemed_positive": entry.is_deemed_positive}
+        for entry in record.ledger_entries
+    ]
+    return (record.master_id, record.alter_id, record.guid, record.voucher_type, record.voucher_number,
+            record.date, record.party_ledger_name, record.narration, record.is_cancelled,
+            _amount(record.amount), entries)
+
+
+def _schemas():
+    amount = pa.decimal128(AMOUNT_PRECISION, AMOUNT_SCALE)
+    return {
+        "ledgers": pa.schema([
+            ("name", pa.string()),
+            ("parent", pa.string()),
+            ("master_id", pa.int64()),
+            ("alter_id", pa.int64()),
+            ("guid", pa.string()),
+            ("opening_balance", amount),
+            ("closing_balance", amount),
+        ]),
+        "stock_items": pa.schema([
+            ("name", pa.string()),
+            ("parent", pa.string()),
+            ("base_units", pa.string()),
+            ("master_id", pa.int64()),
+            ("alter_id", pa.int64()),
+            ("guid", pa.string()),
+            ("opening_balance", pa.string()),  # quantities keep their unit, e.g. "10 Nos"
+            ("closing_balance", pa.string()),
+            ("closing_value", amount),
+        ]),
+        "vouchers": pa.schema([
+            ("master_id", pa.int64()),
+            ("alter_id", pa.int64()),
+            ("guid", pa.string()),
+            ("voucher_type", pa.string()),
+            ("voucher_number", pa.string()),
+            ("date", pa.date32()),
+            ("party_ledger_name", pa.string()),
+            ("narration", pa.string()),
+            ("is_cancelled", pa.bool_()),
+            ("amount", amount),
+            ("ledger_entries", pa.list_(pa.struct([
+                ("ledger_name", pa.string()),
+                ("amount", amount),
+                ("is_deemed_positive", pa.bool_()),
+            ]))),
+        ]),
+    }
+
+
+_ROW_BUILDERS = {
+    "ledgers": _ledger_row,
+    "stock_items": _stock_item_row,
+    "vouchers": _voucher_row,
+}
+
+
+def schema_for(kind):
+    """
+    Arrow schema written for a collection
+
+    Args:
+        kind (str): "ledgers", "stock_items" or "vouchers"
+
+    Returns:
+        pyarrow.Schema: Schema of the record batches
+    """
+    _require_pyarrow()
+    if kind not in _ROW_BUILDERS:
+        raise ValueError(f"Unknown collection kind: {kind}")
+    return _schemas()[kind]
+
+
+def iter_record_batches(elements, kind, batch_size=DEFAULT_BATCH_ROWS):
+    """
+    Convert a stream of collection elements to Arrow record batches of at most batch_size rows
+
+    Only one batch of rows is held at a time, so memory stays bounded however long the export is.
+
+    Args:
+        elements (iterable): LEDGER, STOCKITEM or VOUCHER elements, e.g. client.iter_ledgers_list()
+        kind (str): "ledgers", "stock_items" or "vouchers"
+        batch_size (int, optional): Maximum rows per batch. Default: 65536
+
+    Yields:
+        pyarrow.RecordBatch: Batches matching schema_for(kind)
+    """
+    schema = schema_for(kind)
+    build_row = _ROW_BUILDERS[kind]
+    rows = []
+    for elem in elements:
+        rows.append(build_row(elem))
+        if len(rows) >= batch_size:
+            yield _to_batch(rows, schema)
+            rows = []
+    if rows:
+        yield _to_batch(rows, schema)
+
+
+def _to_batch(rows, schema):
+    columns = zip(*rows)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
+
+
+def write_batches(batches, path, schema, file_format="parquet", compression="zstd"):
+    """
+    Write record batches to a Parquet file (one row group per batch) or an Arrow IPC file
+
+    Args:
+        batches (iterable): pyarrow.RecordBatch objects
+        path (str): Output file path
+        schema (pyarrow.Schema): Schema of the batches
+        file_format (str, optional): "parquet" or "arrow" (IPC file, memory-mappable for zero-copy reads).
+                                     Default: "parquet"
+        compression (str, optional): Compression codec, or None. Default: "zstd"
+
+    Returns:
+        int: Number of rows written
+    """
+    _require_pyarrow()
+    rows = 0
+    if file_format == "parquet":
+        with pq.ParquetWriter(path, schema, compression=compression or "none") as writer:
+            for batch in batches:
+                writer.write_batch(batch, row_group_size=batch.num_rows)
+                rows += batch.num_rows
+    elif file_format == "arrow":
+        options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+    return rows
+
+
+def export_elements(elements, path, kind, batch_size=DEFAULT_BATCH_ROWS, file_format="parquet",
+                    compression="zstd"):
+    """
+    Stream collection elements straight into a Parquet or Arrow file
+
+    Args:
+        elements (iterable): LEDGER, STOCKITEM or VOUCHER elements
+        path (str): Output file path
+        kind (str): "ledgers", "stock_items" or "vouchers"
+        batch_size (int, optional): Rows per record batch / row group. Default: 65536
+        file_format (str, optional): "parquet" or "arrow". Default: "parquet"
+        compression (str, optional): Compression codec, or None. Default: "zstd"
+
+    Returns:
+        int: Number of rows written
+    """
+    return write_batches(iter_record_batches(elements, kind, batch_size), path, schema_for(kind),
+                         file_format=file_format, compression=compression)
+
+
+def export_ledgers(client, path, company_name=None, **options):
+    """
+    Export the ledgers list from Tally to a Parquet or Arrow file while it streams in
+
+    Args:
+        client (TallyClient): Connected client
+        path (str): Output file path
+        company_name (str, optional): Company name
+        **options: batch_size, file_format and compression, as for export_elements
+
+    Returns:
+        int: Number of ledgers written
+    """
+    return export_elements(client.iter_ledgers_list(company_name), path, "ledgers", **options)
+
+
+def export_stock_items(client, path, **options):
+    """
+    Export the stock items list from Tally to a Parquet or Arrow file while it streams in
+
+    Args:
+        client (TallyClient): Connected client
+        path (str): Output file path
+        **options: batch_size, file_format and compression, as for export_elements
+
+    Returns:
+        int: Number of stock items written
+    """
+    # The list's default projection is MasterID and GUID only; "summary" is what StockItem reads
+    return export_elements(client.iter_stock_items_list(fields="summary"), path, "stock_items", **options)
+
+
+def export_vouchers(elements, path, **options):
+    """
+    Export streamed vouchers to a Parquet or Arrow file, one row per voucher with its
+    ledger entries as a nested list
+
+    Args:
+        elements (iterable): VOUCHER elements, e.g. client.iter_ledger_vouchers(from_date, to_date, "Sales")
+        path (str): Output file path
+        **options: batch_size, file_format and compression, as for export_elements
+
+    Returns:
+        int: Number of vouchers written
+    """
+    return export_elements(elements, path, "vouchers", **options)
@@ -0,0 +1,436 @@
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+from xmlFunctions import TallyClient, _CapturedRequest, _build_request
+from xmlStream import decode_body
+from importResult import import_result_or_error
+
+# TallyClient methods that only build an envelope and pass it to _send_request.
+# AsyncTallyClient gets an awaitable version of each, generated below, that reuses
+# the sync envelope-building code.
+_MIRRORED_METHODS = (
+    "get_current_company",
+    "get_sales_report",
+    "get_companies_list",
+    "get_ledgers_list",
+    "get_stock_items_list",
+    "get_vouchers_by_type",
+    "get_groups_list",
+    "get_sales_report_voucher_register",
+    "get_bill_receivables",
+    "get_ledger_vouchers",
+    "get_group_vouchers",
+    "get_stock_vouchers_summary",
+    "get_stock_ageing",
+    "get_list_of_accounts",
+    "get_ledger_by_name",
+    "get_voucher_by_master_id",
+    "get_voucher_by_number_and_date",
+    "get_stock_item_by_master_id",
+    "get_license_info",
+    "create_ledger",
+    "create_receipt_voucher",
+    "create_stock_item",
+    "create_unit",
+    "create_company",
+    "configure_company",
+    "enable_gst",
+    "delete_ledger",
+    "delete_stock_item",
+    "update_unit",
+    "delete_unit",
+    "create_journal_voucher",
+    "update_voucher",
+    "cancel_voucher",
+    "create_group",
+    "update_group",
+    "delete_group",
+)
+
+
+class AsyncHTTPError(Exception):
+    """
+    Raised when Tally's HTTP response cannot be read
+    """
+
+
+class _AsyncConnectionPool:
+    """
+    Bounded pool of keep-alive asyncio connections to one Tally endpoint
+    """
+
+    def __init__(self, host, port, use_ssl=False, max_connections=4):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self._idle = []
+        self._in_use = set()
+        self._slots = asyncio.Semaphore(max_connections)
+        self._drained = asyncio.Event()  # set while no connection is checked out
+        self._drained.set()
+        self._closed = False
+
+    async def acquire(self, connect_timeout=None):
+        """
+        Wait for a free slot and return an open (reader, writer) pair
+
+        Args:
+            connect_timeout (float, optional): Seconds to wait for a new TCP connection
+
+        Returns:
+            tuple: (asyncio.StreamReader, asyncio.StreamWriter)
+        """
+        await self._slots.acquire()
+        try:
+            connection = None
+            while self._idle:
+                reader, writer = self._idle.pop()
+                if not reader.at_eof() and not writer.is_closing():
+                    connection = reader, writer
+                    break
+                writer.close()
+            if connection is None:
+                connection = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, ssl=self.use_ssl or None),
+                    connect_timeout,
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        self._in_use.add(connection)
+        self._drained.clear()
+        return connection
+
+    def release(self, connection, reusable):
+        """
+        Return a connection to the pool, or close it if its state is unknown
+
+        Args:
+            connection (tuple): (reader, writer) from acquire()
+            reusable (bool): False if the response was not fully read (timeout, cancellation, error)
+        """
+        reader, writer = connection
+        self._in_use.discard(connection)
+        if reusable and not self._closed and not reader.at_eof():
+            self._idle.append(connection)
+        else:
+            writer.close()
+        if not self._in_use:
+            self._drained.set()
+        self._slots.release()
+
+    async def close(self):
+        """
+        Close all idle connections, then wait for the requests in flight to finish and
+        close their connections as they are released
+        """
+        self._closed = True
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+        await self._drained.wait()
+
+
+class AsyncTallyClient:
+    DEFAULT_METHOD_TIMEOUTS = TallyClient.DEFAULT_METHOD_TIMEOUTS
+
+    def __init__(self, tally_url="http://localhost", tally_port=9000, max_concurrency=4,
+                 connect_timeout=10, read_timeout=None, method_timeouts=None, raw_bytes=False):
+        """
+        Initialize AsyncTallyClient with server URL and port
+
+        The TallyClient methods that send one request and return its response (the get_*
+        exports and lookups, the single-object create_/update_/delete_ imports; see
+        _MIRRORED_METHODS), plus test_connection, get_payslip, list_tally_companies and
+        select_tally_company, are available as coroutines with the same arguments and return
+        value, e.g. ``await client.get_ledgers_list("ABC Company")``. Streaming (iter_*), batch
+        import, sync, query and multi-get methods are only on TallyClient.
+
+        Args:
+            tally_url (str): Tally server URL
+            tally_port (int): Tally server port
+            max_concurrency (int, optional): Maximum requests in flight (and connections kept open). Default: 4
+            connect_timeout (float, optional): Seconds to wait for the TCP connection. Default: 10
+            read_timeout (float, optional): Seconds to wait for Tally's response. Default: None (no limit)
+            method_timeouts (dict, optional): Per-method overrides, e.g. {"get_ledgers_list": (5, 60)}
+            raw_bytes (bool, optional): Return response bodies as undecoded bytes instead of str.
+                                        "Error: ..." results are still str. Default: False
+        """
+        self.tally_url = tally_url
+        self.tally_port = tally_port
+        self.endpoint = f"{tally_url}:{tally_port}"
+        self.raw_bytes = raw_bytes
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.method_timeouts = dict(self.DEFAULT_METHOD_TIMEOUTS)
+        if method_timeouts:
+            self.method_timeouts.update(method_timeouts)
+
+        parts = urlsplit(tally_url)
+        self._host = parts.hostname or "localhost"
+        self._use_ssl = parts.scheme == "https"
+        self._max_concurrency = max_concurrency
+        self._pool = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the pooled connections held by this client
+
+        Requests still in flight are awaited (up to their read timeout) and their connections
+        closed once they finish; requests started after close() open a new pool.
+        """
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+    _timeout_for = TallyClient._timeout_for
+
+    def _get_pool(self):
+        # Created lazily so the pool's semaphore belongs to the running event loop
+        if self._pool is None:
+            self._pool = _AsyncConnectionPool(self._host, self.tally_port, self._use_ssl, self._max_concurrency)
+        return self._pool
+
+    async def _post(self, xml_request, method=None, headers=None):
+        """
+        POST a request body to Tally over a pooled connection
+
+        Args:
+            xml_request (str or bytes): XML request
+            method (str, optional): Name of the calling method, used for timeout overrides
+            headers (dict, optional): Extra HTTP headers
+
+        Returns:
+            tuple: (status_code, headers dict with lower-case keys, body bytes)
+        """
+        if isinstance(xml_request, str):
+            xml_request = xml_request.encode('utf-8')
+        connect_timeout, read_timeout = self._timeout_for(method)
+
+        head = [
+            "POST / HTTP/1.1",
+            f"Host: {self._host}:{self.tally_port}",
+            f"Content-Length: {len(xml_request)}",
+            "Connection: keep-alive",
+        ]
+        for name, value in (headers or {}).items():
+            head.append(f"{name}: {value}")
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + xml_request
+
+        pool = self._get_pool()
+        connection = await pool.acquire(connect_timeout)
+        reusable = False
+        try:
+            reader, writer = connection
+            writer.write(payload)
+            # The read timeout covers the whole round trip. On timeout or cancellation the
+            # connection is closed instead of being returned half-read to the pool.
+            status, response_headers, body = await asyncio.wait_for(
+                self._exchange(reader, writer), read_timeout
+            )
+            reusable = response_headers.get("connection", "").lower() != "close"
+            return status, response_headers, body
+        finally:
+            pool.release(connection, reusable)
+
+    @staticmethod
+    async def _exchange(reader, writer):
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise AsyncHTTPError("Connection closed by Tally before a response was received")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise AsyncHTTPError(f"Malformed status line: {status_line[:100]!r}")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Trailer section ends with an empty line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+        return status, headers, body
+
+    @staticmethod
+    def _decode(headers, body):
+        return decode_body(body, headers.get("content-type"))
+
+    async def _send_request(self, xml_request, method=None):
+        """
+        Send XML request to Tally server
+
+        Args:
+            xml_request (str or bytes): XML request
+            method (str, optional): Name of the calling method, used for timeout overrides
+
+        Returns:
+            str: XML response from Tally (bytes when the client was created with raw_bytes=True)
+        """
+        try:
+            status, headers, body = await self._post(xml_request, method=method)
+            if status == 200:
+                if self.raw_bytes:
+                    return body
+                return self._decode(headers, body)
+            else:
+                return f"Error: HTTP {status}"
+        except asyncio.TimeoutError:
+            return "Error: Request to Tally timed out"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    async def test_connection(self):
+        """
+        Test connection to Tally server
+
+        Returns:
+            bool: True if connection successful, False otherwise
+        """
+        try:
+            status, _, _ = await self._post("", method="test_connection")
+            return status == 200
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+
+    async def get_payslip(self, from_date, to_date, employee_name):
+        """
+        Get employee payslip
+
+        Args:
+            from_date (str): From date (format: YYYYMMDD)
+            to_date (str): To date (format: YYYYMMDD)
+            employee_name (str): Employee name
+
+        Returns:
+            bytes: PDF data of payslip
+        """
+        xml_request = TallyClient._payslip_request(from_date, to_date, employee_name)
+        try:
+            status, headers, body = await self._post(xml_request, method="get_payslip")
+            if status == 200:
+                return body
+            else:
+                logging.error(f"Error fetching payslip: HTTP {status} - {self._decode(headers, body)[:200]}...")
+                return f"Error: HTTP {status}"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.exception("Error occurred during get_payslip request.")
+            return f"Error: {str(e)}"
+
+    async def list_tally_companies(self):
+        """
+        Retrieves a list of all companies loaded in Tally.
+
+        Returns:
+            list: A list of company names, or an empty list if unable to connect/find.
+            None: Returns None if a significant error occurs.
+        """
+        logging.info("Attempting to list all companies via Collection export...")
+        headers = {'Content-Type': 'application/xml'}
+        try:
+            status, response_headers, body = await self._post(
+                TallyClient._list_companies_request(), method="list_tally_companies", headers=headers
+            )
+            return TallyClient._parse_company_list(body, response_headers.get("content-type"))
+        except asyncio.TimeoutError:
+            logging.error(f"Request timed out connecting to Tally on {self.endpoint}.")
+            return None
+        except ConnectionError:
+            logging.error(f"Connection refused. Is Tally running/configured on {self.endpoint}?")
+            return None
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Unexpected error occurred while listing companies.")
+            return None
+
+    async def select_tally_company(self, company_name):
+        """
+        Selects a specific company in Tally.
+
+        Args:
+            company_name (str): The exact name of the company to select.
+
+        Returns:
+            bool: True if the company was selected successfully (or assumed based on response), False otherwise.
+        """
+        logging.info(f"Attempting to select company: '{company_name}'")
+        headers = {'Content-Type': 'application/xml'}
+        try:
+            status, response_headers, body = await self._post(
+                TallyClient._select_company_request(company_name), method="select_tally_company", headers=headers
+            )
+            return TallyClient._parse_select_company_response(company_name, self._decode(response_headers, body))
+        except asyncio.TimeoutError:
+            logging.error(f"Request timed out selecting '{company_name}' on {self.endpoint}.")
+            return False
+        except ConnectionError:
+            logging.error(f"Connection refused selecting '{company_name}'. Is Tally running/configured on {self.endpoint}?")
+            return False
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception(f"Unexpected error occurred while selecting company '{company_name}'.")
+            return False
+
+    def parse_xml_response(self, xml_response):
+        """
+        Parse XML response from Tally (see TallyClient.parse_xml_response)
+        """
+        return TallyClient.parse_xml_response(self, xml_response)
+
+
+def _mirror(method_name):
+    sync_method = getattr(TallyClient, method_name)
+
+    async def method(self, *args, **kwargs):
+        request = _build_request(method_name, *args, **kwargs)
+        if not isinstance(request, _CapturedRequest):
+            # The sync method returned early (e.g. "Error: No update parameters specified")
+            return request
+        response = await self._send_request(request.xml_request, method=request.method)
+        if request.is_import:
+            return import_result_or_error(response)
+        return response
+
+    method.__name__ = method_name
+    method.__qualname__ = f"AsyncTallyClient.{method_name}"
+    method.__doc__ = sync_method.__doc__
+    return method
+
+
+for _method_name in _MIRRORED_METHODS:
+    setattr(AsyncTallyClient, _method_name, _mirror(_method_name))
@@ -0,0 +1,220 @@
+import logging
+import re
+
+from importResult import ImportResult
+
+# Masters per Import Data request, and the request size at which a batch is closed early
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_BATCH_BYTES = 2 * 1024 * 1024
+
+# Item statuses besides the action's own ("created", "altered", "deleted", ...)
+ERROR = "error"
+UNKNOWN = "unknown"  # Tally did not say what happened to this item (unattributed errors, lost response)
+SKIPPED = "skipped"  # Not sent, e.g. after the import was stopped
+_NOT_OK = (ERROR, UNKNOWN, SKIPPED)
+
+# Names Tally quotes in its line errors, e.g. Ledger 'Cash' already exists
+_QUOTED_NAME = re.compile(r"""['"\u2018\u201c]([^'"\u2018\u2019\u201c\u201d]+)['"\u2019\u201d]""")
+
+
+class ImportOutcome:
+    """
+    Result of importing one item of a bulk request
+    """
+    __slots__ = ("index", "name", "status", "error", "master_id")
+
+    def __init__(self, index, name, status, error=None, master_id=None):
+        self.index = index
+        self.name = name
+        self.status = status
+        self.error = error
+        self.master_id = master_id
+
+    @property
+    def ok(self):
+        return self.status not in _NOT_OK
+
+    def __repr__(self):
+        error = f", error={self.error!r}" if self.error else ""
+        master_id = f", master_id={self.master_id!r}" if self.master_id is not None else ""
+        return f"ImportOutcome({self.index}, {self.name!r}, {self.status!r}{error}{master_id})"
+
+
+class BulkImportResult:
+    """
+    Outcome of a bulk import: one ImportOutcome per input item (in input order) and the
+    parsed response of every batch sent
+    """
+
+    def __init__(self):
+        self.items = []
+        self.batches = []
+
+    @property
+    def ok(self):
+        """
+        True if every item was imported
+        """
+        return all(item.ok for item in self.items)
+
+    @property
+    def succeeded(self):
+        return [item for item in self.items if item.ok]
+
+    @property
+    def failed(self):
+        return [item for item in self.items if item.status == ERROR]
+
+    @property
+    def unknown(self):
+        return [item for item in self.items if item.status == UNKNOWN]
+
+    @property
+    def skipped(self):
+        return [item for item in self.items if item.status == SKIPPED]
+
+    def counts(self):
+        """
+        Number of items per status
+
+        Returns:
+            dict: {status: count}
+        """
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return counts
+
+    def __repr__(self):
+        return f"BulkImportResult(items={len(self.items)}, batches={len(self.batches)}, counts={self.counts()})"
+
+
+def iter_batches(items, batch_size=DEFAULT_BATCH_SIZE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+    """
+    Group (name, xml) items into batches of at most batch_size items and about max_batch_bytes
+
+    Args:
+        items (iterable): (name, bytes) pairs, consumed lazily
+        batch_size (int, optional): Maximum items per batch. Default: 500
+        max_batch_bytes (int, optional): A batch is closed before it grows past this size;
+                                         a single larger item still gets a batch of its own.
+                                         Default: 2 MB
+
+    Yields:
+        list: [(index, name, xml), ...] with index counting from 0 across all batches
+    """
+    batch = []
+    size = 0
+    for index, (name, xml) in enumerate(items):
+        if batch and (len(batch) >= batch_size or size + len(xml) > max_batch_bytes):
+            yield batch
+            batch = []
+            size = 0
+        batch.append((index, name, xml))
+        size += len(xml)
+    if batch:
+        yield batch
+
+
+def _mentioned_item(message, batch, errors):
+    # Position of the batch item a line error is about, or None. Quoted names beat
+    # whole-word matches, longer names beat shorter ones, and among items of the same
+    # name one that has no error yet goes first.
+    quoted = {name.strip().casefold() for name in _QUOTED_NAME.findall(message)}
+    folded = message.casefold()
+    best, best_rank = None, None
+    for position, (_, name, _) in enumerate(batch):
+        key = (name or "").strip().casefold()
+        if not key:
+            continue
+        if key in quoted:
+            rank = (2, len(key), position not in errors)
+        elif re.search(r"(?<!\w)" + re.escape(key) + r"(?!\w)", folded):
+            rank = (1, len(key), position not in errors)
+        else:
+            continue
+        if best_rank is None or rank > best_rank:
+            best, best_rank = position, rank
+    return best
+
+
+def attribute_outcomes(batch, result, status):
+    """
+    Map a batch's ImportResult back to its items
+
+    Tally reports counts for the whole request and one LINEERROR per failed object, so each
+    line error is matched to the item whose name it mentions: a name Tally quotes in the
+    message first, otherwise a whole-word occurrence (the longest name wins, so an error
+    about "Petty Cash" is not charged to "Cash"). The remaining items succeeded if Tally's counts cover them, failed if
+    Tally imported nothing, and are otherwise reported as unknown.
+
+    Args:
+        batch (list): [(index, name, xml), ...] as yielded by iter_batches
+        result (ImportResult): Parsed response to the batch
+        status (str or list): Status of a successful item, e.g. "created", or one status per batch item
+
+    Returns:
+        list: ImportOutcome per item, in batch order
+    """
+    statuses = [status] * len(batch) if isinstance(status, str) else status
+    errors = {}
+    unmatched = []
+    for message in result.line_errors:
+        position = _mentioned_item(message, batch, errors)
+        if position is None:
+            unmatched.append(message)
+        elif position in errors:
+            errors[position] += "; " + message
+        else:
+            errors[position] = message
+
+    remaining = len(batch) - len(errors)
+    if result.succeeded >= remaining:
+        rest_status, rest_error = None, None
+    elif result.succeeded == 0:
+        rest_status, rest_error = ERROR, "; ".join(unmatched) or "Not imported"
+    else:
+        rest_status, rest_error = UNKNOWN, "; ".join(unmatched) or None
+
+    outcomes = []
+    for position, (index, name, _) in enumerate(batch):
+        if position in errors:
+            outcomes.append(ImportOutcome(index, name, ERROR, errors[position]))
+        else:
+            outcomes.append(ImportOutcome(index, name, rest_status or statuses[position], rest_error))
+    return outcomes
+
+
+def import_masters(client, masters, status, company_name=None, batch_size=DEFAULT_BATCH_SIZE,
+                   max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, method=None):
+    """
+    Send masters to Tally in multi-object Import Data requests
+
+    Args:
+        client (TallyClient): Client to send with
+        masters (iterable): (name, bytes) pairs: the master's name and its XML object
+                            (LEDGER, GROUP, ...), consumed lazily
+        status (str): Status of a successful item, e.g. "created" or "deleted"
+        company_name (str, optional): Target company. Default: None (current company)
+        batch_size (int, optional): Maximum masters per request. Default: 500
+        max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+        method (str, optional): Name of the calling method, used for timeout and lane lookup
+
+    Returns:
+        BulkImportResult: Outcome of every master and the parsed response of every batch
+    """
+    bulk = BulkImportResult()
+    for batch in iter_batches(masters, batch_size, max_batch_bytes):
+        request = client._import_request([xml for _, _, xml in batch], company_name)
+        response = client._send_request(request, method=method)
+        try:
+            result = ImportResult.from_response(response)
+        except ValueError as e:
+            # Transport errors and unreadable responses: Tally may or may not have applied the batch
+            logging.error(f"Bulk import batch of {len(batch)} failed: {e}")
+            result = ImportResult(errors=len(batch), line_errors=[str(e)])
+            bulk.items.extend(ImportOutcome(index, name, UNKNOWN, str(e)) for index, name, _ in batch)
+        else:
+            bulk.items.extend(attribute_outcomes(batch, result, status))
+        bulk.batches.append(result)
+    return bulk
@@ -0,0 +1,185 @@
+import logging
+import time
+from datetime import date as date_type, datetime, timedelta
+
+from requests.exceptions import RequestException
+
+# Window of the first shard, and the range the adaptive window stays in
+DEFAULT_WINDOW_DAYS = 31
+MIN_WINDOW_DAYS = 1
+MAX_WINDOW_DAYS = 366
+# Adaptive windows aim for shards Tally answers in about this many seconds, with about this many objects
+DEFAULT_TARGET_SECONDS = 10.0
+DEFAULT_TARGET_ITEMS = 5000
+
+# Date formats accepted by the sharded methods; shard dates are sent in the caller's format
+_DATE_FORMATS = ("%Y%m%d", "%d-%b-%Y", "%Y-%m-%d", "%d-%b-%y")
+
+
+def parse_range_date(value):
+    """
+    Parse a report date and remember how it was written
+
+    Args:
+        value (str or datetime.date): "20240401", "01-Apr-2024", "2024-04-01", "1-Apr-24" or a date
+
+    Returns:
+        tuple: (datetime.date, strftime format to write shard dates with)
+
+    Raises:
+        ValueError: If the date is not in a recognised format
+    """
+    if isinstance(value, date_type):
+        return value, "%Y%m%d"
+    text = (value or "").strip()
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date(), date_format
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+class AdaptiveWindow:
+    """
+    Shard length in days that follows Tally's response time and volume.
+
+    After each shard the window moves toward the number of days Tally can export in
+    target_seconds with about target_items objects (growing at most 2x per shard); a shard
+    that fails halves it.
+    """
+    __slots__ = ("days", "minimum", "maximum", "target_seconds", "target_items")
+
+    def __init__(self, initial=DEFAULT_WINDOW_DAYS, minimum=MIN_WINDOW_DAYS, maximum=MAX_WINDOW_DAYS,
+                 target_seconds=DEFAULT_TARGET_SECONDS, target_items=DEFAULT_TARGET_ITEMS):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.target_seconds = target_seconds
+        self.target_items = target_items
+        self.days = min(max(initial, minimum), self.maximum)
+
+    def record(self, days, items, seconds, failed=False):
+        """
+        Adjust the window after a shard
+
+        Args:
+            days (int): Days the shard covered
+            items (int): Objects Tally returned
+            seconds (float): Time spent waiting for Tally
+            failed (bool, optional): True if the shard got no usable response. Default: False
+        """
+        if failed:
+            new_days = days // 2
+        else:
+            factor = 2.0
+            if seconds > 0:
+                factor = min(factor, self.target_seconds / seconds)
+            if items > 0:
+                factor = min(factor, self.target_items / items)
+            new_days = int(days * factor)
+        self.days = min(max(new_days, self.minimum), self.maximum)
+
+    def __repr__(self):
+        return f"AdaptiveWindow(days={self.days})"
+
+
+class ShardProgress:
+    """
+    Where a sharded export got to, so an interrupted export can resume after its last finished shard
+    """
+    __slots__ = ("next_date", "window_days", "shards", "items", "done")
+
+    def __init__(self, next_date=None, window_days=None, shards=0, items=0, done=False):
+        self.next_date = next_date      # first day not exported yet (datetime.date)
+        self.window_days = window_days  # window to continue with
+        self.shards = shards            # shards finished
+        self.items = items              # objects yielded by finished shards
+        self.done = done                # True once the whole range was exported
+
+    def to_dict(self):
+        return {"next_date": self.next_date.isoformat() if self.next_date else None,
+                "window_days": self.window_days, "shards": self.shards, "items": self.items, "done": self.done}
+
+    @classmethod
+    def from_dict(cls, data):
+        next_date = data.get("next_date")
+        return cls(date_type.fromisoformat(next_date) if next_date else None, data.get("window_days"),
+                   data.get("shards", 0), data.get("items", 0), data.get("done", False))
+
+    def __repr__(self):
+        return (f"ShardProgress(next_date={self.next_date}, window_days={self.window_days}, "
+                f"shards={self.shards}, items={self.items}, done={self.done})")
+
+
+def iter_date_shards(fetch, from_date, to_date, window_days=DEFAULT_WINDOW_DAYS, adaptive=True, progress=None,
+                     target_seconds=DEFAULT_TARGET_SECONDS, target_items=DEFAULT_TARGET_ITEMS):
+    """
+    Export a date range as consecutive windows and stream the results as one sequence
+
+    Shards are fetched one after another, each only once the previous one has been read. With
+    adaptive, the window follows the time spent waiting for Tally and the number of objects of
+    the previous shard, and a shard whose request fails before returning anything is retried
+    with half the window. The progress object is updated after every finished shard; passing
+    it again resumes after the last finished shard (objects of the shard that was being read
+    are exported again).
+
+    Args:
+        fetch (callable): fetch(from_date, to_date) -> iterator of objects for one window,
+                          with dates in the caller's format
+        from_date (str or datetime.date): First day of the range
+        to_date (str or datetime.date): Last day of the range
+        window_days (int, optional): Days per shard (the starting window when adaptive). Default: 31
+        adaptive (bool, optional): Resize windows from Tally's response times and volumes. Default: True
+        progress (ShardProgress, optional): Progress to resume from and update. Default: None
+        target_seconds (float, optional): Response time adaptive windows aim for. Default: 10
+        target_items (int, optional): Objects per shard adaptive windows aim for. Default: 5000
+
+    Yields:
+        Objects yielded by fetch, in date order of the windows
+
+    Raises:
+        ValueError: If a date is not in a recognised format
+        requests.exceptions.RequestException: If a shard fails and cannot be split further
+    """
+    start, date_format = parse_range_date(from_date)
+    end, _ = parse_range_date(to_date)
+    if progress is None:
+        progress = ShardProgress()
+    if progress.next_date is not None and progress.next_date > start:
+        start = progress.next_date
+    window = AdaptiveWindow(progress.window_days or window_days, target_seconds=target_seconds,
+                            target_items=target_items)
+
+    while start <= end:
+        days = window.days if adaptive else window_days
+        shard_end = min(start + timedelta(days=days - 1), end)
+        items = 0
+        seconds = 0.0
+        try:
+            elements = iter(fetch(start.strftime(date_format), shard_end.strftime(date_format)))
+            while True:
+                started = time.monotonic()
+                try:
+                    elem = next(elements)
+                except StopIteration:
+                    break
+                finally:
+                    seconds += time.monotonic() - started
+                items += 1
+                yield elem
+        except RequestException as e:
+            if items or not adaptive or days <= window.minimum:
+                raise
+            logging.warning(f"Shard {start} to {shard_end} failed ({e}); retrying with a smaller window")
+            window.record(days, 0, seconds, failed=True)
+            progress.window_days = window.days
+            continue
+
+        if adaptive:
+            window.record((shard_end - start).days + 1, items, seconds)
+        start = shard_end + timedelta(days=1)
+        progress.next_date = start
+        progress.window_days = window.days if adaptive else window_days
+        progress.shards += 1
+        progress.items += items
+    progress.done = True
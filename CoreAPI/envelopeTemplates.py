@@ -0,0 +1,180 @@
+import keyword
+import re
+from string import Formatter
+
+from xmlStream import _INVALID_CONTROL_BYTES
+
+# Entity references for XML text and attribute values; control characters XML forbids are dropped
+_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&apos;",
+    **dict.fromkeys(map(chr, _INVALID_CONTROL_BYTES)),
+})
+# Characters that need escaping; most values have none and are only scanned once
+_NEEDS_ESCAPE = re.compile("[&<>\"'%s]" % re.escape(_INVALID_CONTROL_BYTES.decode("ascii")))
+# Indentation and line breaks between tags (and around slots that sit between tags)
+_INTER_TAG_WHITESPACE = re.compile(r"(?<=[>}])\s*\n\s*(?=[<{])")
+
+# Escaped, encoded text values and rendered elements. Names, dates and amounts repeat across
+# requests, so each distinct value is escaped once; the caches are reset when they fill up.
+_MAX_CACHED = 8192
+_encoded = {}
+_elements = {}
+
+_templates = {}
+
+
+def escape_text(value):
+    """
+    Escape a value for use as XML text or an attribute value
+
+    Args:
+        value (str): Value to escape
+
+    Returns:
+        str: Escaped value (&, <, >, quotes replaced by entities; invalid control characters removed)
+    """
+    return value.translate(_ESCAPE_TABLE)
+
+
+def _text_slot(value):
+    if value is None:
+        return b""
+    if value.__class__ is not str:
+        value = str(value)
+    encoded = _encoded.get(value)
+    if encoded is None:
+        encoded = value.translate(_ESCAPE_TABLE) if _NEEDS_ESCAPE.search(value) else value
+        encoded = encoded.encode("utf-8")
+        if len(_encoded) >= _MAX_CACHED:
+            _encoded.clear()
+        _encoded[value] = encoded
+    return encoded
+
+
+def _xml_slot(value):
+    # Trusted XML built by the caller (a rendered template, element() output or a list of them)
+    if value is None:
+        return b""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return b"".join(_xml_slot(part) for part in value)
+
+
+def _bool_slot(value):
+    return b"Yes" if value else b"No"
+
+
+_SLOT_KINDS = {
+    "": _text_slot,
+    "text": _text_slot,
+    "xml": _xml_slot,
+    "bool": _bool_slot,
+}
+
+
+class EnvelopeTemplate:
+    """
+    An XML request compiled once into UTF-8 byte segments and typed slots.
+
+    The source uses str.format syntax: "{name}" is a text slot (escaped), "{name:xml}" inserts
+    trusted XML such as another rendered template, and "{name:bool}" renders Yes/No. Literal
+    braces are written "{{" and "}}". Whitespace between tags is removed at compile time.
+
+    Compiling generates a render(**values) function for the template, so rendering is one call
+    that converts each slot and joins the pre-encoded bytes. Every slot must be passed by
+    keyword (None renders as empty); render returns the UTF-8 request body.
+    """
+
+    def __init__(self, source):
+        """
+        Compile a template
+
+        Args:
+            source (str): XML request with slots
+        """
+        source = _INTER_TAG_WHITESPACE.sub("", source.strip())
+        self.source = source
+        # Names the generated function sees: literal segments _p0, _p1, ... and the slot converters
+        namespace = {"_join": b"".join, "_cached": _encoded.get}
+        namespace.update((f"_{kind or 'text'}", convert) for kind, convert in _SLOT_KINDS.items())
+        pieces = []
+        slot_names = []
+        for literal, name, kind, conversion in Formatter().parse(source):
+            if literal:
+                namespace[f"_p{len(pieces)}"] = literal.encode("utf-8")
+                pieces.append(f"_p{len(pieces)}")
+            if name is None:
+                continue
+            if not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_") or conversion:
+                raise ValueError(f"Invalid envelope slot: {{{name}}}")
+            if kind not in _SLOT_KINDS:
+                raise ValueError(f"Unknown slot kind '{kind}' for {{{name}}}")
+            if kind in ("", "text"):
+                # Inline cache hit (only str values are cached); None and misses go through _text
+                pieces.append(f"(_cached({name}) or _text({name}))")
+            elif kind == "xml":
+                pieces.append(f"({name} if {name}.__class__ is bytes else _xml({name}))")
+            else:
+                pieces.append(f"_{kind}({name})")
+            if name not in slot_names:
+                slot_names.append(name)
+        self.slot_names = tuple(slot_names)
+        if slot_names:
+            code = f"def render(*, {', '.join(slot_names)}):\n    return _join(({', '.join(pieces)},))"
+        else:
+            namespace["_static"] = b"".join(namespace[piece] for piece in pieces)
+            code = "def render():\n    return _static"
+        exec(code, namespace)
+        self.render = namespace["render"]
+
+    def __repr__(self):
+        return f"EnvelopeTemplate(slots={self.slot_names!r})"
+
+
+def envelope(source):
+    """
+    Return the compiled template for a source string, compiling it on first use
+
+    Templates are cached by source, so a method can keep its envelope inline and still
+    pay for compiling it only once.
+
+    Args:
+        source (str): XML request with slots (see EnvelopeTemplate)
+
+    Returns:
+        EnvelopeTemplate: Compiled template
+    """
+    template = _templates.get(source)
+    if template is None:
+        template = _templates[source] = EnvelopeTemplate(source)
+    return template
+
+
+def element(tag, value):
+    """
+    Render <TAG>value</TAG> with the value escaped, or nothing when the value is None
+
+    Args:
+        tag (str): Tag name
+        value (str, int, float or Decimal): Element text
+
+    Returns:
+        bytes: Element, or b"" when value is None
+    """
+    if value is None:
+        return b""
+    key = (tag, value) if value.__class__ is str else None
+    rendered = _elements.get(key)
+    if rendered is None:
+        rendered = b"".join((f"<{tag}>".encode("ascii"), _text_slot(value), f"</{tag}>".encode("ascii")))
+        if key is not None:
+            if len(_elements) >= _MAX_CACHED:
+                _elements.clear()
+            _elements[key] = rendered
+    return rendered
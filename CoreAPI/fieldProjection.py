@@ -0,0 +1,78 @@
+import re
+
+from envelopeTemplates import element
+
+_ID_FIELDS = ("MasterID", "AlterID", "GUID")
+
+# Named projections per object type. "summary" is what the tallyRecords classes read;
+# "full" is every method Tally has (NATIVEMETHOD *).
+FIELD_PRESETS = {
+    "id-only": {
+        "Ledger": ("Name",) + _ID_FIELDS,
+        "Group": ("Name",) + _ID_FIELDS,
+        "StockItem": ("Name",) + _ID_FIELDS,
+        "Voucher": _ID_FIELDS,
+    },
+    "summary": {
+        "Ledger": ("Name", "Parent") + _ID_FIELDS + ("OpeningBalance", "ClosingBalance"),
+        "Group": ("Name", "Parent") + _ID_FIELDS,
+        "StockItem": ("Name", "Parent", "BaseUnits") + _ID_FIELDS +
+                     ("OpeningBalance", "ClosingBalance", "ClosingValue"),
+        "Voucher": _ID_FIELDS + ("VoucherTypeName", "VoucherNumber", "Date", "PartyLedgerName", "Narration",
+                                 "IsCancelled", "AllLedgerEntries"),
+    },
+    "full": {
+        "Ledger": ("*",),
+        "Group": ("*",),
+        "StockItem": ("*",),
+        "Voucher": ("*",),
+    },
+}
+
+# Tally method names, sub-collections ("AllLedgerEntries") and paths into them ("AllLedgerEntries.Amount")
+_FIELD_NAME = re.compile(r"^(\*|[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*)$")
+
+
+def resolve_fields(fields, object_type):
+    """
+    Turn a fields= argument into Tally method names
+
+    Args:
+        fields (str or iterable): A preset name ("id-only", "summary", "full") or method names
+        object_type (str): Tally object type the preset is looked up for, e.g. "Ledger" or "Voucher"
+
+    Returns:
+        tuple: Method names, without duplicates, in the given order
+
+    Raises:
+        ValueError: If the preset is unknown for the object type, or a name is not a Tally method name
+    """
+    if isinstance(fields, str):
+        preset = FIELD_PRESETS.get(fields)
+        if preset is None or object_type not in preset:
+            raise ValueError(f"Unknown field preset for {object_type}: {fields}")
+        return preset[object_type]
+    names = tuple(dict.fromkeys(fields))
+    if not names:
+        raise ValueError("fields must name at least one method")
+    for name in names:
+        if not isinstance(name, str) or not _FIELD_NAME.match(name):
+            raise ValueError(f"Invalid field name: {name!r}")
+    return names
+
+
+def native_methods(fields, object_type, default=None):
+    """
+    Build the NATIVEMETHOD lines of a collection for a fields= argument
+
+    Args:
+        fields (str or iterable): Preset name or method names; None keeps the method's default
+        object_type (str): Tally object type of the collection
+        default (bytes, optional): Lines to use when fields is None
+
+    Returns:
+        bytes: <NATIVEMETHOD> elements
+    """
+    if fields is None:
+        return default or b""
+    return b"".join(element("NATIVEMETHOD", name) for name in resolve_fields(fields, object_type))
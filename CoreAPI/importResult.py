@@ -0,0 +1,206 @@
+import re
+import xml.etree.ElementTree as ET
+from html import unescape
+
+from xmlStream import detect_encoding, _ASCII_NATIVE
+
+# Count fields of an import response, in the order Tally writes them
+_COUNT_TAGS = (
+    ("CREATED", "created"),
+    ("ALTERED", "altered"),
+    ("DELETED", "deleted"),
+    ("LASTVCHID", "last_voucher_id"),
+    ("LASTMID", "last_master_id"),
+    ("COMBINED", "combined"),
+    ("IGNORED", "ignored"),
+    ("ERRORS", "errors"),
+    ("CANCELLED", "cancelled"),
+    ("EXCEPTIONS", "exceptions"),
+)
+_FIELDS_BY_TAG = dict(_COUNT_TAGS)
+_FIELDS_BY_TAG.update((tag.encode("ascii"), field) for tag, field in _COUNT_TAGS)
+_FIELDS = ("created", "altered", "deleted", "combined", "ignored", "errors", "cancelled", "exceptions",
+           "last_voucher_id", "last_master_id", "line_errors")
+
+# Import responses are small and flat, so they are scanned with regular expressions instead of
+# being parsed into a tree; both patterns exist for str and for UTF-8 / ASCII bytes.
+_COUNT_SOURCE = r"<(%s)>\s*(-?\d+)\s*</" % "|".join(tag for tag, _ in _COUNT_TAGS)
+_LINE_ERROR_SOURCE = r"<LINEERROR>(.*?)</LINEERROR>"
+_TAG_SOURCE = r"<[^>]*>"
+_PATTERNS = {
+    str: (re.compile(_COUNT_SOURCE), re.compile(_LINE_ERROR_SOURCE, re.S), re.compile(_TAG_SOURCE),
+          "<LINEERROR>"),
+    bytes: (re.compile(_COUNT_SOURCE.encode("ascii")), re.compile(_LINE_ERROR_SOURCE.encode("ascii"), re.S),
+            re.compile(_TAG_SOURCE.encode("ascii")), b"<LINEERROR>"),
+}
+# Line error of a response with no text at all: no counts means nothing confirms the import
+_EMPTY_RESPONSE = "Empty response from Tally"
+
+
+def _clean(message, binary):
+    if binary:
+        message = message.decode("utf-8", errors="replace")
+    if "&" in message:
+        message = unescape(message)
+    return " ".join(message.split())
+
+
+class ImportResult:
+    """
+    Tally's response to an Import Data request: object counts, line errors and the
+    IDs of the last voucher / master it created
+    """
+    __slots__ = _FIELDS + ("response",)
+
+    def __init__(self, created=0, altered=0, deleted=0, combined=0, ignored=0, errors=0, cancelled=0,
+                 exceptions=0, last_voucher_id=0, last_master_id=0, line_errors=(), response=None):
+        self.created = created
+        self.altered = altered
+        self.deleted = deleted
+        self.combined = combined
+        self.ignored = ignored
+        self.errors = errors
+        self.cancelled = cancelled
+        self.exceptions = exceptions
+        self.last_voucher_id = last_voucher_id
+        self.last_master_id = last_master_id
+        self.line_errors = list(line_errors)
+        self.response = response  # Raw response the result was parsed from
+
+    @property
+    def succeeded(self):
+        """
+        Number of objects Tally created, altered, deleted, combined or cancelled
+        """
+        return self.created + self.altered + self.deleted + self.combined + self.cancelled
+
+    @property
+    def ok(self):
+        """
+        True if Tally reported no errors, exceptions or line errors
+        """
+        return not (self.errors or self.exceptions or self.line_errors)
+
+    def to_dict(self):
+        """
+        Return the counts, IDs and line errors as a dict
+        """
+        return {field: getattr(self, field) for field in _FIELDS}
+
+    def __str__(self):
+        # The raw response, for code that logs or scans it
+        response = self.response
+        if isinstance(response, bytes):
+            return response.decode(detect_encoding(response[:512]), errors="replace")
+        return response if response is not None else repr(self)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in _FIELDS if getattr(self, field))
+        return f"ImportResult({fields})"
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        Parse an Import Data response
+
+        Handles both the bare <RESPONSE> form and the <ENVELOPE>...<IMPORTRESULT> form. A
+        response without any counts (e.g. "Unknown Request, cannot be processed") is
+        reported as one error with its text as the line error; an empty response is
+        an error too, since nothing says the import was applied. Text and UTF-8 bytes are
+        scanned directly without building an element tree.
+
+        Args:
+            response (str, bytes or Element): Tally response
+
+        Returns:
+            ImportResult: Parsed result
+
+        Raises:
+            ValueError: If the response is an "Error: ..." string
+        """
+        if isinstance(response, ET.Element):
+            return cls.from_element(response)
+        text = response
+        if isinstance(text, str):
+            if text.startswith("Error:"):
+                raise ValueError(text)
+        else:
+            encoding = detect_encoding(text[:512])
+            if encoding not in _ASCII_NATIVE:
+                text = text.decode(encoding, errors="replace")
+        count_pattern, line_error_pattern, tag_pattern, line_error_tag = _PATTERNS[text.__class__]
+        binary = text.__class__ is bytes
+
+        result = cls(response=response)
+        # One C-level scan for all counts; reversed so the first occurrence of a tag wins
+        counts = count_pattern.findall(text)
+        for tag, value in reversed(counts):
+            setattr(result, _FIELDS_BY_TAG[tag], int(value))
+        line_errors = result.line_errors
+        if line_error_tag in text:
+            for message in line_error_pattern.findall(text):
+                message = _clean(message, binary)
+                if message:
+                    line_errors.append(message)
+        if not counts:
+            if not line_errors:
+                message = _clean(tag_pattern.sub(b" " if binary else " ", text), binary)
+                line_errors.append(message or _EMPTY_RESPONSE)
+            result.errors = max(result.errors, len(line_errors))
+        return result
+
+    @classmethod
+    def from_element(cls, root):
+        """
+        Read an ImportResult from an already parsed response
+
+        Args:
+            root (xml.etree.ElementTree.Element): Parsed response
+
+        Returns:
+            ImportResult: Parsed result
+        """
+        result = cls(response=root)
+        found = False
+        for tag, field in _COUNT_TAGS:
+            elem = next(root.iter(tag), None)
+            if elem is not None and elem.text and elem.text.strip().lstrip("-").isdigit():
+                setattr(result, field, int(elem.text))
+                found = True
+        result.line_errors = [" ".join(elem.text.split()) for elem in root.iter("LINEERROR")
+                              if elem.text and elem.text.strip()]
+        if not found:
+            text = " ".join(" ".join(root.itertext()).split())
+            if not result.line_errors:
+                result.line_errors.append(text or _EMPTY_RESPONSE)
+            result.errors = max(result.errors, len(result.line_errors))
+        return result
+
+
+def parse_import_result(response):
+    """
+    Parse an Import Data response into an ImportResult (see ImportResult.from_response)
+
+    Args:
+        response (str, bytes or Element): Tally response
+
+    Returns:
+        ImportResult: Parsed result
+    """
+    return ImportResult.from_response(response)
+
+
+def import_result_or_error(response):
+    """
+    Result of an import-style client method: the parsed ImportResult, or the "Error: ..."
+    string when the request itself failed
+
+    Args:
+        response (str or bytes): Return value of _send_request
+
+    Returns:
+        ImportResult or str: Parsed result, or the error string unchanged
+    """
+    if isinstance(response, str) and response.startswith("Error:"):
+        return response
+    return ImportResult.from_response(response)
@@ -0,0 +1,299 @@
+import json
+import logging
+import os
+
+from tallyRecords import Ledger, Group, StockItem, Voucher, _root
+
+# Sync kind -> (Tally object type, XML tag of one object, record class)
+SYNC_KINDS = {
+    "ledgers": ("Ledger", "LEDGER", Ledger),
+    "groups": ("Group", "GROUP", Group),
+    "stock_items": ("StockItem", "STOCKITEM", StockItem),
+    "vouchers": ("Voucher", "VOUCHER", Voucher),
+}
+_MASTER_KINDS = ("ledgers", "groups", "stock_items")
+
+# Deletion reconciliation modes
+RECONCILE_AUTO = "auto"      # fetch the ID list only when Tally's object count disagrees with ours
+RECONCILE_ALWAYS = "always"  # fetch the ID list on every sync
+RECONCILE_NEVER = "never"    # do not look for deletions
+
+
+class CompanyAlterIds:
+    """
+    A company's last master and voucher alteration IDs (Tally's AltMstId / AltVchId).
+
+    Tally advances them on every create, alter and delete, so comparing two probes tells
+    whether anything changed in between.
+    """
+    __slots__ = ("company_name", "master_alter_id", "voucher_alter_id")
+
+    def __init__(self, company_name, master_alter_id=0, voucher_alter_id=0):
+        self.company_name = company_name
+        self.master_alter_id = master_alter_id
+        self.voucher_alter_id = voucher_alter_id
+
+    def for_kind(self, kind):
+        """
+        The alteration ID that covers a sync kind: voucher for "vouchers", master otherwise
+        """
+        return self.voucher_alter_id if kind == "vouchers" else self.master_alter_id
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return (self.company_name, self.master_alter_id, self.voucher_alter_id) == \
+            (other.company_name, other.master_alter_id, other.voucher_alter_id)
+
+    def __repr__(self):
+        return (f"CompanyAlterIds({self.company_name!r}, master_alter_id={self.master_alter_id}, "
+                f"voucher_alter_id={self.voucher_alter_id})")
+
+
+def _probe_int(elem, tag):
+    value = (elem.findtext(tag) or "").strip()
+    return int(value) if value.isdigit() else 0
+
+
+def parse_company_alter_ids(response):
+    """
+    Parse the response of TallyClient.get_company_alter_ids
+
+    Args:
+        response (str, bytes or Element): Tally response
+
+    Returns:
+        dict: {company_name: CompanyAlterIds} for every loaded company
+
+    Raises:
+        ValueError: If the response is an "Error: ..." string
+        xml.etree.ElementTree.ParseError: If the response is not valid XML
+    """
+    companies = {}
+    for elem in _root(response).iter("COMPANY"):
+        name = (elem.get("NAME") or elem.findtext("NAME") or "").strip()
+        companies[name] = CompanyAlterIds(name, _probe_int(elem, "ALTMSTID"), _probe_int(elem, "ALTVCHID"))
+    return companies
+
+
+class Watermark:
+    """
+    What one sync kind of one company has seen so far: the highest AlterID, the MasterIDs
+    of the objects that exist, and the company alteration ID probed at the last sync
+    """
+    __slots__ = ("alter_id", "ids", "probe_alter_id")
+
+    def __init__(self, alter_id=0, ids=(), probe_alter_id=None):
+        self.alter_id = alter_id
+        self.ids = set(ids)
+        self.probe_alter_id = probe_alter_id
+
+    def __repr__(self):
+        return f"Watermark(alter_id={self.alter_id}, ids={len(self.ids)}, probe_alter_id={self.probe_alter_id})"
+
+
+class SyncState:
+    """
+    Per-company watermarks for incremental sync, saved between runs as JSON.
+
+    Watermarks are kept per kind (ledgers, groups, stock items, vouchers): Tally numbers
+    AlterIDs across all masters of a company, so one shared master watermark would skip
+    changes to the kinds that were not synced yet.
+    """
+
+    def __init__(self, companies=None):
+        """
+        Initialize SyncState
+
+        Args:
+            companies (dict, optional): {company_name: {kind: Watermark}}. Default: None (nothing synced)
+        """
+        self.companies = companies or {}
+
+    def watermark(self, company_name, kind):
+        """
+        Watermark of one kind for a company, created on first use
+
+        Args:
+            company_name (str): Company name ("" or None for the current company)
+            kind (str): "ledgers", "groups", "stock_items" or "vouchers"
+
+        Returns:
+            Watermark: Watermark (updated in place by sync_collection)
+        """
+        kinds = self.companies.setdefault(company_name or "", {})
+        mark = kinds.get(kind)
+        if mark is None:
+            mark = kinds[kind] = Watermark()
+        return mark
+
+    def master_alter_id(self, company_name):
+        """
+        Highest master AlterID seen for a company, over all synced master kinds
+        """
+        kinds = self.companies.get(company_name or "", {})
+        return max((kinds[kind].alter_id for kind in _MASTER_KINDS if kind in kinds), default=0)
+
+    def voucher_alter_id(self, company_name):
+        """
+        Highest voucher AlterID seen for a company
+        """
+        mark = self.companies.get(company_name or "", {}).get("vouchers")
+        return mark.alter_id if mark else 0
+
+    def to_dict(self):
+        return {
+            company: {kind: {"alter_id": mark.alter_id, "ids": sorted(mark.ids), "probe_alter_id": mark.probe_alter_id}
+                      for kind, mark in kinds.items()}
+            for company, kinds in self.companies.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({
+            company: {kind: Watermark(mark.get("alter_id", 0), mark.get("ids", ()), mark.get("probe_alter_id"))
+                      for kind, mark in kinds.items()}
+            for company, kinds in data.items()
+        })
+
+    def save(self, path):
+        """
+        Write the state to a JSON file (replaced atomically)
+
+        Args:
+            path (str): File path
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a state saved with save(); a missing file gives an empty state
+
+        Args:
+            path (str): File path
+
+        Returns:
+            SyncState: Loaded state
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+
+class ChangeSet:
+    """
+    Result of one incremental sync of one kind
+    """
+    __slots__ = ("kind", "company_name", "changed", "deleted", "alter_id", "full", "reconciled", "unchanged",
+                 "probe_alter_id")
+
+    def __init__(self, kind, company_name, changed, deleted, alter_id, full, reconciled, unchanged=False,
+                 probe_alter_id=None):
+        self.kind = kind
+        self.company_name = company_name
+        self.changed = changed        # records created or altered since the last sync
+        self.deleted = deleted        # MasterIDs of objects deleted since the last sync
+        self.alter_id = alter_id      # new watermark
+        self.full = full              # True on the first sync, when every object is "changed"
+        self.reconciled = reconciled  # True if the MasterID list was fetched to find deletions
+        self.unchanged = unchanged    # True if the company probe showed no alteration, so nothing was fetched
+        self.probe_alter_id = probe_alter_id  # company alteration ID probed before this sync
+
+    def __repr__(self):
+        return (f"ChangeSet({self.kind!r}, changed={len(self.changed)}, deleted={len(self.deleted)}, "
+                f"alter_id={self.alter_id}, full={self.full}, unchanged={self.unchanged})")
+
+
+def sync_collection(client, kind, state, company_name=None, reconcile=RECONCILE_AUTO, probe=True):
+    """
+    Fetch the objects of one kind that changed since the state's watermark
+
+    Tally filters the collection on its side ($AlterID above the watermark), so only
+    changed objects cross the wire. Deletions leave no AlterID behind; they are found by
+    comparing MasterID sets. In "auto" mode the full MasterID list is only fetched when
+    Tally's object count differs from the number of objects we know about.
+
+    With probe, the company's alteration IDs are checked first; if the one covering this
+    kind has not moved since the last sync, nothing else is requested.
+
+    The state is only updated once everything was fetched, so a failed sync can simply
+    be run again. An empty MasterID list is only trusted when Tally also counts no objects;
+    otherwise nothing is reported deleted and the watermark stays where it was.
+
+    Args:
+        client (TallyClient): Connected client
+        kind (str): "ledgers", "groups", "stock_items" or "vouchers"
+        state (SyncState): Watermarks, updated in place
+        company_name (str, optional): Company name. Default: None (current company)
+        reconcile (str, optional): "auto", "always" or "never". Default: "auto"
+        probe (bool or CompanyAlterIds, optional): Skip the sync when probe_alter_ids shows no
+                                                   change; pass a CompanyAlterIds to reuse one probe
+                                                   across kinds. Default: True
+
+    Returns:
+        ChangeSet: Changed records and deleted MasterIDs
+
+    Raises:
+        ValueError: If kind or reconcile is unknown
+        requests.exceptions.RequestException: If a request to Tally fails
+    """
+    if kind not in SYNC_KINDS:
+        raise ValueError(f"Unknown sync kind: {kind}")
+    if reconcile not in (RECONCILE_AUTO, RECONCILE_ALWAYS, RECONCILE_NEVER):
+        raise ValueError(f"Unknown reconcile mode: {reconcile}")
+    object_type, _, record_class = SYNC_KINDS[kind]
+    mark = state.watermark(company_name, kind)
+    full = mark.alter_id == 0 and not mark.ids
+
+    if probe is True:
+        probe = client.probe_alter_ids(company_name)
+        if not isinstance(probe, CompanyAlterIds):
+            logging.warning(f"AlterID probe for {kind} unavailable ({probe}); syncing without it")
+    probe_alter_id = probe.for_kind(kind) if isinstance(probe, CompanyAlterIds) else None
+    if probe_alter_id is not None and probe_alter_id == mark.probe_alter_id:
+        return ChangeSet(kind, company_name, [], [], mark.alter_id, False, False, unchanged=True,
+                         probe_alter_id=probe_alter_id)
+
+    changed = []
+    alter_id = mark.alter_id
+    for elem in client.iter_changed_objects(object_type, mark.alter_id, company_name):
+        record = record_class.from_element(elem)
+        changed.append(record)
+        if record.alter_id is not None and record.alter_id > alter_id:
+            alter_id = record.alter_id
+
+    ids = mark.ids | {record.master_id for record in changed if record.master_id is not None}
+    deleted = []
+    reconciled = False
+    if not full and reconcile != RECONCILE_NEVER:
+        count = None
+        if reconcile == RECONCILE_AUTO:
+            count = client.count_objects(object_type, company_name)
+            if not isinstance(count, int):
+                logging.warning(f"Object count for {kind} unavailable ({count}); fetching the ID list")
+        if count != len(ids):
+            current = client.get_object_ids(object_type, company_name)
+            if not current and ids:
+                # An empty ID list would delete everything we know; only trust it if Tally counts 0 too
+                if count is None:
+                    count = client.count_objects(object_type, company_name)
+                if count != 0:
+                    logging.warning(f"Empty {kind} ID list from Tally without a zero count ({count}); "
+                                    f"not reconciling and keeping the watermark")
+                    return ChangeSet(kind, company_name, changed, [], mark.alter_id, full, False,
+                                     probe_alter_id=mark.probe_alter_id)
+            deleted = sorted(ids - current)
+            ids = current
+            reconciled = True
+
+    mark.alter_id = alter_id
+    mark.ids = ids
+    mark.probe_alter_id = probe_alter_id
+    return ChangeSet(kind, company_name, changed, deleted, alter_id, full, reconciled,
+                     probe_alter_id=probe_alter_id)
@@ -0,0 +1,138 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 1000
+# A page's MasterID range grows over sparse stretches up to this many times the page size
+MAX_SPAN_FACTOR = 16
+
+
+class PageCursor:
+    """
+    Position of a paged walk: the last MasterID read and the range still to go.
+
+    The walk covers MasterIDs up to the highest one that existed when it started; objects
+    created later are not visited (incremental sync picks those up).
+    """
+    __slots__ = ("kind", "after", "last", "span")
+
+    def __init__(self, kind, after, last, span):
+        self.kind = kind    # query kind the cursor belongs to
+        self.after = after  # pages continue with MasterIDs above this one
+        self.last = last    # highest MasterID of the walk
+        self.span = span    # MasterID range of the next page
+
+    @property
+    def done(self):
+        return self.after >= self.last
+
+    def to_token(self):
+        """
+        Encode the cursor as an opaque string for storing and passing back later
+
+        Returns:
+            str: URL-safe token
+        """
+        data = json.dumps([self.kind, self.after, self.last, self.span], separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def from_token(cls, token):
+        """
+        Decode a token made by to_token()
+
+        Args:
+            token (str): Cursor token
+
+        Returns:
+            PageCursor: Decoded cursor
+
+        Raises:
+            ValueError: If the token is not a cursor token
+        """
+        try:
+            kind, after, last, span = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        except (ValueError, TypeError, AttributeError):
+            raise ValueError(f"Invalid cursor token: {token!r}")
+        if not all(isinstance(value, int) for value in (after, last, span)) or span < 1:
+            raise ValueError(f"Invalid cursor token: {token!r}")
+        return cls(kind, after, last, span)
+
+    def __repr__(self):
+        return f"PageCursor({self.kind!r}, after={self.after}, last={self.last}, span={self.span})"
+
+
+class Page:
+    """
+    One page of a paged walk
+    """
+    __slots__ = ("records", "cursor", "done")
+
+    def __init__(self, records, cursor, done):
+        self.records = records  # tallyRecords of the page, in MasterID order
+        self.cursor = cursor    # token to resume after this page (None once done)
+        self.done = done        # True on the last page
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        return f"Page(records={len(self.records)}, done={self.done})"
+
+
+def _next_span(span, items, page_size):
+    # Aim the next range at page_size objects; grow at most 2x per page, never below page_size
+    # (a range of page_size MasterIDs cannot hold more than page_size objects)
+    if items:
+        span = min(span * 2, span * page_size // items)
+    else:
+        span *= 2
+    return min(max(span, page_size), page_size * MAX_SPAN_FACTOR)
+
+
+def iter_pages(query, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+    """
+    Walk a query in MasterID order, one bounded request per page
+
+    The first call asks Tally for the query's MasterID range; each page then adds a
+    MasterID range to the query's filters, so Tally only exports that range. Ranges start
+    at page_size MasterIDs and widen over sparse stretches, so a page holds at most
+    page_size * MAX_SPAN_FACTOR objects. Each page is read completely before it is yielded,
+    so other requests can run between pages.
+
+    Args:
+        query (tallyQuery.Query): Query to walk
+        page_size (int, optional): Objects per page to aim for. Default: 1000
+        cursor (str, optional): Token of a previous page, to resume after it. Default: None (from the start)
+
+    Yields:
+        Page: Non-empty pages, then the last page (which may be empty)
+
+    Raises:
+        ValueError: If page_size is not positive, or the cursor is invalid or belongs to another kind
+        requests.exceptions.RequestException: If a request to Tally fails
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    if cursor is not None:
+        position = PageCursor.from_token(cursor)
+        if position.kind != query.kind:
+            raise ValueError(f"Cursor belongs to a {position.kind} walk, not {query.kind}")
+        position.span = min(max(position.span, page_size), page_size * MAX_SPAN_FACTOR)
+    else:
+        first_id, last_id, count = query.bounds()
+        if not count:
+            yield Page([], None, True)
+            return
+        position = PageCursor(query.kind, first_id - 1, last_id, page_size)
+
+    while not position.done:
+        upper = min(position.after + position.span, position.last)
+        page_query = query.where(master_id__gt=position.after, master_id__lte=upper)
+        records = sorted(page_query._records(method="query_page"), key=lambda record: record.master_id or 0)
+        position.span = _next_span(position.span, len(records), page_size)
+        position.after = upper
+        if records or position.done:
+            yield Page(records, None if position.done else position.to_token(), position.done)
@@ -0,0 +1,129 @@
+from array import array
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from tallyRecords import parse_tally_amount
+
+# Amounts are kept as whole hundredths (paise, cents) in 64-bit integer arrays
+_CENT = Decimal("0.01")
+BALANCE_COLUMNS = ("opening", "closing", "debits", "credits")
+
+
+def _cents(value):
+    amount = parse_tally_amount(value)
+    if amount is None:
+        return 0
+    return int(amount.quantize(_CENT, rounding=ROUND_HALF_EVEN).scaleb(2))
+
+
+class LedgerBalances:
+    """
+    Opening and closing balances and period debit/credit totals of many ledgers.
+
+    Columns are stored in parallel arrays (names, parents and integer arrays of MasterIDs and
+    of amounts in hundredths), so tens of thousands of ledgers take a few hundred KB instead of a
+    record object each. Amounts keep Tally's sign (debit balances are negative) and are
+    returned as Decimal.
+    """
+    __slots__ = ("names", "parents", "master_ids", "opening", "closing", "debits", "credits", "_index")
+
+    def __init__(self):
+        self.names = []
+        self.parents = []
+        self.master_ids = array("q")
+        self.opening = array("q")
+        self.closing = array("q")
+        self.debits = array("q")
+        self.credits = array("q")
+        self._index = None
+
+    def append(self, name, parent, master_id, opening, closing, debits, credits):
+        """
+        Add a ledger; amounts in hundredths
+        """
+        self.names.append(name)
+        self.parents.append(parent)
+        self.master_ids.append(master_id)
+        self.opening.append(opening)
+        self.closing.append(closing)
+        self.debits.append(debits)
+        self.credits.append(credits)
+        self._index = None
+
+    def index(self, name):
+        """
+        Position of a ledger, found without regard to case like Tally does
+
+        Raises:
+            KeyError: If no ledger has that name
+        """
+        if self._index is None:
+            self._index = {ledger_name.casefold(): position for position, ledger_name in enumerate(self.names)}
+        return self._index[name.casefold()]
+
+    def row(self, position):
+        """
+        One ledger as a dict: name, parent, master_id, opening, closing, debits, credits
+        """
+        row = {"name": self.names[position], "parent": self.parents[position],
+               "master_id": self.master_ids[position] or None}
+        for column in BALANCE_COLUMNS:
+            row[column] = Decimal(getattr(self, column)[position]).scaleb(-2)
+        return row
+
+    def get(self, name, default=None):
+        """
+        Balances of a ledger by name (see row()), or default if there is no such ledger
+        """
+        try:
+            return self.row(self.index(name))
+        except KeyError:
+            return default
+
+    def total(self, column):
+        """
+        Sum of a column ("opening", "closing", "debits" or "credits") over all ledgers
+
+        Returns:
+            Decimal: Total
+        """
+        if column not in BALANCE_COLUMNS:
+            raise ValueError(f"Unknown balance column: {column}")
+        return Decimal(sum(getattr(self, column))).scaleb(-2)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        try:
+            self.index(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for position in range(len(self.names)):
+            yield self.row(position)
+
+    def __repr__(self):
+        return f"LedgerBalances(ledgers={len(self.names)})"
+
+
+def parse_ledger_balances(elements):
+    """
+    Collect LEDGER elements of TallyClient.get_ledger_balances into a LedgerBalances
+
+    Args:
+        elements (iterable): LEDGER elements (e.g. from a streaming parser)
+
+    Returns:
+        LedgerBalances: Parsed balances
+    """
+    balances = LedgerBalances()
+    for elem in elements:
+        name = (elem.get("NAME") or elem.findtext("NAME") or "").strip()
+        master_id = (elem.findtext("MASTERID") or "").strip()
+        balances.append(name, (elem.findtext("PARENT") or "").strip() or None,
+                        int(master_id) if master_id.isdigit() else 0,
+                        _cents(elem.findtext("OPENINGBALANCE")), _cents(elem.findtext("CLOSINGBALANCE")),
+                        _cents(elem.findtext("PERIODDEBITS")), _cents(elem.findtext("PERIODCREDITS")))
+    return balances
@@ -0,0 +1,148 @@
+from dateSharding import parse_range_date
+
+# Identifiers per filtered request. Each one becomes a term of the TDL filter, and Tally
+# slows down on very long formulae.
+DEFAULT_CHUNK_SIZE = 200
+
+
+class MultiGetResult:
+    """
+    Records fetched by a multi-get, keyed by the identifier they were requested with
+    """
+    __slots__ = ("found", "missing")
+
+    def __init__(self, found=None, missing=None):
+        self.found = found if found is not None else {}        # {identifier: record}
+        self.missing = missing if missing is not None else []  # identifiers Tally had no object for, in request order
+
+    def get(self, identifier, default=None):
+        return self.found.get(identifier, default)
+
+    def __getitem__(self, identifier):
+        return self.found[identifier]
+
+    def __contains__(self, identifier):
+        return identifier in self.found
+
+    def __len__(self):
+        return len(self.found)
+
+    def __iter__(self):
+        return iter(self.found)
+
+    def items(self):
+        return self.found.items()
+
+    def __repr__(self):
+        return f"MultiGetResult(found={len(self.found)}, missing={len(self.missing)})"
+
+
+def _chunks(items, chunk_size):
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
+
+
+def _multi_get(query, identifiers, chunk_size, normalize, lookups, record_key):
+    """
+    Fetch the records for a list of identifiers, one filtered request per chunk
+
+    Args:
+        query (tallyQuery.Query): Query to add the chunk filters to
+        identifiers (iterable): Requested identifiers
+        chunk_size (int): Identifiers per request
+        normalize (callable): Identifier -> comparison key
+        lookups (callable): (comparison keys, identifiers) of a chunk -> where() keyword arguments
+        record_key (callable): Record -> comparison key
+
+    Returns:
+        MultiGetResult: Records keyed by the requested identifiers
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    requested = {}
+    for identifier in identifiers:
+        # Pairs may come as lists; results are keyed by tuples then
+        requested.setdefault(normalize(identifier), tuple(identifier) if isinstance(identifier, list) else identifier)
+    keys = list(requested)
+    result = MultiGetResult()
+    for chunk in _chunks(keys, chunk_size):
+        wanted = set(chunk)
+        for record in query.where(**lookups(chunk, [requested[key] for key in chunk]))._records(method="multi_get"):
+            key = record_key(record)
+            if key in wanted:
+                result.found[requested[key]] = record
+    result.missing = [requested[key] for key in keys if requested[key] not in result.found]
+    return result
+
+
+def get_by_master_ids(query, master_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fetch the objects of a query with the given MasterIDs
+
+    Args:
+        query (tallyQuery.Query): Query over the object kind
+        master_ids (iterable): MasterIDs (ints or digit strings)
+        chunk_size (int, optional): MasterIDs per request. Default: 200
+
+    Returns:
+        MultiGetResult: Records keyed by the MasterIDs as given
+
+    Raises:
+        ValueError: If a MasterID is not a whole number
+        requests.exceptions.RequestException: If a request to Tally fails
+    """
+    return _multi_get(query, master_ids, chunk_size, int, lambda chunk, _: {"master_id__in": chunk},
+                      lambda record: record.master_id)
+
+
+def get_by_names(query, names, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fetch the masters of a query with the given names
+
+    Tally compares names without regard to case, so the records are matched the same way.
+
+    Args:
+        query (tallyQuery.Query): Query over ledgers, groups or stock items
+        names (iterable): Master names
+        chunk_size (int, optional): Names per request. Default: 200
+
+    Returns:
+        MultiGetResult: Records keyed by the names as given
+
+    Raises:
+        requests.exceptions.RequestException: If a request to Tally fails
+    """
+    return _multi_get(query, names, chunk_size, lambda name: name.strip().casefold(),
+                      lambda _, chunk: {"name__in": [name.strip() for name in chunk]}, lambda record: (record.name or "").strip().casefold())
+
+
+def get_by_numbers_and_dates(query, pairs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fetch the vouchers of a query with the given (date, voucher number) pairs
+
+    Each chunk is filtered on its dates and on its numbers, then narrowed to the exact
+    pairs here: a voucher whose number belongs to another date of the chunk is transferred
+    but not returned.
+
+    Args:
+        query (tallyQuery.Query): Query over vouchers
+        pairs (iterable): (date, voucher_number) tuples; dates as accepted by between()
+        chunk_size (int, optional): Pairs per request. Default: 200
+
+    Returns:
+        MultiGetResult: Vouchers keyed by the pairs as given
+
+    Raises:
+        ValueError: If a date is not in a recognised format
+        requests.exceptions.RequestException: If a request to Tally fails
+    """
+    def normalize(pair):
+        voucher_date, voucher_number = pair
+        return parse_range_date(voucher_date)[0], str(voucher_number).strip()
+
+    def lookups(chunk, _):
+        return {"date__in": sorted({day for day, _ in chunk}),
+                "number__in": sorted({number for _, number in chunk})}
+
+    return _multi_get(query, pairs, chunk_size, normalize, lookups,
+                      lambda record: (record.date, (record.voucher_number or "").strip()))
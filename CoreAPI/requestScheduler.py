@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Priority lanes, highest priority first
+INTERACTIVE = "interactive"  # quick lookups (get_ledger_by_name, get_voucher_by_master_id, ...)
+IMPORT = "import"            # Import Data requests (create_/update_/delete_ ...)
+BULK = "bulk"                # long report and collection exports
+LANES = (INTERACTIVE, IMPORT, BULK)
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+class RequestScheduler:
+    """
+    Admits requests to one Tally endpoint by priority lane.
+
+    Tally serves XML requests one at a time, so the scheduler caps how many requests are
+    in flight and, when a slot frees up, hands it to the oldest request of the highest
+    priority lane that is waiting. Per-lane limits keep slow lanes from taking every slot:
+    with the defaults (2 slots, bulk and import limited to 1 each) a running export never
+    blocks the next interactive lookup from being sent.
+    """
+
+    def __init__(self, max_in_flight=2, lane_limits=None):
+        """
+        Initialize RequestScheduler
+
+        Args:
+            max_in_flight (int, optional): Maximum requests sent to Tally at once. Default: 2
+            lane_limits (dict, optional): Maximum in-flight requests per lane.
+                                          Default: {"import": 1, "bulk": 1}
+        """
+        self.max_in_flight = max_in_flight
+        self.lane_limits = {IMPORT: 1, BULK: 1} if lane_limits is None else dict(lane_limits)
+        self._condition = threading.Condition()
+        self._queues = {lane: deque() for lane in LANES}
+        self._in_flight = {lane: 0 for lane in LANES}
+        self._started = {lane: 0 for lane in LANES}
+        self._total_wait = {lane: 0.0 for lane in LANES}
+        self._max_wait = {lane: 0.0 for lane in LANES}
+        self._held = threading.local()  # slots held by the current thread, per lane
+
+    def _limit(self, lane):
+        return min(self.lane_limits.get(lane, self.max_in_flight), self.max_in_flight)
+
+    def _runnable(self, lane):
+        if sum(self._in_flight.values()) >= self.max_in_flight:
+            return False
+        if self._in_flight[lane] >= self._limit(lane):
+            return False
+        # A higher priority lane that is waiting and may run goes first
+        for higher in LANES[:LANES.index(lane)]:
+            if self._queues[higher] and self._in_flight[higher] < self._limit(higher):
+                return False
+        return True
+
+    @contextmanager
+    def slot(self, lane=INTERACTIVE):
+        """
+        Block until a request in this lane may be sent to Tally, and hold the slot for the
+        duration of the with-block
+
+        Args:
+            lane (str, optional): One of "interactive", "import", "bulk". Default: "interactive"
+
+        Yields:
+            float: Seconds spent waiting in the queue
+
+        Raises:
+            ValueError: If the lane is unknown
+            RuntimeError: If the current thread already holds every slot this request could get,
+                          e.g. a bulk call made while a bulk stream (iter_*) is still being read
+        """
+        if lane not in self._queues:
+            raise ValueError(f"Unknown scheduler lane: {lane}")
+        held = getattr(self._held, "lanes", None)
+        if held is None:
+            held = self._held.lanes = {name: 0 for name in LANES}
+        if held[lane] >= self._limit(lane) or sum(held.values()) >= self.max_in_flight:
+            # Waiting would deadlock: only this thread can release those slots
+            raise RuntimeError(f"This thread already holds the {lane} slots of the scheduler; "
+                               f"finish or close the open stream before sending another {lane} request")
+
+        ticket = object()
+        queued_at = time.monotonic()
+        with self._condition:
+            queue = self._queues[lane]
+            queue.append(ticket)
+            try:
+                while queue[0] is not ticket or not self._runnable(lane):
+                    self._condition.wait()
+            except BaseException:
+                # Interrupted while queued (KeyboardInterrupt, ...): leave the queue so the lanes behind us move on
+                queue.remove(ticket)
+                self._condition.notify_all()
+                raise
+            queue.popleft()
+            self._in_flight[lane] += 1
+            waited = time.monotonic() - queued_at
+            self._started[lane] += 1
+            self._total_wait[lane] += waited
+            self._max_wait[lane] = max(self._max_wait[lane], waited)
+            # The next request in this or a lower lane may also be runnable now
+            self._condition.notify_all()
+        held[lane] += 1
+        try:
+            yield waited
+        finally:
+            held[lane] -= 1
+            with self._condition:
+                self._in_flight[lane] -= 1
+                self._condition.notify_all()
+
+    def queue_depth(self, lane=None):
+        """
+        Number of requests waiting to be sent
+
+        Args:
+            lane (str, optional): Lane to count. Default: None (all lanes)
+
+        Returns:
+            int: Waiting requests
+        """
+        with self._condition:
+            if lane is not None:
+                return len(self._queues[lane])
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self):
+        """
+        Queue and wait-time statistics per lane
+
+        Returns:
+            dict: {lane: {"queued", "in_flight", "started", "avg_wait", "max_wait"}}, wait times in seconds
+        """
+        with self._condition:
+            return {
+                lane: {
+                    "queued": len(self._queues[lane]),
+                    "in_flight": self._in_flight[lane],
+                    "started": self._started[lane],
+                    "avg_wait": self._total_wait[lane] / self._started[lane] if self._started[lane] else 0.0,
+                    "max_wait": self._max_wait[lane],
+                }
+                for lane in LANES
+            }
+
+
+def get_scheduler(endpoint, **kwargs):
+    """
+    Return the scheduler shared by every client talking to an endpoint, creating it on first use
+
+    Args:
+        endpoint (str): Tally endpoint, e.g. "http://localhost:9000"
+        **kwargs: RequestScheduler arguments, used only when the scheduler is created
+
+    Returns:
+        RequestScheduler: Shared scheduler for the endpoint
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(endpoint)
+        if scheduler is None:
+            scheduler = _schedulers[endpoint] = RequestScheduler(**kwargs)
+        return scheduler
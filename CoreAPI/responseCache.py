@@ -0,0 +1,397 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached response stays valid, per TallyClient method. Methods not listed are never cached.
+DEFAULT_TTLS = {
+    "get_ledgers_list": 300,
+    "get_groups_list": 300,
+    "get_stock_items_list": 300,
+    "get_companies_list": 60,
+    "get_license_info": 3600,
+}
+
+# Company alteration IDs each cached method depends on. An expired entry of these methods is
+# revalidated with one small AlterID probe and kept if the IDs have not moved; the ledger and
+# stock item lists carry balances, so vouchers change them too.
+DEFAULT_DEPENDENCIES = {
+    "get_ledgers_list": ("master", "voucher"),
+    "get_groups_list": ("master",),
+    "get_stock_items_list": ("master", "voucher"),
+}
+# Expired entries are kept this many seconds for revalidation before they are dropped
+DEFAULT_MAX_STALE = 86400
+
+# Cached methods whose responses a write method can change. Voucher writes move ledger and
+# stock balances, which the ledger and stock item lists include.
+_LEDGER_WRITES = ("get_ledgers_list",)
+_GROUP_WRITES = ("get_groups_list", "get_ledgers_list")
+_STOCK_WRITES = ("get_stock_items_list",)
+_VOUCHER_WRITES = ("get_ledgers_list", "get_stock_items_list")
+_COMPANY_WRITES = ("get_companies_list", "get_ledgers_list", "get_groups_list", "get_stock_items_list")
+DEFAULT_INVALIDATIONS = {
+    "create_ledger": _LEDGER_WRITES,
+    "delete_ledger": _LEDGER_WRITES,
+    "create_ledgers": _LEDGER_WRITES,
+    "delete_ledgers": _LEDGER_WRITES,
+    "create_group": _GROUP_WRITES,
+    "update_group": _GROUP_WRITES,
+    "delete_group": _GROUP_WRITES,
+    "create_groups": _GROUP_WRITES,
+    "delete_groups": _GROUP_WRITES,
+    "create_stock_item": _STOCK_WRITES,
+    "delete_stock_item": _STOCK_WRITES,
+    "create_stock_items": _STOCK_WRITES,
+    "delete_stock_items": _STOCK_WRITES,
+    "create_unit": _STOCK_WRITES,
+    "update_unit": _STOCK_WRITES,
+    "delete_unit": _STOCK_WRITES,
+    "create_units": _STOCK_WRITES,
+    "delete_units": _STOCK_WRITES,
+    "create_receipt_voucher": _VOUCHER_WRITES,
+    "create_journal_voucher": _VOUCHER_WRITES,
+    "update_voucher": _VOUCHER_WRITES,
+    "cancel_voucher": _VOUCHER_WRITES,
+    "import_vouchers": _VOUCHER_WRITES,
+    "create_company": _COMPANY_WRITES,
+    "configure_company": _COMPANY_WRITES,
+    "enable_gst": _COMPANY_WRITES,
+    # Requests without an explicit company follow the selected one, so drop everything
+    "select_tally_company": None,
+}
+
+
+def cache_key(method, xml_request, raw_bytes=False):
+    """
+    Key of a cached response: the method and a digest of the exact request body, which
+    already carries the method's arguments and company
+
+    Args:
+        method (str): TallyClient method name
+        xml_request (str or bytes): XML request
+        raw_bytes (bool, optional): Whether the response is kept as bytes. Default: False
+
+    Returns:
+        str: Cache key
+    """
+    if isinstance(xml_request, str):
+        xml_request = xml_request.encode("utf-8")
+    digest = hashlib.blake2b(xml_request, digest_size=16).hexdigest()
+    return f"{method}:{'b' if raw_bytes else 's'}:{digest}"
+
+
+def alter_id_token(companies, dependencies):
+    """
+    Validation token of a cached response: the alteration IDs it depends on, for every loaded company
+
+    Args:
+        companies (dict): {company_name: CompanyAlterIds} from TallyClient.get_company_alter_ids
+        dependencies (tuple): "master" and/or "voucher"
+
+    Returns:
+        str: Token that changes whenever one of those IDs moves
+    """
+    parts = []
+    for name in sorted(companies):
+        ids = companies[name]
+        values = [ids.master_alter_id if dependency == "master" else ids.voucher_alter_id for dependency in dependencies]
+        parts.append(f"{name}:{':'.join(map(str, values))}")
+    return ";".join(parts)
+
+
+class MemoryCache:
+    """
+    Thread-safe in-memory LRU store of (method, expiry, response, token) entries
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        Initialize MemoryCache
+
+        Args:
+            max_entries (int, optional): Entries kept before the least recently used is dropped. Default: 256
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # (expires, value, token) or None; expired entries are returned for revalidation
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def put(self, key, method, expires, value, token=None):
+        with self._lock:
+            self._entries[key] = (method, expires, value, token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def renew(self, key, expires):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], expires, entry[2], entry[3])
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_methods(self, methods=None):
+        with self._lock:
+            if methods is None:
+                self._entries.clear()
+                return
+            for key in [key for key, entry in self._entries.items() if entry[0] in methods]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    SQLite-backed store, so cached responses survive restarts and are shared by worker processes
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) a disk cache
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, method TEXT, "
+                                 "expires REAL, is_text INTEGER, value BLOB, token TEXT)")
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(responses)")}
+        if "token" not in columns:
+            # Cache files written before revalidation tokens existed
+            self._connection.execute("ALTER TABLE responses ADD COLUMN token TEXT")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_method ON responses (method)")
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # (expires, value, token) or None; expired entries are returned for revalidation
+        with self._lock:
+            row = self._connection.execute("SELECT expires, is_text, value, token FROM responses WHERE key = ?",
+                                           (key,)).fetchone()
+        if row is None:
+            return None
+        expires, is_text, value, token = row
+        return expires, value.decode("utf-8") if is_text else bytes(value), token
+
+    def put(self, key, method, expires, value, token=None, purge_before=None):
+        is_text = isinstance(value, str)
+        data = value.encode("utf-8") if is_text else value
+        with self._lock, self._connection:
+            if purge_before is not None:
+                self._connection.execute("DELETE FROM responses WHERE expires < ?", (purge_before,))
+            self._connection.execute("INSERT OR REPLACE INTO responses (key, method, expires, is_text, value, token) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", (key, method, expires, int(is_text), data, token))
+
+    def renew(self, key, expires):
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE responses SET expires = ? WHERE key = ?", (expires, key))
+
+    def delete(self, key):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def delete_methods(self, methods=None):
+        with self._lock, self._connection:
+            if methods is None:
+                self._connection.execute("DELETE FROM responses")
+            else:
+                self._connection.executemany("DELETE FROM responses WHERE method = ?", [(m,) for m in methods])
+
+    def close(self):
+        self._connection.close()
+
+
+class ResponseCache:
+    """
+    Read-through cache for TallyClient's master-data lists.
+
+    Responses of the methods in ttls are kept in an in-memory LRU (and optionally on disk)
+    until their TTL runs out. When the client runs a write method, the cached methods it
+    can affect are dropped, whatever the outcome of the write. Error responses are never cached.
+
+    Like an HTTP ETag, each response of a method in dependencies is stored with a token made
+    of the company alteration IDs it depends on. Once its TTL runs out, the entry is checked
+    with a small AlterID probe and renewed if the token still matches, instead of refetched.
+    """
+
+    def __init__(self, ttls=None, max_entries=256, disk_path=None, invalidations=None, dependencies=None,
+                 validate=True, max_stale=DEFAULT_MAX_STALE):
+        """
+        Initialize ResponseCache
+
+        Args:
+            ttls (dict, optional): Per-method TTL overrides in seconds, e.g. {"get_ledgers_list": 60}.
+                                   A TTL of 0 or None disables caching for that method.
+            max_entries (int, optional): In-memory entries kept. Default: 256
+            disk_path (str, optional): SQLite file for a second, persistent tier. Default: None (memory only)
+            invalidations (dict, optional): Overrides of {write method: cached methods to drop (None for all)}
+            dependencies (dict, optional): Overrides of {cached method: ("master", "voucher") alteration IDs}
+            validate (bool, optional): Revalidate expired entries with an AlterID probe. Default: True
+            max_stale (float, optional): Seconds an expired entry is kept for revalidation. Default: 1 day
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.invalidations = dict(DEFAULT_INVALIDATIONS)
+        if invalidations:
+            self.invalidations.update(invalidations)
+        self.dependencies = dict(DEFAULT_DEPENDENCIES)
+        if dependencies:
+            self.dependencies.update(dependencies)
+        self.validate = validate
+        self.max_stale = max_stale
+        self.memory = MemoryCache(max_entries)
+        self.disk = DiskCache(disk_path) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def is_cached(self, method):
+        """
+        True if responses of this method are cached
+        """
+        return bool(self.ttls.get(method))
+
+    def get(self, method, xml_request, raw_bytes=False):
+        """
+        Cached response for a request, or None (expired entries are not revalidated)
+
+        Args:
+            method (str): TallyClient method name
+            xml_request (str or bytes): XML request
+            raw_bytes (bool, optional): Whether the client returns bytes. Default: False
+
+        Returns:
+            str or bytes: Cached response, or None on a miss
+        """
+        return self.lookup(method, xml_request, raw_bytes)[0]
+
+    def lookup(self, method, xml_request, raw_bytes=False, validator=None):
+        """
+        Cached response for a request, revalidating an expired entry through validator
+
+        Args:
+            method (str): TallyClient method name
+            xml_request (str or bytes): XML request
+            raw_bytes (bool, optional): Whether the client returns bytes. Default: False
+            validator (callable, optional): validator(dependencies) -> current token or None,
+                                            e.g. TallyClient._alter_id_token
+
+        Returns:
+            tuple: (response, None) on a hit; (None, token) on a miss, where token is the current
+                   validation token to pass to put() (None if the method has no dependencies)
+        """
+        if not self.is_cached(method):
+            return None, None
+        key = cache_key(method, xml_request, raw_bytes)
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.put(key, method, *entry)
+        dependencies = self.dependencies.get(method) if self.validate and validator is not None else None
+
+        if entry is not None:
+            expires, value, token = entry
+            if expires > now:
+                self.hits += 1
+                return value, None
+            if expires + self.max_stale <= now or not token:
+                self._delete(key)
+            elif dependencies:
+                current = validator(dependencies)
+                if current == token:
+                    expires = now + self.ttls[method]
+                    self.memory.renew(key, expires)
+                    if self.disk is not None:
+                        self.disk.renew(key, expires)
+                    self.hits += 1
+                    self.revalidated += 1
+                    return value, None
+                self.misses += 1
+                return None, current
+
+        self.misses += 1
+        return None, validator(dependencies) if dependencies else None
+
+    def put(self, method, xml_request, response, raw_bytes=False, token=None):
+        """
+        Store a response if the method is cached and the response is not an error
+
+        Args:
+            method (str): TallyClient method name
+            xml_request (str or bytes): XML request
+            response (str or bytes): Response to cache
+            raw_bytes (bool, optional): Whether the client returns bytes. Default: False
+            token (str, optional): Validation token taken before the request was sent (from lookup)
+        """
+        if not self.is_cached(method) or (isinstance(response, str) and response.startswith("Error:")):
+            return
+        key = cache_key(method, xml_request, raw_bytes)
+        now = time.time()
+        expires = now + self.ttls[method]
+        self.memory.put(key, method, expires, response, token)
+        if self.disk is not None:
+            self.disk.put(key, method, expires, response, token, purge_before=now - self.max_stale)
+
+    def _delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def invalidate(self, methods=None):
+        """
+        Drop cached responses
+
+        Args:
+            methods (iterable, optional): Cached methods to drop. Default: None (everything)
+        """
+        methods = None if methods is None else set(methods)
+        self.memory.delete_methods(methods)
+        if self.disk is not None:
+            self.disk.delete_methods(methods)
+
+    def after_request(self, method):
+        """
+        Invalidate what a write method may have changed (no-op for other methods)
+
+        Args:
+            method (str): TallyClient method that was just sent
+        """
+        if method in self.invalidations:
+            self.invalidate(self.invalidations[method])
+
+    def stats(self):
+        """
+        Hit and miss counters
+
+        Returns:
+            dict: {"hits", "misses", "revalidated", "entries"}; revalidated hits are also counted in hits
+        """
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated,
+                "entries": len(self.memory)}
+
+    def close(self):
+        """
+        Close the disk tier, if any
+        """
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,87 @@
+"""
+Benchmark for the XML sanitizer on large synthetic Tally voucher exports.
+
+Run from this directory:  python sanitizerBenchmark.py [size_mb]
+
+Compares a plain copy of the chunks (the memcpy baseline) with XmlSanitizer on clean
+input and on input sprinkled with Tally's invalid control characters, and times a full
+streaming parse with and without sanitizing.
+"""
+import sys
+import time
+
+from xmlStream import XmlSanitizer, iter_elements
+
+CHUNK_SIZE = 65536
+
+VOUCHER = (
+    '<VOUCHER REMOTEID="{i}" VCHTYPE="Sales" ACTION="Create">'
+    '<DATE>20240401</DATE><GUID>guid-{i}</GUID><VOUCHERTYPENAME>Sales</VOUCHERTYPENAME>'
+    '<VOUCHERNUMBER>{i}</VOUCHERNUMBER><PARTYLEDGERNAME>Customer {p}</PARTYLEDGERNAME>'
+    '<GSTAPPLICABLE>{marker} Applicable</GSTAPPLICABLE><NARRATION>Invoice {i}{ctrl}</NARRATION>'
+    '<ALLLEDGERENTRIES.LIST><LEDGERNAME>Customer {p}</LEDGERNAME><AMOUNT>-1180.00</AMOUNT></ALLLEDGERENTRIES.LIST>'
+    '<ALLLEDGERENTRIES.LIST><LEDGERNAME>Sales</LEDGERNAME><AMOUNT>1000.00</AMOUNT></ALLLEDGERENTRIES.LIST>'
+    '<ALLLEDGERENTRIES.LIST><LEDGERNAME>Output GST</LEDGERNAME><AMOUNT>180.00</AMOUNT></ALLLEDGERENTRIES.LIST>'
+    '</VOUCHER>'
+)
+
+
+def build_export(size_mb, dirty):
+    """
+    Build a synthetic voucher export of roughly size_mb megabytes
+
+    Args:
+        size_mb (int): Target size in MB
+        dirty (bool): Include "&#4;" references and raw control characters like real Tally exports
+
+    Returns:
+        tuple: (export bytes, number of vouchers)
+    """
+    marker = "&#4;" if dirty else ""
+    ctrl = "\x04" if dirty else ""
+    sample = VOUCHER.format(i=0, p=0, marker=marker, ctrl=ctrl).encode("utf-8")
+    count = size_mb * 1024 * 1024 // len(sample)
+    body = "".join(VOUCHER.format(i=i, p=i % 500, marker=marker, ctrl=ctrl) for i in range(count))
+    export = f"<ENVELOPE><BODY><DATA><COLLECTION>{body}</COLLECTION></DATA></BODY></ENVELOPE>"
+    return export.encode("utf-8"), count
+
+
+def chunked(data):
+    view = memoryview(data)
+    return [bytes(view[i:i + CHUNK_SIZE]) for i in range(0, len(data), CHUNK_SIZE)]
+
+
+def timed(label, size, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  {size / elapsed / 1e6:9.1f} MB/s")
+    return result
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    for dirty in (False, True):
+        data, count = build_export(size_mb, dirty)
+        chunks = chunked(data)
+        print(f"\n{'Dirty' if dirty else 'Clean'} export: {len(data) / 1e6:.1f} MB, {count} vouchers")
+
+        timed("copy (memcpy baseline)", len(data), lambda: [bytes(bytearray(c)) for c in chunks])
+
+        def sanitize():
+            sanitizer = XmlSanitizer()
+            out = [sanitizer.feed(c) for c in chunks]
+            out.append(sanitizer.flush())
+            return out
+        timed("XmlSanitizer.feed", len(data), sanitize)
+
+        timed("iter_elements, sanitize=True", len(data),
+              lambda: sum(1 for _ in iter_elements(chunks, "VOUCHER")))
+        if not dirty:
+            timed("iter_elements, sanitize=False", len(data),
+                  lambda: sum(1 for _ in iter_elements(chunks, "VOUCHER", sanitize=False)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date as date_type
+
+from incrementalSync import SyncState, Watermark, CompanyAlterIds, sync_collection, SYNC_KINDS, RECONCILE_AUTO
+from tallyRecords import Ledger, Group, StockItem, Voucher, LedgerEntry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledgers (
+    company TEXT NOT NULL, master_id INTEGER NOT NULL, alter_id INTEGER, guid TEXT, name TEXT, parent TEXT,
+    opening_balance TEXT, closing_balance TEXT,
+    PRIMARY KEY (company, master_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ledgers_name_nocase ON ledgers (company, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ledgers_parent_nocase ON ledgers (company, parent COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ledgers_guid ON ledgers (guid);
+
+CREATE TABLE IF NOT EXISTS groups (
+    company TEXT NOT NULL, master_id INTEGER NOT NULL, alter_id INTEGER, guid TEXT, name TEXT, parent TEXT,
+    PRIMARY KEY (company, master_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS groups_name_nocase ON groups (company, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS groups_parent_nocase ON groups (company, parent COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS groups_guid ON groups (guid);
+
+CREATE TABLE IF NOT EXISTS stock_items (
+    company TEXT NOT NULL, master_id INTEGER NOT NULL, alter_id INTEGER, guid TEXT, name TEXT, parent TEXT,
+    base_units TEXT, opening_balance TEXT, closing_balance TEXT, closing_value TEXT,
+    PRIMARY KEY (company, master_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stock_items_name_nocase ON stock_items (company, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS stock_items_guid ON stock_items (guid);
+
+CREATE TABLE IF NOT EXISTS vouchers (
+    company TEXT NOT NULL, master_id INTEGER NOT NULL, alter_id INTEGER, guid TEXT, voucher_type TEXT,
+    voucher_number TEXT, date TEXT, party_ledger_name TEXT, narration TEXT, is_cancelled INTEGER,
+    PRIMARY KEY (company, master_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS vouchers_number ON vouchers (company, voucher_number, date);
+CREATE INDEX IF NOT EXISTS vouchers_date ON vouchers (company, date);
+CREATE INDEX IF NOT EXISTS vouchers_guid ON vouchers (guid);
+
+CREATE TABLE IF NOT EXISTS voucher_entries (
+    company TEXT NOT NULL, master_id INTEGER NOT NULL, position INTEGER NOT NULL, ledger_name TEXT,
+    amount TEXT, is_deemed_positive INTEGER,
+    PRIMARY KEY (company, master_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS voucher_entries_ledger ON voucher_entries (company, ledger_name);
+
+CREATE TABLE IF NOT EXISTS sync_status (
+    company TEXT NOT NULL, kind TEXT NOT NULL, alter_id INTEGER, objects INTEGER, changed INTEGER,
+    deleted INTEGER, synced_at REAL, duration REAL, probe_alter_id INTEGER,
+    PRIMARY KEY (company, kind)
+) WITHOUT ROWID;
+"""
+_DROP_CASE_SENSITIVE_INDEXES = """
+DROP INDEX IF EXISTS ledgers_name;
+DROP INDEX IF EXISTS ledgers_parent;
+DROP INDEX IF EXISTS groups_name;
+DROP INDEX IF EXISTS groups_parent;
+DROP INDEX IF EXISTS stock_items_name;
+"""
+
+# Record columns as stored, in table order after (company, master_id)
+_LEDGER_COLUMNS = "alter_id, guid, name, parent, opening_balance, closing_balance"
+_GROUP_COLUMNS = "alter_id, guid, name, parent"
+_STOCK_ITEM_COLUMNS = ("alter_id, guid, name, parent, base_units, opening_balance, closing_balance, "
+                       "closing_value")
+_VOUCHER_COLUMNS = "alter_id, guid, voucher_type, voucher_number, date, party_ledger_name, narration, is_cancelled"
+
+
+def _ledger_row(company, record):
+    return (company, record.master_id, record.alter_id, record.guid, record.name, record.parent,
+            record._opening_balance, record._closing_balance)
+
+
+def _group_row(company, record):
+    return (company, record.master_id, record.alter_id, record.guid, record.name, record.parent)
+
+
+def _stock_item_row(company, record):
+    return (company, record.master_id, record.alter_id, record.guid, record.name, record.parent, record.base_units,
+            record.opening_balance, record.closing_balance, record._closing_value)
+
+
+def _voucher_row(company, record):
+    return (company, record.master_id, record.alter_id, record.guid, record.voucher_type, record.voucher_number,
+            record._date, record.party_ledger_name, record.narration, int(record.is_cancelled))
+
+
+def _ledger(master_id, alter_id, guid, name, parent, opening_balance, closing_balance):
+    return Ledger(name, parent, master_id, alter_id, guid, opening_balance, closing_balance)
+
+
+def _group(master_id, alter_id, guid, name, parent):
+    return Group(name, parent, master_id, alter_id, guid)
+
+
+def _stock_item(master_id, alter_id, guid, name, parent, base_units, opening_balance, closing_balance,
+                closing_value):
+    return StockItem(name, parent, base_units, master_id, alter_id, guid, opening_balance, closing_balance,
+                     closing_value)
+
+
+# Sync kind -> (table, stored columns, row builder, record builder)
+_TABLES = {
+    "ledgers": ("ledgers", _LEDGER_COLUMNS, _ledger_row, _ledger),
+    "groups": ("groups", _GROUP_COLUMNS, _group_row, _group),
+    "stock_items": ("stock_items", _STOCK_ITEM_COLUMNS, _stock_item_row, _stock_item),
+    "vouchers": ("vouchers", _VOUCHER_COLUMNS, _voucher_row, None),
+}
+
+
+def _tally_date(value):
+    # Mirror dates are Tally's YYYYMMDD text
+    if isinstance(value, date_type):
+        return value.strftime("%Y%m%d")
+    return value.replace("-", "") if value else value
+
+
+class TallyMirror:
+    """
+    On-disk SQLite copy of Tally companies for fast local lookups.
+
+    The mirror is filled by incremental sync (only objects altered since the last run are
+    exported, deletions are reconciled); the sync watermarks are derived from the mirrored
+    rows themselves. Lookups are indexed by MasterID, GUID, name, voucher number and date,
+    and never touch Tally. Names are compared without regard to case like Tally does
+    (SQLite's NOCASE, which folds ASCII letters). The database runs in WAL mode, so other TallyMirror instances
+    (one per thread or process) can read while a sync writes.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) a mirror database
+
+        Args:
+            path (str): SQLite database file, or ":memory:"
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        # Mirrors created before names were compared without regard to case
+        self.connection.executescript(_DROP_CASE_SENSITIVE_INDEXES)
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(sync_status)")}
+        if "probe_alter_id" not in columns:
+            # Mirrors created before AlterID probes
+            self.connection.execute("ALTER TABLE sync_status ADD COLUMN probe_alter_id INTEGER")
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the database connection
+        """
+        self.connection.close()
+
+    # -------------------- Sync --------------------
+
+    def _watermark(self, company, kind):
+        table = _TABLES[kind][0]
+        ids = {row[0] for row in self.connection.execute(f"SELECT master_id FROM {table} WHERE company = ?",
+                                                         (company,))}
+        row = self.connection.execute("SELECT alter_id, probe_alter_id FROM sync_status "
+                                      "WHERE company = ? AND kind = ?", (company, kind)).fetchone()
+        if row is None:
+            return Watermark(0, ids)
+        return Watermark(row[0] or 0, ids, row[1])
+
+    def sync(self, client, company_name=None, kinds=tuple(SYNC_KINDS), reconcile=RECONCILE_AUTO, probe=True):
+        """
+        Bring the mirror of a company up to date from Tally
+
+        With probe, one AlterID probe is sent first and every kind whose company alteration
+        ID has not moved since its last sync is skipped without further requests.
+
+        Args:
+            client (TallyClient): Connected client
+            company_name (str, optional): Company name. Default: None (current company)
+            kinds (iterable, optional): Kinds to sync. Default: ledgers, groups, stock_items, vouchers
+            reconcile (str, optional): Deletion check, as for sync_collection. Default: "auto"
+            probe (bool, optional): Check the company's alteration IDs first. Default: True
+
+        Returns:
+            dict: {kind: ChangeSet}
+
+        Raises:
+            requests.exceptions.RequestException: If a request to Tally fails (kinds synced
+                                                   before the failure are kept)
+        """
+        company = company_name or ""
+        if probe:
+            probe = client.probe_alter_ids(company_name)
+            if not isinstance(probe, CompanyAlterIds):
+                logging.warning(f"AlterID probe unavailable ({probe}); syncing without it")
+                probe = False
+        results = {}
+        for kind in kinds:
+            started = time.time()
+            state = SyncState({company: {kind: self._watermark(company, kind)}})
+            changes = sync_collection(client, kind, state, company_name, reconcile, probe)
+            self.apply(changes, synced_at=started, duration=time.time() - started)
+            results[kind] = changes
+        return results
+
+    def apply(self, changes, synced_at=None, duration=None):
+        """
+        Write a ChangeSet to the mirror in one transaction
+
+        Args:
+            changes (ChangeSet): Result of sync_collection / TallyClient.sync_changes
+            synced_at (float, optional): Time the sync started. Default: now
+            duration (float, optional): Seconds the sync took
+        """
+        company = changes.company_name or ""
+        table, columns, build_row, _ = _TABLES[changes.kind]
+        records = [record for record in changes.changed if record.master_id is not None]
+        placeholders = ", ".join("?" * (len(columns.split(",")) + 2))
+        with self._lock, self.connection:
+            execute = self.connection.execute
+            if changes.full:
+                execute(f"DELETE FROM {table} WHERE company = ?", (company,))
+                if changes.kind == "vouchers":
+                    execute("DELETE FROM voucher_entries WHERE company = ?", (company,))
+            self.connection.executemany(f"INSERT OR REPLACE INTO {table} (company, master_id, {columns}) "
+                                        f"VALUES ({placeholders})", [build_row(company, r) for r in records])
+            removed = [(company, master_id) for master_id in changes.deleted]
+            self.connection.executemany(f"DELETE FROM {table} WHERE company = ? AND master_id = ?", removed)
+            if changes.kind == "vouchers":
+                stale = removed + [(company, record.master_id) for record in records]
+                self.connection.executemany("DELETE FROM voucher_entries WHERE company = ? AND master_id = ?", stale)
+                self.connection.executemany(
+                    "INSERT INTO voucher_entries (company, master_id, position, ledger_name, amount, "
+                    "is_deemed_positive) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(company, record.master_id, position, entry.ledger_name, entry._amount,
+                      int(entry.is_deemed_positive))
+                     for record in records for position, entry in enumerate(record.ledger_entries)])
+            objects = execute(f"SELECT COUNT(*) FROM {table} WHERE company = ?", (company,)).fetchone()[0]
+            execute("INSERT OR REPLACE INTO sync_status (company, kind, alter_id, objects, changed, deleted, "
+                    "synced_at, duration, probe_alter_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (company, changes.kind, changes.alter_id, objects, len(records), len(changes.deleted),
+                     synced_at if synced_at is not None else time.time(), duration, changes.probe_alter_id))
+
+    def freshness(self, company_name=None):
+        """
+        When each kind of a company was last synced
+
+        Args:
+            company_name (str, optional): Company name. Default: None (current company)
+
+        Returns:
+            dict: {kind: {"alter_id", "objects", "changed", "deleted", "synced_at", "duration", "age"}}
+                  with synced_at as a Unix timestamp and age in seconds
+        """
+        now = time.time()
+        rows = self.connection.execute("SELECT kind, alter_id, objects, changed, deleted, synced_at, duration "
+                                       "FROM sync_status WHERE company = ?", (company_name or "",))
+        return {
+            kind: {"alter_id": alter_id, "objects": objects, "changed": changed, "deleted": deleted,
+                   "synced_at": synced_at, "duration": duration, "age": now - synced_at}
+            for kind, alter_id, objects, changed, deleted, synced_at, duration in rows
+        }
+
+    # -------------------- Lookups --------------------
+
+    def _one(self, kind, where, params):
+        table, columns, _, build = _TABLES[kind]
+        row = self.connection.execute(f"SELECT master_id, {columns} FROM {table} WHERE {where} LIMIT 1",
+                                      params).fetchone()
+        return build(*row) if row else None
+
+    def _many(self, kind, where, params, order="name"):
+        table, columns, _, build = _TABLES[kind]
+        return [build(*row) for row in self.connection.execute(
+            f"SELECT master_id, {columns} FROM {table} WHERE {where} ORDER BY {order}", params)]
+
+    def ledger_by_name(self, ledger_name, company_name=None):
+        """
+        Look up a mirrored ledger by name
+
+        Args:
+            ledger_name (str): Ledger name
+            company_name (str, optional): Company name. Default: None (current company)
+
+        Returns:
+            Ledger: Ledger record, or None if it is not in the mirror
+        """
+        return self._one("ledgers", "company = ? AND name = ? COLLATE NOCASE", (company_name or "", ledger_name))
+
+    def ledger_by_master_id(self, master_id, company_name=None):
+        """
+        Look up a mirrored ledger by MasterID
+
+        Returns:
+            Ledger: Ledger record, or None
+        """
+        return self._one("ledgers", "company = ? AND master_id = ?", (company_name or "", int(master_id)))
+
+    def ledger_by_guid(self, guid):
+        """
+        Look up a mirrored ledger by GUID (unique across companies)
+
+        Returns:
+            Ledger: Ledger record, or None
+        """
+        return self._one("ledgers", "guid = ?", (guid,))
+
+    def group_by_name(self, group_name, company_name=None):
+        """
+        Look up a mirrored group by name
+
+        Returns:
+            Group: Group record, or None
+        """
+        return self._one("groups", "company = ? AND name = ? COLLATE NOCASE", (company_name or "", group_name))
+
+    def stock_item_by_name(self, stock_item_name, company_name=None):
+        """
+        Look up a mirrored stock item by name
+
+        Returns:
+            StockItem: Stock item record, or None
+        """
+        return self._one("stock_items", "company = ? AND name = ? COLLATE NOCASE",
+                         (company_name or "", stock_item_name))
+
+    def stock_item_by_master_id(self, master_id, company_name=None):
+        """
+        Look up a mirrored stock item by MasterID
+
+        Returns:
+            StockItem: Stock item record, or None
+        """
+        return self._one("stock_items", "company = ? AND master_id = ?", (company_name or "", int(master_id)))
+
+    def group_members(self, group_name, company_name=None, recursive=False):
+        """
+        Ledgers under a group
+
+        Args:
+            group_name (str): Group name
+            company_name (str, optional): Company name. Default: None (current company)
+            recursive (bool, optional): Include ledgers of sub-groups at any depth. Default: False
+
+        Returns:
+            list: Ledger records, by name
+        """
+        company = company_name or ""
+        if not recursive:
+            return self._many("ledgers", "company = ? AND parent = ? COLLATE NOCASE", (company, group_name))
+        table, columns, _, build = _TABLES["ledgers"]
+        rows = self.connection.execute(
+            "WITH RECURSIVE tree(name) AS (SELECT ? UNION "
+            "SELECT groups.name FROM groups JOIN tree ON groups.parent = tree.name COLLATE NOCASE "
+            "WHERE groups.company = ?) "
+            f"SELECT master_id, {columns} FROM ledgers WHERE company = ? "
+            "AND parent COLLATE NOCASE IN (SELECT name FROM tree) "
+            "ORDER BY name", (group_name, company, company))
+        return [build(*row) for row in rows]
+
+    def _vouchers(self, where, params):
+        rows = self.connection.execute(f"SELECT master_id, {_VOUCHER_COLUMNS} FROM vouchers WHERE {where} "
+                                       "ORDER BY date, master_id", params).fetchall()
+        if not rows:
+            return []
+        company = params[0]
+        entries = {}
+        master_ids = [row[0] for row in rows]
+        # Entries of up to 500 vouchers per query keep the IN list under SQLite's variable limit
+        for start in range(0, len(master_ids), 500):
+            chunk = master_ids[start:start + 500]
+            for master_id, ledger_name, amount, is_deemed_positive in self.connection.execute(
+                    "SELECT master_id, ledger_name, amount, is_deemed_positive FROM voucher_entries "
+                    f"WHERE company = ? AND master_id IN ({', '.join('?' * len(chunk))}) "
+                    "ORDER BY master_id, position", (company, *chunk)):
+                entries.setdefault(master_id, []).append(LedgerEntry(ledger_name, amount, bool(is_deemed_positive)))
+        return [
+            Voucher(master_id, alter_id, guid, voucher_type, voucher_number, voucher_date, party_ledger_name,
+                    narration, bool(is_cancelled), tuple(entries.get(master_id, ())))
+            for master_id, alter_id, guid, voucher_type, voucher_number, voucher_date, party_ledger_name,
+            narration, is_cancelled in rows
+        ]
+
+    def voucher_by_master_id(self, master_id, company_name=None):
+        """
+        Look up a mirrored voucher (with its ledger entries) by MasterID
+
+        Args:
+            master_id (int or str): Voucher MasterID
+            company_name (str, optional): Company name. Default: None (current company)
+
+        Returns:
+            Voucher: Voucher record, or None
+        """
+        vouchers = self._vouchers("company = ? AND master_id = ?", (company_name or "", int(master_id)))
+        return vouchers[0] if vouchers else None
+
+    def voucher_by_guid(self, guid):
+        """
+        Look up a mirrored voucher by GUID
+
+        Returns:
+            Voucher: Voucher record, or None
+        """
+        row = self.connection.execute("SELECT company, master_id FROM vouchers WHERE guid = ? LIMIT 1",
+                                      (guid,)).fetchone()
+        return self.voucher_by_master_id(row[1], row[0]) if row else None
+
+    def voucher_by_number_and_date(self, voucher_date, voucher_number, company_name=None):
+        """
+        Look up a mirrored voucher by number and date
+
+        Args:
+            voucher_date (str or date): Voucher date (YYYYMMDD, YYYY-MM-DD or a date)
+            voucher_number (str): Voucher number
+            company_name (str, optional): Company name. Default: None (current company)
+
+        Returns:
+            Voucher: Voucher record, or None
+        """
+        vouchers = self._vouchers("company = ? AND voucher_number = ? AND date = ?",
+                                  (company_name or "", str(voucher_number), _tally_date(voucher_date)))
+        return vouchers[0] if vouchers else None
+
+    def vouchers_between(self, from_date, to_date, company_name=None, voucher_type=None):
+        """
+        Mirrored vouchers dated from_date to to_date (inclusive)
+
+        Args:
+            from_date (str or date): First date (YYYYMMDD, YYYY-MM-DD or a date)
+            to_date (str or date): Last date
+            company_name (str, optional): Company name. Default: None (current company)
+            voucher_type (str, optional): Only vouchers of this type. Default: None (all)
+
+        Returns:
+            list: Voucher records, by date
+        """
+        where = "company = ? AND date BETWEEN ? AND ?"
+        params = (company_name or "", _tally_date(from_date), _tally_date(to_date))
+        if voucher_type:
+            where += " AND voucher_type = ?"
+            params += (voucher_type,)
+        return self._vouchers(where, params)
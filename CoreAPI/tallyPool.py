@@ -0,0 +1,296 @@
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from requestScheduler import IMPORT
+from xmlFunctions import TallyClient
+
+# Seconds before an endpoint that failed its health check is tried again
+DEFAULT_HEALTH_INTERVAL = 30.0
+
+
+class PoolEndpoint:
+    """
+    One Tally instance of a pool: its client, the companies it has loaded and its health
+    """
+    __slots__ = ("client", "companies", "healthy", "checked_at", "in_flight")
+
+    def __init__(self, client):
+        self.client = client
+        self.companies = {}    # {casefolded company name: company name as Tally reports it}
+        self.healthy = True
+        self.checked_at = 0.0  # time.monotonic() of the last health check
+        self.in_flight = 0     # calls routed here that have not returned yet
+
+    def __repr__(self):
+        return (f"PoolEndpoint({self.client.endpoint!r}, companies={sorted(self.companies.values())}, "
+                f"healthy={self.healthy}, in_flight={self.in_flight})")
+
+
+class TallyPool:
+    """
+    Several Tally instances used as one client, routed by company.
+
+    Each endpoint's loaded companies come from list_tally_companies. Calls are routed by
+    their company_name argument to a healthy endpoint holding that company; when several
+    hold it (replicas), reads go to the one with the fewest calls in flight. Endpoints
+    that fail test_connection or drop a connection are skipped until they pass a health
+    check again.
+
+    Example:
+        pool = TallyPool([("http://tally-a", 9000), ("http://tally-b", 9000)])
+        pool.get_ledgers_list("Company A")
+        pool.map_companies(lambda client, company: client.get_ledger_balances(company))
+    """
+
+    def __init__(self, endpoints, health_interval=DEFAULT_HEALTH_INTERVAL, discover=True, **client_options):
+        """
+        Initialize TallyPool
+
+        Args:
+            endpoints (list): TallyClient instances, (tally_url, tally_port) tuples or "http://host:port" strings
+            health_interval (float, optional): Seconds before an unhealthy endpoint is checked again. Default: 30
+            discover (bool, optional): Check every endpoint and list its companies now. Default: True
+            **client_options: Keyword arguments for the TallyClient of each non-client endpoint
+
+        The pool turns on raise_transport_errors on every endpoint client (including clients passed
+        in), so connection failures reach it as exceptions instead of "Error: ..." strings.
+        """
+        self.health_interval = health_interval
+        self.endpoints = [PoolEndpoint(self._make_client(endpoint, client_options)) for endpoint in endpoints]
+        if not self.endpoints:
+            raise ValueError("TallyPool needs at least one endpoint")
+        for endpoint in self.endpoints:
+            endpoint.client.raise_transport_errors = True
+        self._lock = threading.Lock()
+        self._turn = 0
+        self._signatures = {}
+        if discover:
+            self.refresh()
+
+    @staticmethod
+    def _make_client(endpoint, client_options):
+        if isinstance(endpoint, TallyClient):
+            return endpoint
+        if isinstance(endpoint, str):
+            tally_url, _, tally_port = endpoint.rpartition(":")
+            if not tally_url or not tally_port.isdigit():
+                raise ValueError(f"Endpoint must look like http://host:port: {endpoint!r}")
+            return TallyClient(tally_url, int(tally_port), **client_options)
+        tally_url, tally_port = endpoint
+        return TallyClient(tally_url, tally_port, **client_options)
+
+    def _check(self, endpoint, discover):
+        healthy = endpoint.client.test_connection()
+        if healthy and discover:
+            companies = endpoint.client.list_tally_companies()
+            if companies is None:
+                healthy = False
+            else:
+                endpoint.companies = {name.casefold(): name for name in companies}
+        with self._lock:
+            if endpoint.healthy and not healthy:
+                logging.warning(f"Tally endpoint {endpoint.client.endpoint} failed its health check")
+            endpoint.healthy = healthy
+            endpoint.checked_at = time.monotonic()
+        return healthy
+
+    def _check_all(self, discover):
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            return list(executor.map(lambda endpoint: self._check(endpoint, discover), self.endpoints))
+
+    def refresh(self):
+        """
+        Health-check every endpoint and re-read the companies each one has loaded, in parallel
+
+        Returns:
+            dict: {company_name: [endpoint URLs]} for the healthy endpoints
+        """
+        self._check_all(discover=True)
+        return self.companies()
+
+    def health_check(self):
+        """
+        Run test_connection on every endpoint, in parallel
+
+        Returns:
+            dict: {endpoint URL: bool}
+        """
+        results = self._check_all(discover=False)
+        return {endpoint.client.endpoint: healthy for endpoint, healthy in zip(self.endpoints, results)}
+
+    def companies(self):
+        """
+        Companies of the healthy endpoints
+
+        Returns:
+            dict: {company_name: [endpoint URLs holding it]}
+        """
+        companies = {}
+        for endpoint in self.endpoints:
+            if endpoint.healthy:
+                for name in endpoint.companies.values():
+                    companies.setdefault(name, []).append(endpoint.client.endpoint)
+        return companies
+
+    def _candidates(self, company_name):
+        # Healthy endpoints holding the company; unhealthy ones are re-checked once their interval passed
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            if not endpoint.healthy and now - endpoint.checked_at >= self.health_interval:
+                self._check(endpoint, discover=True)
+        if company_name is None:
+            if len(self.endpoints) > 1:
+                raise ValueError("company_name is needed to route a call in a pool of several endpoints")
+            return [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        key = company_name.casefold()
+        return [endpoint for endpoint in self.endpoints if endpoint.healthy and key in endpoint.companies]
+
+    def _acquire(self, company_name, exclude=()):
+        candidates = [endpoint for endpoint in self._candidates(company_name) if endpoint not in exclude]
+        if not candidates:
+            raise LookupError(f"No healthy Tally endpoint has company {company_name!r} loaded")
+        with self._lock:
+            # Fewest calls in flight; ties rotate so replicas share the load
+            self._turn += 1
+            start = self._turn % len(candidates)
+            rotated = candidates[start:] + candidates[:start]
+            endpoint = min(rotated, key=lambda candidate: candidate.in_flight)
+            endpoint.in_flight += 1
+        return endpoint
+
+    def _release(self, endpoint):
+        with self._lock:
+            endpoint.in_flight -= 1
+
+    def client_for(self, company_name=None):
+        """
+        Client of the least busy healthy endpoint holding a company
+
+        Args:
+            company_name (str, optional): Company name; may only be None in a pool of one endpoint
+
+        Returns:
+            TallyClient: Client to use directly (its calls are not counted for load balancing)
+
+        Raises:
+            LookupError: If no healthy endpoint has the company loaded
+        """
+        endpoint = self._acquire(company_name)
+        self._release(endpoint)
+        return endpoint.client
+
+    def _company_argument(self, method_name, args, kwargs):
+        signature = self._signatures.get(method_name)
+        if signature is None:
+            signature = self._signatures[method_name] = inspect.signature(getattr(TallyClient, method_name))
+        try:
+            bound = signature.bind(None, *args, **kwargs)
+        except TypeError:
+            return None
+        return bound.arguments.get("company_name")
+
+    def call(self, method_name, *args, **kwargs):
+        """
+        Call a TallyClient method on an endpoint chosen by its company_name argument
+
+        A read that fails with a connection error marks the endpoint unhealthy and is
+        retried on another replica; imports are not retried, as Tally may have applied them.
+        Streaming methods (iter_*) return before their response is read, so they are routed
+        but neither counted as in flight nor retried.
+
+        Args:
+            method_name (str): TallyClient method name
+            *args, **kwargs: Method arguments
+
+        Returns:
+            The method's return value
+
+        Raises:
+            LookupError: If no healthy endpoint has the company loaded
+            ValueError: If the call has no company_name and the pool has several endpoints
+            requests.exceptions.RequestException: If the call failed on the transport and no replica
+                                                  is left to retry on (or it was an import), or timed out
+        """
+        company_name = self._company_argument(method_name, args, kwargs)
+        tried = []
+        while True:
+            endpoint = self._acquire(company_name, tried)
+            try:
+                return getattr(endpoint.client, method_name)(*args, **kwargs)
+            except RequestsConnectionError:
+                with self._lock:
+                    endpoint.healthy = False
+                    endpoint.checked_at = time.monotonic()
+                logging.warning(f"Tally endpoint {endpoint.client.endpoint} dropped the connection")
+                tried.append(endpoint)
+                if endpoint.client.method_lanes.get(method_name) == IMPORT or not self._candidates(company_name):
+                    raise
+            finally:
+                self._release(endpoint)
+
+    def __getattr__(self, name):
+        # pool.get_ledgers_list("Company") -> pool.call("get_ledgers_list", "Company")
+        if name.startswith("_") or not callable(getattr(TallyClient, name, None)):
+            raise AttributeError(name)
+
+        def routed(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+        routed.__name__ = name
+        return routed
+
+    def map_companies(self, function, companies=None, max_workers=None):
+        """
+        Run function(client, company_name) for each company, in parallel across endpoints
+
+        Each company runs on an endpoint holding it, so exports of companies on different
+        machines proceed at the same time (calls to one endpoint still queue in its scheduler).
+
+        Args:
+            function (callable): function(client, company_name) -> result
+            companies (iterable, optional): Company names. Default: None (every company in the pool)
+            max_workers (int, optional): Threads. Default: None (one per company)
+
+        Returns:
+            dict: {company_name: result}; a company whose call raised maps to the exception
+        """
+        companies = list(companies) if companies is not None else list(self.companies())
+        if not companies:
+            return {}
+
+        def run(company_name):
+            try:
+                endpoint = self._acquire(company_name)
+            except LookupError as e:
+                return e
+            try:
+                return function(endpoint.client, company_name)
+            except Exception as e:
+                logging.error(f"{company_name} on {endpoint.client.endpoint} failed: {e}")
+                return e
+            finally:
+                self._release(endpoint)
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(companies)) as executor:
+            return dict(zip(companies, executor.map(run, companies)))
+
+    def close(self):
+        """
+        Close the HTTP sessions of all endpoints
+        """
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        healthy = sum(endpoint.healthy for endpoint in self.endpoints)
+        return f"TallyPool(endpoints={len(self.endpoints)}, healthy={healthy})"
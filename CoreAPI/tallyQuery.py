@@ -0,0 +1,563 @@
+from decimal import Decimal
+from functools import lru_cache
+
+from envelopeTemplates import envelope, element
+from fieldProjection import native_methods
+from dateSharding import parse_range_date
+from tallyRecords import Ledger, Group, StockItem, Voucher, parse_tally_amount
+from keysetPagination import DEFAULT_PAGE_SIZE, iter_pages
+
+# Query kind -> (Tally object type, XML tag of one object, record class)
+QUERY_KINDS = {
+    "vouchers": ("Voucher", "VOUCHER", Voucher),
+    "ledgers": ("Ledger", "LEDGER", Ledger),
+    "groups": ("Group", "GROUP", Group),
+    "stock_items": ("StockItem", "STOCKITEM", StockItem),
+}
+
+# Lookup name -> (Tally method, value type) per object type
+_MASTER_FIELDS = {
+    "name": ("Name", "str"),
+    "parent": ("Parent", "str"),
+    "master_id": ("MasterID", "num"),
+    "alter_id": ("AlterID", "num"),
+    "guid": ("GUID", "str"),
+}
+QUERY_FIELDS = {
+    "Voucher": {
+        "type": ("VoucherTypeName", "str"),
+        "number": ("VoucherNumber", "str"),
+        "date": ("Date", "date"),
+        "amount": ("Amount", "num"),
+        "party": ("PartyLedgerName", "str"),
+        "narration": ("Narration", "str"),
+        "master_id": ("MasterID", "num"),
+        "alter_id": ("AlterID", "num"),
+        "guid": ("GUID", "str"),
+        "is_cancelled": ("IsCancelled", "bool"),
+        # Any ledger entry of the voucher (compiled to a $$FilterCount over AllLedgerEntries)
+        "ledger": ("LedgerName", "entries"),
+    },
+    "Ledger": dict(_MASTER_FIELDS, opening_balance=("OpeningBalance", "num"),
+                   closing_balance=("ClosingBalance", "num")),
+    "Group": dict(_MASTER_FIELDS),
+    "StockItem": dict(_MASTER_FIELDS, base_units=("BaseUnits", "str"), closing_value=("ClosingValue", "num")),
+}
+
+# Lookup suffix -> TDL operator (XML-escaped, as it appears in the template)
+_OPERATORS = {
+    "eq": "=",
+    "ne": "!=",
+    "gt": "&gt;",
+    "gte": "&gt;=",
+    "lt": "&lt;",
+    "lte": "&lt;=",
+    "in": "=",
+    "contains": "CONTAINS",
+    "startswith": "STARTING WITH",
+}
+_ORDERED = ("gt", "gte", "lt", "lte")
+_TEXT_ONLY = ("contains", "startswith")
+
+# Voucher aggregation keys: name -> (TDL BY formula, XML tag, sub-collections walked to reach it).
+# Methods of the voucher (party, type, date) resolve from inside walked entries, so keys of
+# different levels can be combined; the deepest walk decides what $Amount and count refer to.
+_ENTRY_WALK = ("AllLedgerEntries",)
+_COST_CENTRE_WALK = ("AllLedgerEntries", "CategoryAllocations", "CostCentreAllocations")
+AGGREGATE_KEYS = {
+    "party": ("$PartyLedgerName", "PARTY", ()),
+    "voucher_type": ("$VoucherTypeName", "VOUCHERTYPE", ()),
+    "month": ("($$YearOfDate:$Date * 100) + $$MonthOfDate:$Date", "MONTH", ()),
+    "ledger": ("$LedgerName", "LEDGER", _ENTRY_WALK),
+    "cost_centre": ("$Name", "COSTCENTRE", _COST_CENTRE_WALK),
+}
+# Measure -> (AGGRCOMPUTE function and formula, field type)
+AGGREGATE_MEASURES = {
+    "sum": ("SUM : $Amount", "Amount"),
+    "count": ("SUM : 1", "Number"),
+    "min": ("MIN : $Amount", "Amount"),
+    "max": ("MAX : $Amount", "Amount"),
+}
+
+
+def _literal(value, value_type):
+    """
+    Render a Python value as a TDL literal (before XML escaping)
+    """
+    if value_type == "bool":
+        return "Yes" if value else "No"
+    if value_type == "num":
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+            raise ValueError(f"Expected a number, got {value!r}")
+        return str(value)
+    if value_type == "date":
+        day, _ = parse_range_date(value)
+        return f'$$Date:"{day.strftime("%d-%b-%Y")}"'
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a string, got {value!r}")
+    # TDL writes a quote inside a string literal as two quotes
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _parse_lookup(object_type, lookup):
+    field, _, operator = lookup.partition("__")
+    operator = operator or "eq"
+    fields = QUERY_FIELDS[object_type]
+    if field not in fields:
+        raise ValueError(f"Unknown {object_type} field: {field}")
+    if operator not in _OPERATORS:
+        raise ValueError(f"Unknown operator: {operator}")
+    method, value_type = fields[field]
+    if value_type == "entries" and operator not in ("eq", "in"):
+        raise ValueError(f"{field} only supports equality and __in")
+    if operator in _ORDERED and value_type not in ("num", "date"):
+        raise ValueError(f"{field} cannot be compared with __{operator}")
+    if operator in _TEXT_ONLY and value_type != "str":
+        raise ValueError(f"{field} does not support __{operator}")
+    return field, operator, method, value_type
+
+
+def _filter_source(object_type, shape):
+    """
+    FILTERS element and SYSTEM formulae for a query shape: the (field, operator, value count)
+    of each predicate. Values are slots v0, v1, ...
+    """
+    fields = QUERY_FIELDS[object_type]
+    conditions = []
+    formulae = []
+    slot = 0
+    for field, operator, count in shape:
+        method, value_type = fields[field]
+        tdl_operator = _OPERATORS[operator]
+        comparisons = []
+        for _ in range(count):
+            comparisons.append(f"${method} {tdl_operator} {{v{slot}}}")
+            slot += 1
+        joined = " OR ".join(comparisons) if comparisons else "No"
+        if value_type == "entries":
+            name = f"QueryEntries{len(formulae)}"
+            formulae.append(f'<SYSTEM TYPE="Formulae" NAME="{name}">{joined}</SYSTEM>')
+            conditions.append(f"($$FilterCount:AllLedgerEntries:{name} &gt; 0)")
+        else:
+            conditions.append(f"({joined})")
+    filters = ""
+    if conditions:
+        filters = "<FILTERS>QueryFilter</FILTERS>"
+        formulae.insert(0, f'<SYSTEM TYPE="Formulae" NAME="QueryFilter">{" AND ".join(conditions)}</SYSTEM>')
+    return filters, "".join(formulae)
+
+
+@lru_cache(maxsize=256)
+def _compile_shape(object_type, shape):
+    """
+    Envelope source for a query shape. Queries that differ only in their values share one
+    compiled template.
+    """
+    filters, formulae = _filter_source(object_type, shape)
+    return f"""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Collection</TYPE>
+        <ID>Query</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                {{company_element:xml}}
+                {{period:xml}}
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Query">
+                        <TYPE>{object_type}</TYPE>
+                        {{field_elements:xml}}
+                        {filters}
+                    </COLLECTION>
+                    {formulae}
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>"""
+
+
+def _report_source(name, columns, rows, filters, formulae, object_type="Voucher"):
+    """
+    Envelope source of a one-line-per-row report. columns are (method, XML tag, field type)
+    of the rows collection, which is built from the filtered "Query" collection by rows.
+    """
+    field_names = [f"{name}{method}" for method, _, _ in columns]
+    field_definitions = "".join(
+        f'<FIELD ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="{field_name}">'
+        f"{f'<TYPE>{field_type}</TYPE>' if field_type else ''}<SET>${method}</SET><XMLTAG>{tag}</XMLTAG></FIELD>"
+        for field_name, (method, tag, field_type) in zip(field_names, columns)
+    )
+    left_fields = "".join(f"<LEFTFIELDS>{field_name}</LEFTFIELDS>" for field_name in field_names)
+
+    return f"""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Data</TYPE>
+        <ID>{name}</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                {{company_element:xml}}
+                {{period:xml}}
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <REPORT ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="{name}">
+                        <FORMS>{name}</FORMS>
+                    </REPORT>
+                    <FORM ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="{name}">
+                        <TOPPARTS>{name}</TOPPARTS>
+                        <XMLTAG>{name}</XMLTAG>
+                    </FORM>
+                    <PART ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="{name}">
+                        <TOPLINES>{name}</TOPLINES>
+                        <REPEAT>{name} : {name}Rows</REPEAT>
+                        <SCROLLED>Vertical</SCROLLED>
+                    </PART>
+                    <LINE ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="{name}">
+                        {left_fields}
+                        <XMLTAG>ROW</XMLTAG>
+                    </LINE>
+                    {field_definitions}
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="{name}Rows">
+                        <SOURCECOLLECTION>Query</SOURCECOLLECTION>
+                        {rows}
+                    </COLLECTION>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Query">
+                        <TYPE>{object_type}</TYPE>
+                        {filters}
+                    </COLLECTION>
+                    {formulae}
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>"""
+
+
+@lru_cache(maxsize=256)
+def _compile_aggregate(shape, by, measures):
+    """
+    Envelope source of a grouped voucher report: the filtered vouchers are walked down to the
+    deepest key's level and aggregated with BY / AGGRCOMPUTE; one ROW line is exported per group.
+    """
+    filters, formulae = _filter_source("Voucher", shape)
+    walk = max((AGGREGATE_KEYS[key][2] for key in by), key=len)
+    rows = f"<WALK>{', '.join(walk)}</WALK>" if walk else ""
+    rows += "".join(f"<BY>Key{position} : {AGGREGATE_KEYS[key][0]}</BY>" for position, key in enumerate(by))
+    rows += "".join(f"<AGGRCOMPUTE>Measure{position} : {AGGREGATE_MEASURES[measure][0]}</AGGRCOMPUTE>"
+                    for position, measure in enumerate(measures))
+    columns = [(f"Key{position}", AGGREGATE_KEYS[key][1], None) for position, key in enumerate(by)]
+    columns += [(f"Measure{position}", measure.upper(), AGGREGATE_MEASURES[measure][1])
+                for position, measure in enumerate(measures)]
+    return _report_source("Aggregate", columns, rows, filters, formulae)
+
+
+@lru_cache(maxsize=256)
+def _compile_bounds(object_type, shape):
+    """
+    Envelope source of a one-row report with the lowest and highest MasterID and the
+    number of objects matching a query shape
+    """
+    filters, formulae = _filter_source(object_type, shape)
+    rows = ("<BY>Scope : 1</BY><AGGRCOMPUTE>FirstId : MIN : $MasterID</AGGRCOMPUTE>"
+            "<AGGRCOMPUTE>LastId : MAX : $MasterID</AGGRCOMPUTE><AGGRCOMPUTE>Objects : SUM : 1</AGGRCOMPUTE>")
+    columns = [("FirstId", "FIRSTID", "Number"), ("LastId", "LASTID", "Number"), ("Objects", "COUNT", "Number")]
+    return _report_source("Bounds", columns, rows, filters, formulae, object_type)
+
+
+def _aggregate_value(text, key_or_measure):
+    text = (text or "").strip()
+    if key_or_measure == "month":
+        return f"{text[:4]}-{text[4:6]}" if len(text) == 6 and text.isdigit() else text or None
+    if key_or_measure == "count":
+        text = text.replace(",", "")
+        return int(text) if text.isdigit() else 0
+    if key_or_measure in AGGREGATE_MEASURES:
+        return parse_tally_amount(text)
+    return text or None
+
+
+class Query:
+    """
+    Filtered export of one kind of object, evaluated inside Tally.
+
+    Predicates are compiled into a SYSTEM Formulae filter of the collection, so only matching
+    objects cross the wire. Queries are immutable; where(), between() and fields() return a
+    new Query. Lookups use Django-style suffixes:
+
+        client.vouchers().where(type="Sales", amount__gte=10000, ledger="X")
+        client.ledgers().where(parent__in=["Sundry Debtors", "Sundry Creditors"])
+
+    Operators: eq (default), ne, gt, gte, lt, lte, in, contains, startswith. Predicates are
+    combined with AND; "in" matches any of its values.
+    """
+
+    def __init__(self, client, kind, company_name=None, predicates=(), period=None, fields="summary"):
+        """
+        Initialize Query
+
+        Args:
+            client (TallyClient): Client to send with
+            kind (str): "vouchers", "ledgers", "groups" or "stock_items"
+            company_name (str, optional): Company name. Default: None (current company)
+            predicates (tuple, optional): (lookup, value) pairs
+            period (tuple, optional): (from_date, to_date) for SVFROMDATE / SVTODATE
+            fields (str or list, optional): Projection, as for get_ledgers_list. Default: "summary"
+        """
+        if kind not in QUERY_KINDS:
+            raise ValueError(f"Unknown query kind: {kind}")
+        self.client = client
+        self.kind = kind
+        self.company_name = company_name
+        self.predicates = tuple(predicates)
+        self.period = period
+        self.field_list = fields
+
+    def _copy(self, **changes):
+        values = {"predicates": self.predicates, "period": self.period, "fields": self.field_list}
+        values.update(changes)
+        return Query(self.client, self.kind, self.company_name, **values)
+
+    def where(self, **lookups):
+        """
+        Add predicates (combined with AND)
+
+        Args:
+            **lookups: field=value or field__operator=value, e.g. amount__gte=10000
+
+        Returns:
+            Query: New query
+
+        Raises:
+            ValueError: If a field or operator is unknown, or a value has the wrong type
+        """
+        object_type = QUERY_KINDS[self.kind][0]
+        for lookup, value in lookups.items():
+            _, operator, _, value_type = _parse_lookup(object_type, lookup)
+            values = value if operator == "in" else (value,)
+            for item in values:
+                _literal(item, value_type)
+        return self._copy(predicates=self.predicates + tuple(lookups.items()))
+
+    def between(self, from_date, to_date):
+        """
+        Limit the query to a period (vouchers: by date; masters: balances for the period)
+
+        Args:
+            from_date (str or datetime.date): First day
+            to_date (str or datetime.date): Last day
+
+        Returns:
+            Query: New query
+        """
+        period = (parse_range_date(from_date)[0], parse_range_date(to_date)[0])
+        query = self._copy(period=period)
+        if self.kind == "vouchers":
+            query = query.where(date__gte=period[0], date__lte=period[1])
+        return query
+
+    def fields(self, fields):
+        """
+        Choose the methods exported for each object
+
+        Args:
+            fields (str or list): Preset ("id-only", "summary", "full") or method names
+
+        Returns:
+            Query: New query
+        """
+        return self._copy(fields=fields)
+
+    def _shape(self):
+        # Query shape and the rendered value of each slot
+        object_type = QUERY_KINDS[self.kind][0]
+        shape = []
+        values = {}
+        for lookup, value in self.predicates:
+            field, operator, _, value_type = _parse_lookup(object_type, lookup)
+            items = list(value) if operator == "in" else [value]
+            for item in items:
+                values[f"v{len(values)}"] = _literal(item, value_type)
+            shape.append((field, operator, len(items)))
+        return tuple(shape), values
+
+    def _static_variables(self):
+        company_element = element("SVCURRENTCOMPANY", self.company_name) if self.company_name else b""
+        period = b""
+        if self.period:
+            period = (element("SVFROMDATE", self.period[0].strftime("%Y%m%d")) +
+                      element("SVTODATE", self.period[1].strftime("%Y%m%d")))
+        return {"company_element": company_element, "period": period}
+
+    def compile(self):
+        """
+        Build the request
+
+        Returns:
+            bytes: XML request body
+        """
+        shape, values = self._shape()
+        template = envelope(_compile_shape(QUERY_KINDS[self.kind][0], shape))
+        field_elements = native_methods(self.field_list, QUERY_KINDS[self.kind][0])
+        return template.render(field_elements=field_elements, **self._static_variables(), **values)
+
+    def compile_aggregate(self, by, measures=("sum", "count")):
+        """
+        Build the grouped report request of aggregate()
+
+        Args:
+            by (str or tuple): Grouping key(s), see aggregate()
+            measures (tuple, optional): Measures, see aggregate()
+
+        Returns:
+            bytes: XML request body
+
+        Raises:
+            ValueError: If the query is not over vouchers, or a key or measure is unknown
+        """
+        if self.kind != "vouchers":
+            raise ValueError("Only voucher queries can be aggregated")
+        by = (by,) if isinstance(by, str) else tuple(by)
+        measures = (measures,) if isinstance(measures, str) else tuple(measures)
+        if not by or not measures:
+            raise ValueError("aggregate needs at least one key and one measure")
+        for key in by:
+            if key not in AGGREGATE_KEYS:
+                raise ValueError(f"Unknown aggregation key: {key}")
+        for measure in measures:
+            if measure not in AGGREGATE_MEASURES:
+                raise ValueError(f"Unknown aggregation measure: {measure}")
+        walks = {AGGREGATE_KEYS[key][2] for key in by if AGGREGATE_KEYS[key][2]}
+        if len(walks) > 1:
+            raise ValueError("ledger and cost_centre cannot be combined")
+        shape, values = self._shape()
+        template = envelope(_compile_aggregate(shape, by, measures))
+        return template.render(**self._static_variables(), **values)
+
+    def aggregate(self, by, measures=("sum", "count")):
+        """
+        Group the matching vouchers inside Tally and return one row per group
+
+        Tally walks the vouchers itself (BY / AGGRCOMPUTE), so only the grouped rows cross the
+        wire. Amounts are Tally's $Amount: the voucher amount when grouping by voucher-level
+        keys, the ledger entry or cost centre allocation amount when grouping by ledger or
+        cost_centre (where count then counts entries or allocations).
+
+        Example:
+            client.vouchers().where(type="Sales").between("20240401", "20250331").aggregate(("month", "party"))
+
+        Args:
+            by (str or tuple): "party", "voucher_type", "month", "ledger" and/or "cost_centre"
+            measures (tuple, optional): "sum", "count", "min" and/or "max". Default: ("sum", "count")
+
+        Returns:
+            list: One dict per group, e.g. {"month": "2024-04", "party": "ABC Ltd", "sum": Decimal, "count": 3}
+
+        Raises:
+            ValueError: If the query is not over vouchers, or a key or measure is unknown
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        measures = (measures,) if isinstance(measures, str) else tuple(measures)
+        xml_request = self.compile_aggregate(by, measures)
+        columns = [(key, AGGREGATE_KEYS[key][1]) for key in by] + [(measure, measure.upper()) for measure in measures]
+        rows = []
+        for elem in self.client._iter_response_elements(xml_request, "ROW", method="aggregate"):
+            rows.append({name: _aggregate_value(elem.findtext(tag), name) for name, tag in columns})
+        return rows
+
+    def fetch(self):
+        """
+        Send the query and return Tally's response
+
+        Returns:
+            str: XML response (bytes when the client was created with raw_bytes=True), or an "Error: ..." string
+        """
+        return self.client._send_request(self.compile(), method="query")
+
+    def iter_elements(self):
+        """
+        Stream the matching objects
+
+        Yields:
+            xml.etree.ElementTree.Element: One object element, cleared once the next is requested
+
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        return self.client._iter_response_elements(self.compile(), QUERY_KINDS[self.kind][1], method="query")
+
+    def _records(self, method):
+        record_class = QUERY_KINDS[self.kind][2]
+        for elem in self.client._iter_response_elements(self.compile(), QUERY_KINDS[self.kind][1], method=method):
+            yield record_class.from_element(elem)
+
+    def __iter__(self):
+        """
+        Stream the matching objects as tallyRecords (Voucher, Ledger, Group or StockItem)
+        """
+        return self._records("query")
+
+    def bounds(self):
+        """
+        Lowest and highest MasterID of the matching objects, and their number, computed inside Tally
+
+        Returns:
+            tuple: (first_id, last_id, count); (0, 0, 0) when nothing matches
+
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        shape, values = self._shape()
+        template = envelope(_compile_bounds(QUERY_KINDS[self.kind][0], shape))
+        xml_request = template.render(**self._static_variables(), **values)
+        rows = self.client._iter_response_elements(xml_request, "ROW", method="query_bounds")
+        try:
+            row = next(rows, None)
+            if row is None:
+                return 0, 0, 0
+            return tuple(_aggregate_value(row.findtext(tag), "count") for tag in ("FIRSTID", "LASTID", "COUNT"))
+        finally:
+            # Release the connection and scheduler slot now rather than when the generator is collected
+            rows.close()
+
+    def pages(self, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Walk the matching objects in MasterID-ordered pages, one bounded request per page
+
+        Example:
+            for page in client.vouchers().where(type="Sales").pages(5000):
+                handle(page.records)
+                save(page.cursor)
+
+        Args:
+            page_size (int, optional): Objects per page to aim for. Default: 1000
+            cursor (str, optional): Page.cursor of an earlier walk, to resume after that page. Default: None
+
+        Returns:
+            iterator: Page objects (see keysetPagination.iter_pages)
+        """
+        return iter_pages(self, page_size, cursor)
+
+    def all(self):
+        """
+        Matching objects as a list of records
+
+        Returns:
+            list: tallyRecords instances
+        """
+        return list(self)
+
+    def __repr__(self):
+        return f"Query({self.kind!r}, predicates={list(self.predicates)!r})"
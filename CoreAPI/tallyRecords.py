@@ -0,0 +1,367 @@
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from xmlStream import parse_xml_bytes, sanitize_xml
+
+_DATE_FORMATS = ("%Y%m%d", "%d-%b-%Y", "%d-%b-%y")
+
+
+def parse_tally_date(value):
+    """
+    Convert a Tally date ("20240401", "1-Apr-2024" or "1-Apr-24") to a date
+
+    Args:
+        value (str): Date text from a Tally response
+
+    Returns:
+        datetime.date: Parsed date, or None if value is empty or not a recognised format
+    """
+    if not value:
+        return None
+    value = value.strip()
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_tally_amount(value):
+    """
+    Convert a Tally amount ("-1180.00", "1,180.00") to a Decimal
+
+    Args:
+        value (str): Amount text from a Tally response
+
+    Returns:
+        Decimal: Parsed amount, or None if value is empty or not a number
+    """
+    if not value:
+        return None
+    try:
+        return Decimal(value.strip().replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def _text(elem, tag):
+    # findtext() returns "" for present-but-empty tags; treat that as missing
+    value = elem.findtext(tag)
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def _name(elem, tag="NAME"):
+    # Masters carry their name in the NAME attribute, a NAME child, or the language name list
+    value = elem.get("NAME") or _text(elem, tag) or _text(elem, "LANGUAGENAME.LIST/NAME.LIST/NAME")
+    return sys.intern(value) if value else None
+
+
+def _interned(elem, tag):
+    # Values that repeat across many records (ledger names, voucher types, dates) share one string
+    value = _text(elem, tag)
+    return sys.intern(value) if value else None
+
+
+def _int(elem, tag):
+    value = _text(elem, tag)
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _yes(elem, tag):
+    value = _text(elem, tag)
+    return value is not None and value.lower() == "yes"
+
+
+class _Record:
+    __slots__ = ()
+
+    def to_dict(self):
+        """
+        Return the record's public fields (decoded) as a dict
+        """
+        return {field: getattr(self, field) for field in self._fields}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields[:4])
+        return f"{type(self).__name__}({fields})"
+
+
+class Ledger(_Record):
+    """
+    Ledger master. Balances are kept as Tally's text and decoded on access.
+    """
+    __slots__ = ("name", "parent", "master_id", "alter_id", "guid", "_opening_balance", "_closing_balance")
+    _fields = ("name", "parent", "master_id", "alter_id", "guid", "opening_balance", "closing_balance")
+
+    def __init__(self, name, parent=None, master_id=None, alter_id=None, guid=None,
+                 opening_balance=None, closing_balance=None):
+        self.name = name
+        self.parent = parent
+        self.master_id = master_id
+        self.alter_id = alter_id
+        self.guid = guid
+        self._opening_balance = opening_balance
+        self._closing_balance = closing_balance
+
+    @property
+    def opening_balance(self):
+        return parse_tally_amount(self._opening_balance)
+
+    @property
+    def closing_balance(self):
+        return parse_tally_amount(self._closing_balance)
+
+    @classmethod
+    def from_element(cls, elem):
+        """
+        Build a Ledger from a LEDGER element of a collection export
+        """
+        return cls(_name(elem), _interned(elem, "PARENT"), _int(elem, "MASTERID"), _int(elem, "ALTERID"),
+                   _text(elem, "GUID"), _text(elem, "OPENINGBALANCE"), _text(elem, "CLOSINGBALANCE"))
+
+
+class Group(_Record):
+    """
+    Account group master
+    """
+    __slots__ = ("name", "parent", "master_id", "alter_id", "guid")
+    _fields = __slots__
+
+    def __init__(self, name, parent=None, master_id=None, alter_id=None, guid=None):
+        self.name = name
+        self.parent = parent
+        self.master_id = master_id
+        self.alter_id = alter_id
+        self.guid = guid
+
+    @classmethod
+    def from_element(cls, elem):
+        """
+        Build a Group from a GROUP element of a collection export
+        """
+        return cls(_name(elem), _interned(elem, "PARENT"), _int(elem, "MASTERID"), _int(elem, "ALTERID"),
+                   _text(elem, "GUID"))
+
+
+class StockItem(_Record):
+    """
+    Stock item master. Quantities are kept as Tally's text ("10 Nos"); the closing value
+    is decoded on access.
+    """
+    __slots__ = ("name", "parent", "base_units", "master_id", "alter_id", "guid",
+                 "opening_balance", "closing_balance", "_closing_value")
+    _fields = ("name", "parent", "base_units", "master_id", "alter_id", "guid",
+               "opening_balance", "closing_balance", "closing_value")
+
+    def __init__(self, name, parent=None, base_units=None, master_id=None, alter_id=None, guid=None,
+                 opening_balance=None, closing_balance=None, closing_value=None):
+        self.name = name
+        self.parent = parent
+        self.base_units = base_units
+        self.master_id = master_id
+        self.alter_id = alter_id
+        self.guid = guid
+        self.opening_balance = opening_balance
+        self.closing_balance = closing_balance
+        self._closing_value = closing_value
+
+    @property
+    def closing_value(self):
+        return parse_tally_amount(self._closing_value)
+
+    @classmethod
+    def from_element(cls, elem):
+        """
+        Build a StockItem from a STOCKITEM element of a collection export
+        """
+        return cls(_name(elem), _interned(elem, "PARENT"), _interned(elem, "BASEUNITS"), _int(elem, "MASTERID"),
+                   _int(elem, "ALTERID"), _text(elem, "GUID"), _text(elem, "OPENINGBALANCE"),
+                   _text(elem, "CLOSINGBALANCE"), _text(elem, "CLOSINGVALUE"))
+
+
+class LedgerEntry(_Record):
+    """
+    One ledger line of a voucher. Tally's sign convention is kept: debits are negative.
+    """
+    __slots__ = ("ledger_name", "is_deemed_positive", "_amount")
+    _fields = ("ledger_name", "is_deemed_positive", "amount")
+
+    def __init__(self, ledger_name, amount=None, is_deemed_positive=False):
+        self.ledger_name = ledger_name
+        self.is_deemed_positive = is_deemed_positive
+        self._amount = amount
+
+    @property
+    def amount(self):
+        return parse_tally_amount(self._amount)
+
+    @classmethod
+    def from_element(cls, elem):
+        """
+        Build a LedgerEntry from an ALLLEDGERENTRIES.LIST or LEDGERENTRIES.LIST element
+        """
+        return cls(_interned(elem, "LEDGERNAME"), _text(elem, "AMOUNT"), _yes(elem, "ISDEEMEDPOSITIVE"))
+
+
+class Voucher(_Record):
+    """
+    Voucher with its ledger entries. The date is kept as Tally's text and decoded on access.
+    """
+    __slots__ = ("master_id", "alter_id", "guid", "voucher_type", "voucher_number", "_date",
+                 "party_ledger_name", "narration", "is_cancelled", "ledger_entries")
+    _fields = ("master_id", "alter_id", "guid", "voucher_type", "voucher_number", "date",
+               "party_ledger_name", "narration", "is_cancelled", "ledger_entries")
+
+    def __init__(self, master_id=None, alter_id=None, guid=None, voucher_type=None, voucher_number=None,
+                 date=None, party_ledger_name=None, narration=None, is_cancelled=False, ledger_entries=()):
+        self.master_id = master_id
+        self.alter_id = alter_id
+        self.guid = guid
+        self.voucher_type = voucher_type
+        self.voucher_number = voucher_number
+        self._date = date
+        self.party_ledger_name = party_ledger_name
+        self.narration = narration
+        self.is_cancelled = is_cancelled
+        self.ledger_entries = ledger_entries
+
+    @property
+    def date(self):
+        return parse_tally_date(self._date)
+
+    @property
+    def amount(self):
+        """
+        Total of the debit side (sum of the negative entry amounts, as a positive number)
+        """
+        total = Decimal(0)
+        for entry in self.ledger_entries:
+            amount = entry.amount
+            if amount is not None and amount < 0:
+                total -= amount
+        return total
+
+    def to_dict(self):
+        """
+        Return the voucher's fields (decoded) as a dict, with ledger entries as dicts
+        """
+        result = super().to_dict()
+        result["ledger_entries"] = [entry.to_dict() for entry in self.ledger_entries]
+        return result
+
+    @classmethod
+    def from_element(cls, elem):
+        """
+        Build a Voucher from a VOUCHER element of a collection, object or report export
+        """
+        entries = tuple(
+            LedgerEntry.from_element(entry)
+            for entry in elem
+            if entry.tag in ("ALLLEDGERENTRIES.LIST", "LEDGERENTRIES.LIST")
+        )
+        voucher_type = _interned(elem, "VOUCHERTYPENAME") or elem.get("VCHTYPE")
+        return cls(_int(elem, "MASTERID"), _int(elem, "ALTERID"), _text(elem, "GUID"),
+                   sys.intern(voucher_type) if voucher_type else None, _text(elem, "VOUCHERNUMBER"),
+                   _interned(elem, "DATE"), _interned(elem, "PARTYLEDGERNAME"), _text(elem, "NARRATION"),
+                   _yes(elem, "ISCANCELLED"), entries)
+
+
+def _root(response):
+    """
+    Parse a Tally response (str, bytes or an already parsed element)
+    """
+    if isinstance(response, ET.Element):
+        return response
+    if isinstance(response, str):
+        if response.startswith("Error:"):
+            raise ValueError(response)
+        return ET.fromstring(sanitize_xml(response))
+    return parse_xml_bytes(response)
+
+
+def parse_ledgers(response):
+    """
+    Parse the ledgers of a get_ledgers_list / get_ledger_by_name response
+
+    Args:
+        response (str, bytes or Element): Tally response
+
+    Returns:
+        list: Ledger records
+
+    Raises:
+        ValueError: If the response is an "Error: ..." string
+        xml.etree.ElementTree.ParseError: If the response is not valid XML
+    """
+    return [Ledger.from_element(elem) for elem in _root(response).iter("LEDGER")]
+
+
+def parse_groups(response):
+    """
+    Parse the groups of a get_groups_list response
+
+    Args:
+        response (str, bytes or Element): Tally response
+
+    Returns:
+        list: Group records
+    """
+    return [Group.from_element(elem) for elem in _root(response).iter("GROUP")]
+
+
+def parse_stock_items(response):
+    """
+    Parse the stock items of a get_stock_items_list / get_stock_item_by_master_id response
+
+    Args:
+        response (str, bytes or Element): Tally response
+
+    Returns:
+        list: StockItem records
+    """
+    return [StockItem.from_element(elem) for elem in _root(response).iter("STOCKITEM")]
+
+
+def parse_vouchers(response):
+    """
+    Parse the vouchers of a voucher collection, object or report response
+    (get_ledger_vouchers, get_group_vouchers, get_voucher_by_master_id, ...)
+
+    For large exports, stream instead and convert one element at a time:
+    ``for elem in client.iter_ledger_vouchers(...): voucher = Voucher.from_element(elem)``
+
+    Args:
+        response (str, bytes or Element): Tally response
+
+    Returns:
+        list: Voucher records
+    """
+    return [Voucher.from_element(elem) for elem in _root(response).iter("VOUCHER")]
+
+
+def iter_voucher_records(elements):
+    """
+    Convert a stream of VOUCHER elements (e.g. from TallyClient.iter_ledger_vouchers) to Voucher records
+
+    Args:
+        elements (iterable): VOUCHER elements
+
+    Yields:
+        Voucher: One record per element
+    """
+    for elem in elements:
+        yield Voucher.from_element(elem)
@@ -0,0 +1,39 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The CoreAPI modules import each other by flat name (from xmlFunctions import TallyClient)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _CannedTallyHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests.append(body)
+        status, response = self.server.respond(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def canned_tally():
+    """
+    Local HTTP server standing in for Tally: set server.respond to a function of the request
+    body returning (status, response bytes); requests are collected in server.requests
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CannedTallyHandler)
+    server.requests = []
+    server.respond = lambda body: (200, b"<ENVELOPE></ENVELOPE>")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
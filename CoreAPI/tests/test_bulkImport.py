@@ -0,0 +1,49 @@
+from bulkImport import ERROR, UNKNOWN, attribute_outcomes
+from importResult import ImportResult
+from xmlFunctions import TallyClient
+
+
+def _batch(*names):
+    return [(index, name, b"") for index, name in enumerate(names)]
+
+
+def test_error_for_longer_name_is_not_charged_to_shorter_one():
+    batch = _batch("Cash", "Petty Cash", "Bank")
+    result = ImportResult(created=2, errors=1, line_errors=["Ledger 'Petty Cash' already exists"])
+    outcomes = attribute_outcomes(batch, result, "created")
+    assert [outcome.status for outcome in outcomes] == ["created", ERROR, "created"]
+
+
+def test_unquoted_names_match_whole_words_only():
+    batch = _batch("Cash", "Petty Cash", "Cashew Stock")
+    result = ImportResult(created=1, errors=2,
+                          line_errors=["Duplicate entry: Petty Cash", "Group missing for Cashew Stock"])
+    outcomes = attribute_outcomes(batch, result, "created")
+    assert [outcome.status for outcome in outcomes] == ["created", ERROR, ERROR]
+    assert outcomes[1].error == "Duplicate entry: Petty Cash"
+
+
+def test_both_overlapping_names_can_fail():
+    batch = _batch("Cash", "Petty Cash")
+    result = ImportResult(errors=2, line_errors=["Ledger 'Petty Cash' already exists",
+                                                 "Ledger 'Cash' already exists"])
+    outcomes = attribute_outcomes(batch, result, "created")
+    assert [outcome.error for outcome in outcomes] == ["Ledger 'Cash' already exists",
+                                                       "Ledger 'Petty Cash' already exists"]
+
+
+def test_create_ledgers_reports_each_ledger_per_batch(canned_tally):
+    def respond(body):
+        if b"Petty Cash" in body:
+            return 200, (b"<RESPONSE><CREATED>1</CREATED><ERRORS>1</ERRORS>"
+                         b"<LINEERROR>Ledger 'Petty Cash' already exists</LINEERROR></RESPONSE>")
+        return 500, b""
+    canned_tally.respond = respond
+    client = TallyClient("http://127.0.0.1", canned_tally.server_address[1], scheduler=False)
+    ledgers = [{"name": "Cash", "parent": "Cash-in-Hand"}, {"name": "Petty Cash", "parent": "Cash-in-Hand"},
+               {"name": "Bank", "parent": "Bank Accounts"}]
+    result = client.create_ledgers(ledgers, batch_size=2)
+    assert len(canned_tally.requests) == 2
+    assert [(outcome.name, outcome.status) for outcome in result.items] == \
+        [("Cash", "created"), ("Petty Cash", ERROR), ("Bank", UNKNOWN)]
+    assert not result.ok
@@ -0,0 +1,54 @@
+from incrementalSync import SyncState, Watermark, sync_collection
+from xmlFunctions import TallyClient
+
+CHANGED = b"<ENVELOPE><LEDGER NAME='Bank'><MASTERID>4</MASTERID><ALTERID>11</ALTERID></LEDGER></ENVELOPE>"
+
+
+def _ledgers(*master_ids):
+    return b"<ENVELOPE>" + b"".join(b"<LEDGER><MASTERID>%d</MASTERID></LEDGER>" % master_id
+                                    for master_id in master_ids) + b"</ENVELOPE>"
+
+
+def _responder(count, ids):
+    # Changed objects above the watermark, the object count, and the full MasterID list (AlterID > 0)
+    def respond(body):
+        if b"<ID>Object Count</ID>" in body:
+            return 200, b"<ENVELOPE><COUNT>%d</COUNT></ENVELOPE>" % count
+        if b"$AlterID &gt; 0<" in body:
+            return 200, _ledgers(*ids)
+        return 200, CHANGED
+    return respond
+
+
+def _sync(server, count, ids):
+    server.respond = _responder(count, ids)
+    state = SyncState({"": {"ledgers": Watermark(10, {1, 2, 3})}})
+    client = TallyClient("http://127.0.0.1", server.server_address[1], scheduler=False)
+    return sync_collection(client, "ledgers", state, probe=False), state.watermark(None, "ledgers")
+
+
+def test_matching_count_skips_the_id_list(canned_tally):
+    changes, mark = _sync(canned_tally, 4, ())
+    assert [record.name for record in changes.changed] == ["Bank"]
+    assert changes.deleted == [] and not changes.reconciled
+    assert not any(b"$AlterID &gt; 0<" in body for body in canned_tally.requests)
+    assert (mark.alter_id, mark.ids) == (11, {1, 2, 3, 4})
+
+
+def test_count_mismatch_reconciles_deletions(canned_tally):
+    changes, mark = _sync(canned_tally, 3, (1, 3, 4))
+    assert changes.deleted == [2] and changes.reconciled
+    assert (mark.alter_id, mark.ids) == (11, {1, 3, 4})
+
+
+def test_empty_id_list_is_not_trusted_without_a_zero_count(canned_tally):
+    changes, mark = _sync(canned_tally, 3, ())
+    assert changes.deleted == [] and not changes.reconciled
+    # The watermark stays put so the next sync sees the same changes again
+    assert (mark.alter_id, mark.ids) == (10, {1, 2, 3})
+
+
+def test_empty_id_list_with_zero_count_deletes_everything(canned_tally):
+    changes, mark = _sync(canned_tally, 0, ())
+    assert changes.deleted == [1, 2, 3, 4]
+    assert mark.ids == set()
@@ -0,0 +1,99 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from tallyPool import TallyPool
+from xmlFunctions import TallyClient
+
+COMPANIES = b"<ENVELOPE><COLLECTION><COMPANY><NAME>Acme</NAME></COMPANY></COLLECTION></ENVELOPE>"
+LEDGERS = b"<ENVELOPE><LEDGER NAME='Cash'><MASTERID>1</MASTERID></LEDGER></ENVELOPE>"
+
+
+class _TallyHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests.append(body)
+        response = COMPANIES if b"List of Companies" in body else LEDGERS
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def tally_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TallyHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _pool(*ports):
+    pool = TallyPool([("http://127.0.0.1", port) for port in ports], discover=False,
+                     connect_timeout=2, scheduler=False)
+    for endpoint in pool.endpoints:
+        endpoint.companies = {"acme": "Acme"}
+    return pool
+
+
+def test_client_raises_transport_errors_only_when_asked():
+    port = _closed_port()
+    assert TallyClient("http://127.0.0.1", port, scheduler=False).get_ledgers_list("Acme").startswith("Error:")
+    client = TallyClient("http://127.0.0.1", port, scheduler=False, raise_transport_errors=True)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get_ledgers_list("Acme")
+
+
+def test_failover_to_replica_marks_dead_endpoint_unhealthy(tally_server):
+    pool = _pool(_closed_port(), tally_server.server_address[1])
+    dead, alive = pool.endpoints
+
+    for _ in range(3):
+        assert "Cash" in pool.get_ledgers_list("Acme")
+
+    assert not dead.healthy
+    assert alive.healthy
+    assert len(tally_server.requests) == 3
+    assert dead.in_flight == alive.in_flight == 0
+
+
+def test_failover_raises_when_no_replica_is_left():
+    pool = _pool(_closed_port(), _closed_port())
+    with pytest.raises(requests.exceptions.ConnectionError):
+        pool.get_ledgers_list("Acme")
+    assert not any(endpoint.healthy for endpoint in pool.endpoints)
+    with pytest.raises(LookupError):
+        pool.get_ledgers_list("Acme")
+
+
+def test_imports_are_not_retried(tally_server):
+    pool = _pool(_closed_port(), tally_server.server_address[1])
+    dead, alive = pool.endpoints
+    alive.in_flight = 1  # busier, so the import goes to the dead endpoint first
+    with pytest.raises(requests.exceptions.ConnectionError):
+        pool.delete_ledger("Acme", "Cash")
+    assert not dead.healthy
+    assert tally_server.requests == []
+
+
+def test_discovery_routes_by_company(tally_server):
+    pool = TallyPool([("http://127.0.0.1", tally_server.server_address[1]),
+                      ("http://127.0.0.1", _closed_port())], connect_timeout=2, scheduler=False)
+    assert pool.companies() == {"Acme": [f"http://127.0.0.1:{tally_server.server_address[1]}"]}
+    with pytest.raises(LookupError):
+        pool.get_ledgers_list("Other")
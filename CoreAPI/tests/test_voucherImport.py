@@ -0,0 +1,42 @@
+from bulkImport import SKIPPED, UNKNOWN
+from voucherImport import import_vouchers
+from xmlFunctions import TallyClient
+
+ENTRIES = [{"ledger_name": "Cash", "amount": 100, "is_debit": True},
+           {"ledger_name": "Sales", "amount": 100, "is_debit": False}]
+
+
+def _client(server):
+    return TallyClient("http://127.0.0.1", server.server_address[1], scheduler=False)
+
+
+def _journals(*numbers):
+    return [{"entries": ENTRIES, "date": "20240401", "voucher_number": number} for number in numbers]
+
+
+def test_last_voucher_id_goes_to_the_last_created_voucher(canned_tally):
+    canned_tally.respond = lambda body: (200, b"<RESPONSE><CREATED>3</CREATED><ERRORS>0</ERRORS>"
+                                              b"<LASTVCHID>57</LASTVCHID></RESPONSE>")
+    result = import_vouchers(_client(canned_tally), _journals("1", "2", "3"), adaptive=False)
+    assert [outcome.status for outcome in result.items] == ["created"] * 3
+    assert [outcome.master_id for outcome in result.items] == [None, None, 57]
+
+    result = import_vouchers(_client(canned_tally), _journals("1", "2", "3"), adaptive=False, sequential_ids=True)
+    assert [outcome.master_id for outcome in result.items] == [55, 56, 57]
+
+
+def test_altered_vouchers_keep_their_master_id(canned_tally):
+    canned_tally.respond = lambda body: (200, b"<RESPONSE><CREATED>1</CREATED><ALTERED>1</ALTERED>"
+                                              b"<LASTVCHID>90</LASTVCHID></RESPONSE>")
+    specs = [{"action": "alter", "master_id": 12, "narration": "Fixed"}] + _journals("7")
+    result = import_vouchers(_client(canned_tally), specs, adaptive=False)
+    assert [(outcome.status, outcome.master_id) for outcome in result.items] == [("altered", 12), ("created", 90)]
+
+
+def test_stops_after_three_failed_batches(canned_tally):
+    canned_tally.respond = lambda body: (500, b"")
+    result = import_vouchers(_client(canned_tally), _journals("1", "2", "3", "4", "5"), batch_size=1,
+                             adaptive=False)
+    assert len(canned_tally.requests) == 3
+    assert [outcome.status for outcome in result.items] == [UNKNOWN] * 3 + [SKIPPED] * 2
+    assert [outcome.name for outcome in result.items] == ["1", "2", "3", "4", "5"]
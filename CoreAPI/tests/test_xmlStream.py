@@ -0,0 +1,65 @@
+import re
+import xml.etree.ElementTree as ET
+
+from xmlStream import XmlSanitizer, iter_elements, iter_sanitized, sanitize_xml
+
+
+def test_strips_control_character_references():
+    assert sanitize_xml("<A>a&#4;b&#x1F;c&#9;</A>") == "<A>abc&#9;</A>"
+
+
+def test_strips_surrogate_references_in_hex_and_decimal():
+    for reference in ("&#xD800;", "&#xdfff;", "&#55296;", "&#56320;", "&#57343;"):
+        cleaned = sanitize_xml(f"<A>x{reference}y</A>")
+        assert cleaned == "<A>xy</A>", reference
+        ET.fromstring(cleaned)
+
+
+def test_keeps_references_next_to_the_surrogate_range():
+    for value in (55295, 57344, 65533):
+        text = f"<A>&#{value};</A>"
+        assert sanitize_xml(text) == text
+        assert ET.fromstring(text).text == chr(value)
+
+
+def test_every_forbidden_decimal_reference_is_stripped():
+    forbidden = [c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)]
+    forbidden += list(range(0xD800, 0xE000)) + [0xFFFE, 0xFFFF]
+    for value in forbidden:
+        assert sanitize_xml(f"<A>&#{value};</A>") == "<A></A>", value
+    assert not re.search(r"&#", sanitize_xml("".join(f"&#{value};" for value in forbidden)))
+
+
+def test_streamed_surrogate_reference_split_across_chunks():
+    chunks = [b"<ROOT><V>a&#55", b"296;b</V></ROOT>"]
+    assert [elem.text for elem in iter_elements(chunks, "V")] == ["ab"]
+
+
+def test_strips_raw_noncharacters_and_surrogates():
+    for raw in ("￾", "￿", "\ud800", "\udfff"):
+        cleaned = sanitize_xml(f"<A>x{raw}y</A>")
+        assert cleaned == "<A>xy</A>", repr(raw)
+        ET.fromstring(cleaned)
+    assert sanitize_xml("<A>￾</A>", replacement="?") == "<A>?</A>"
+
+
+def test_strips_utf8_noncharacters_from_bytes():
+    data = "<A>x￾y￿z퟿</A>".encode("utf-8", "surrogatepass") + b"<B>\xed\xa0\x80</B>"
+    cleaned = sanitize_xml(b"<R>" + data + b"</R>")
+    assert cleaned == "<R><A>xyz퟿</A><B></B></R>".encode("utf-8")
+    ET.fromstring(cleaned)
+
+
+def test_streamed_noncharacter_split_across_chunks():
+    chunks = [b"<ROOT><V>a\xef", b"\xbf\xbeb\xef\xbf", b"\xbfc</V></ROOT>"]
+    assert [elem.text for elem in iter_elements(chunks, "V")] == ["abc"]
+
+
+def test_flush_returns_the_stream_type():
+    sanitizer = XmlSanitizer()
+    assert sanitizer.feed("<A>") == "<A>"
+    assert sanitizer.flush() == ""
+    sanitizer = XmlSanitizer()
+    sanitizer.feed(b"<A>")
+    assert sanitizer.flush() == b""
+    assert "".join(iter_sanitized(["<A>a&", "#4;b</A>"])) == "<A>ab</A>"
@@ -0,0 +1,283 @@
+from array import array
+from datetime import date
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only needed for the columnar export
+    np = None
+
+from tallyRecords import _root, parse_tally_date
+
+# Amounts are stored as integers in units of 10**-AMOUNT_SCALE (paise for INR)
+AMOUNT_SCALE = 2
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NAT = -(2 ** 63)  # numpy's NaT as int64
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for voucherColumns (pip install numpy)")
+
+
+def _to_fixed(text, scale=AMOUNT_SCALE):
+    """
+    Convert Tally amount text ("-1,180.50") to an integer in units of 10**-scale without
+    going through float; extra decimals are rounded half to even, as ledgerBalances does
+    """
+    text = text.strip().replace(",", "")
+    negative = text.startswith("-")
+    if negative or text.startswith("+"):
+        text = text[1:]
+    whole, _, fraction = text.partition(".")
+    value = int(whole or "0") * 10 ** scale + int((fraction + "0" * scale)[:scale] or "0")
+    rest = fraction[scale:].rstrip("0")
+    if rest and (rest[0] > "5" or (rest[0] == "5" and (len(rest) > 1 or value % 2))):
+        value += 1
+    return -value if negative else value
+
+
+class _Dictionary:
+    """
+    Assigns consecutive integer codes to distinct strings
+    """
+    __slots__ = ("codes", "values")
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class VoucherColumnsBuilder:
+    """
+    Accumulates voucher ledger entries column by column from VOUCHER elements.
+
+    Columns grow in compact typed arrays (no per-row Python objects are kept), names are
+    dictionary-encoded as they arrive, and build() copies the buffers into numpy arrays
+    (so more elements can still be added afterwards).
+    """
+
+    def __init__(self):
+        self._dates = array("q")
+        self._amounts = array("q")
+        self._master_ids = array("q")
+        self._ledger_codes = array("i")
+        self._party_codes = array("i")
+        self._type_codes = array("i")
+        self._ledgers = _Dictionary()
+        self._parties = _Dictionary()
+        self._types = _Dictionary()
+        self._day_cache = {}
+        self.voucher_count = 0
+
+    def _day(self, text):
+        day = self._day_cache.get(text)
+        if day is None:
+            parsed = parse_tally_date(text)
+            day = parsed.toordinal() - _EPOCH_ORDINAL if parsed is not None else _NAT
+            self._day_cache[text] = day
+        return day
+
+    def add_element(self, elem):
+        """
+        Append the ledger entries of one VOUCHER element
+
+        Args:
+            elem (xml.etree.ElementTree.Element): VOUCHER element from a collection export
+        """
+        day = self._day((elem.findtext("DATE") or "").strip())
+        master_id = (elem.findtext("MASTERID") or "").strip()
+        master_id = int(master_id) if master_id.isdigit() else -1
+        party = self._parties.encode((elem.findtext("PARTYLEDGERNAME") or "").strip())
+        voucher_type = self._types.encode(
+            (elem.findtext("VOUCHERTYPENAME") or elem.get("VCHTYPE") or "").strip())
+
+        for entry in elem:
+            if entry.tag != "ALLLEDGERENTRIES.LIST" and entry.tag != "LEDGERENTRIES.LIST":
+                continue
+            amount = entry.findtext("AMOUNT")
+            self._dates.append(day)
+            self._amounts.append(_to_fixed(amount) if amount and amount.strip() else 0)
+            self._master_ids.append(master_id)
+            self._ledger_codes.append(self._ledgers.encode((entry.findtext("LEDGERNAME") or "").strip()))
+            self._party_codes.append(party)
+            self._type_codes.append(voucher_type)
+        self.voucher_count += 1
+
+    def build(self):
+        """
+        Return the accumulated entries as a VoucherColumns
+
+        Returns:
+            VoucherColumns: Columnar result
+        """
+        _require_numpy()
+        # Copies: a numpy view would pin the arrays' buffers, and the next append would raise BufferError
+        return VoucherColumns(
+            dates=np.array(self._dates, dtype=np.int64).view("datetime64[D]"),
+            amounts=np.array(self._amounts, dtype=np.int64),
+            master_ids=np.array(self._master_ids, dtype=np.int64),
+            ledger_codes=np.array(self._ledger_codes, dtype=np.int32),
+            party_codes=np.array(self._party_codes, dtype=np.int32),
+            voucher_type_codes=np.array(self._type_codes, dtype=np.int32),
+            ledger_names=list(self._ledgers.values),
+            party_names=list(self._parties.values),
+            voucher_type_names=list(self._types.values),
+        )
+
+
+class VoucherColumns:
+    """
+    Voucher ledger entries held column-wise, one row per ledger entry.
+
+    Columns (numpy arrays of equal length):
+        dates: datetime64[D]
+        amounts: int64 fixed-point, in units of 10**-AMOUNT_SCALE (Tally's sign: debits negative)
+        master_ids: int64 voucher MasterID (-1 if not exported)
+        ledger_codes, party_codes, voucher_type_codes: int32 codes into ledger_names,
+                                                       party_names and voucher_type_names
+    """
+
+    def __init__(self, dates, amounts, master_ids, ledger_codes, party_codes, voucher_type_codes,
+                 ledger_names, party_names, voucher_type_names):
+        self.dates = dates
+        self.amounts = amounts
+        self.master_ids = master_ids
+        self.ledger_codes = ledger_codes
+        self.party_codes = party_codes
+        self.voucher_type_codes = voucher_type_codes
+        self.ledger_names = ledger_names
+        self.party_names = party_names
+        self.voucher_type_names = voucher_type_names
+
+    _KEYS = {
+        "ledger": ("ledger_codes", "ledger_names"),
+        "party": ("party_codes", "party_names"),
+        "voucher_type": ("voucher_type_codes", "voucher_type_names"),
+    }
+
+    @classmethod
+    def from_elements(cls, elements):
+        """
+        Build from a stream of VOUCHER elements, e.g. TallyClient.iter_ledger_vouchers(...)
+
+        Args:
+            elements (iterable): VOUCHER elements
+
+        Returns:
+            VoucherColumns: Columnar result
+        """
+        _require_numpy()
+        builder = VoucherColumnsBuilder()
+        for elem in elements:
+            builder.add_element(elem)
+        return builder.build()
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        Build from a complete voucher collection response (str or bytes)
+
+        Args:
+            response (str, bytes or Element): Tally response, e.g. from get_ledger_vouchers
+
+        Returns:
+            VoucherColumns: Columnar result
+        """
+        return cls.from_elements(_root(response).iter("VOUCHER"))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @staticmethod
+    def to_decimal(amount):
+        """
+        Convert a fixed-point amount (or numpy integer) back to a Decimal
+        """
+        return Decimal(int(amount)).scaleb(-AMOUNT_SCALE)
+
+    def filter(self, mask):
+        """
+        Return the rows selected by a boolean mask (dictionaries are shared)
+
+        Args:
+            mask (numpy.ndarray): Boolean array, e.g. columns.dates >= np.datetime64("2024-04-01")
+
+        Returns:
+            VoucherColumns: Selected rows
+        """
+        return VoucherColumns(self.dates[mask], self.amounts[mask], self.master_ids[mask],
+                              self.ledger_codes[mask], self.party_codes[mask], self.voucher_type_codes[mask],
+                              self.ledger_names, self.party_names, self.voucher_type_names)
+
+    def codes_for(self, key, name):
+        """
+        Code of a name in one of the dictionaries, for building masks
+
+        Args:
+            key (str): "ledger", "party" or "voucher_type"
+            name (str): Name to look up
+
+        Returns:
+            int: Code, or -1 if the name does not occur
+        """
+        names = getattr(self, self._KEYS[key][1])
+        try:
+            return names.index(name)
+        except ValueError:
+            return -1
+
+    def total(self, debit=None):
+        """
+        Sum of amounts
+
+        Args:
+            debit (bool, optional): True for debit entries only (negative amounts), False for credits only.
+                                    Default: None (net total)
+
+        Returns:
+            Decimal: Total
+        """
+        amounts = self.amounts
+        if debit is True:
+            amounts = amounts[amounts < 0]
+        elif debit is False:
+            amounts = amounts[amounts > 0]
+        return self.to_decimal(amounts.sum())
+
+    def totals_by(self, key):
+        """
+        Net amount per ledger, party, voucher type or month
+
+        Args:
+            key (str): "ledger", "party", "voucher_type" or "month"
+
+        Returns:
+            dict: {name (or "YYYY-MM"): Decimal total}
+        """
+        if key == "month":
+            months = self.dates.astype("datetime64[M]")
+            labels, codes = np.unique(months, return_inverse=True)
+            names = [str(label) for label in labels]
+        else:
+            codes_attr, names_attr = self._KEYS[key]
+            codes = getattr(self, codes_attr)
+            names = getattr(self, names_attr)
+        present, sums = self._sum_by_code(codes)
+        return {names[code]: self.to_decimal(total) for code, total in zip(present.tolist(), sums.tolist())}
+
+    def _sum_by_code(self, codes):
+        # Exact int64 group sums: sort once, then reduce contiguous runs
+        if not len(codes):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        return sorted_codes[starts], np.add.reduceat(self.amounts[order], starts)
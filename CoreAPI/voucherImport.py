@@ -0,0 +1,217 @@
+import logging
+import time
+
+from bulkImport import ImportOutcome, BulkImportResult, attribute_outcomes, DEFAULT_MAX_BATCH_BYTES, UNKNOWN, \
+    ERROR, SKIPPED
+from importResult import ImportResult
+
+# Initial and largest number of vouchers per Import Data request
+DEFAULT_VOUCHER_BATCH_SIZE = 100
+MAX_VOUCHER_BATCH_SIZE = 1000
+# Adaptive sizing aims for requests that Tally answers in about this many seconds
+DEFAULT_TARGET_SECONDS = 10.0
+# Stop after this many batches in a row got no usable response (Tally down, repeated timeouts)
+DEFAULT_MAX_FAILED_BATCHES = 3
+
+# Voucher spec "action" -> (TallyClient builder, status of a successful item)
+VOUCHER_ACTIONS = {
+    "journal": ("_journal_voucher", "created"),
+    "receipt": ("_receipt_voucher", "created"),
+    "alter": ("_alter_voucher", "altered"),
+    "cancel": ("_cancel_voucher", "cancelled"),
+}
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size that follows Tally's response time.
+
+    After each batch the size moves toward the number of vouchers Tally can import in
+    target_seconds (growing at most 2x per batch); a batch without a usable response halves it.
+    """
+    __slots__ = ("size", "minimum", "maximum", "target_seconds")
+
+    def __init__(self, initial=DEFAULT_VOUCHER_BATCH_SIZE, minimum=1, maximum=MAX_VOUCHER_BATCH_SIZE,
+                 target_seconds=DEFAULT_TARGET_SECONDS):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.target_seconds = target_seconds
+        self.size = min(max(initial, minimum), self.maximum)
+
+    def record(self, count, seconds, failed=False):
+        """
+        Adjust the size after a batch
+
+        Args:
+            count (int): Vouchers in the batch
+            seconds (float): Time Tally took to answer
+            failed (bool, optional): True if the batch got no usable response. Default: False
+        """
+        if failed:
+            size = self.size // 2
+        elif seconds <= 0:
+            size = self.size * 2
+        else:
+            size = min(int(count * self.target_seconds / seconds), self.size * 2)
+        self.size = min(max(size, self.minimum), self.maximum)
+
+    def __repr__(self):
+        return f"AdaptiveBatchSize(size={self.size})"
+
+
+class _PreparedVoucher:
+    __slots__ = ("index", "name", "xml", "status", "master_id")
+
+    def __init__(self, index, name, xml, status, master_id):
+        self.index = index
+        self.name = name
+        self.xml = xml
+        self.status = status
+        self.master_id = master_id
+
+
+def _spec_name(spec):
+    # Label used in outcomes and to match Tally's line errors to vouchers
+    name = spec.get("voucher_number") or spec.get("master_id")
+    return str(name) if name is not None else None
+
+
+def prepare_voucher(client, index, spec):
+    """
+    Build the VOUCHER object for one voucher spec
+
+    Args:
+        client (TallyClient): Client whose builders render the voucher
+        index (int): Position of the spec in the input
+        spec (dict): Voucher spec (see import_vouchers)
+
+    Returns:
+        _PreparedVoucher: Rendered voucher with its expected status
+
+    Raises:
+        ValueError, KeyError or TypeError: If the spec is invalid
+    """
+    fields = dict(spec)
+    action = fields.pop("action", "journal")
+    if action not in VOUCHER_ACTIONS:
+        raise ValueError(f"Unknown voucher action: {action}")
+    builder, status = VOUCHER_ACTIONS[action]
+    xml = getattr(client, builder)(**fields)
+    master_id = spec.get("master_id") if status != "created" else None
+    return _PreparedVoucher(index, _spec_name(spec), xml, status, master_id)
+
+
+def _assign_master_ids(batch, outcomes, result, sequential_ids):
+    """
+    Record the MasterIDs of a batch's vouchers on their outcomes
+
+    Altered and cancelled vouchers keep the MasterID they were addressed by. Tally only
+    reports the ID of the last voucher it created (LASTVCHID), which goes to the last created
+    voucher of the batch. With sequential_ids, and every voucher of the batch created, the
+    earlier ones are numbered back from it.
+    """
+    created = []
+    for voucher, outcome in zip(batch, outcomes):
+        if voucher.master_id is not None and outcome.ok:
+            outcome.master_id = voucher.master_id
+        elif voucher.status == "created":
+            created.append(outcome)
+    if not created or not result.last_voucher_id or not created[-1].ok:
+        return
+    created[-1].master_id = result.last_voucher_id
+    if sequential_ids and all(outcome.ok for outcome in outcomes):
+        for offset, outcome in enumerate(reversed(created)):
+            outcome.master_id = result.last_voucher_id - offset
+
+
+def import_vouchers(client, vouchers, company_name=None, batch_size=DEFAULT_VOUCHER_BATCH_SIZE, adaptive=True,
+                    max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, sequential_ids=False,
+                    max_failed_batches=DEFAULT_MAX_FAILED_BATCHES, method="import_vouchers"):
+    """
+    Create, alter and cancel vouchers in multi-voucher Import Data requests
+
+    Each spec is a dict with an "action" and the arguments of the matching single-voucher method
+    (without company_name):
+        - "journal" (default): entries, date, voucher_number, narration (create_journal_voucher)
+        - "receipt": party_ledger_name, amount, date, narration, voucher_number (create_receipt_voucher)
+        - "alter": master_id, narration, voucher_type (update_voucher)
+        - "cancel": master_id (cancel_voucher)
+
+    Batches that get no usable response are not resent, since Tally may have applied them;
+    their vouchers are reported as unknown.
+
+    Args:
+        client (TallyClient): Client to send with
+        vouchers (iterable): Voucher specs, consumed lazily
+        company_name (str, optional): Target company. Default: None (current company)
+        batch_size (int, optional): Vouchers per request (the starting size when adaptive). Default: 100
+        adaptive (bool, optional): Resize batches from Tally's response times. Default: True
+        max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+        sequential_ids (bool, optional): Number the MasterIDs of fully created batches back from
+                                         LASTVCHID. Only valid while nobody else creates vouchers
+                                         in the company. Default: False
+        max_failed_batches (int, optional): Stop after this many failed batches in a row; the
+                                            remaining vouchers are reported as skipped. Default: 3
+        method (str, optional): Method name used for timeout and lane lookup
+
+    Returns:
+        BulkImportResult: One ImportOutcome per spec in input order (with master_id where known),
+                          and the ImportResult of each request
+    """
+    bulk = BulkImportResult()
+    sizer = AdaptiveBatchSize(batch_size, maximum=max(batch_size, MAX_VOUCHER_BATCH_SIZE)) if adaptive else None
+    failed_batches = 0
+    batch = []
+    batch_bytes = 0
+
+    def send(batch):
+        nonlocal failed_batches
+        request = client._import_request([voucher.xml for voucher in batch], company_name, report_name="Vouchers")
+        started = time.monotonic()
+        response = client._send_request(request, method=method)
+        elapsed = time.monotonic() - started
+        entries = [(voucher.index, voucher.name, voucher.xml) for voucher in batch]
+        try:
+            result = ImportResult.from_response(response)
+        except ValueError as e:
+            logging.error(f"Voucher import batch of {len(batch)} failed: {e}")
+            failed_batches += 1
+            result = ImportResult(errors=len(batch), line_errors=[str(e)])
+            outcomes = [ImportOutcome(index, name, UNKNOWN, str(e)) for index, name, _ in entries]
+        else:
+            failed_batches = 0
+            outcomes = attribute_outcomes(entries, result, [voucher.status for voucher in batch])
+            _assign_master_ids(batch, outcomes, result, sequential_ids)
+        if sizer is not None:
+            sizer.record(len(batch), elapsed, failed=failed_batches > 0)
+        bulk.items.extend(outcomes)
+        bulk.batches.append(result)
+
+    vouchers = iter(vouchers)
+    for index, spec in enumerate(vouchers):
+        try:
+            voucher = prepare_voucher(client, index, spec)
+        except (ValueError, KeyError, TypeError) as e:
+            bulk.items.append(ImportOutcome(index, _spec_name(spec) if isinstance(spec, dict) else None, ERROR,
+                                            f"Invalid voucher spec: {e}"))
+            continue
+        limit = sizer.size if sizer is not None else batch_size
+        if batch and (len(batch) >= limit or batch_bytes + len(voucher.xml) > max_batch_bytes):
+            send(batch)
+            batch = []
+            batch_bytes = 0
+            if failed_batches >= max_failed_batches:
+                logging.error(f"Voucher import stopped after {failed_batches} failed batches")
+                bulk.items.append(ImportOutcome(voucher.index, voucher.name, SKIPPED))
+                bulk.items.extend(ImportOutcome(rest, _spec_name(spec) if isinstance(spec, dict) else None, SKIPPED)
+                                  for rest, spec in enumerate(vouchers, index + 1))
+                break
+        batch.append(voucher)
+        batch_bytes += len(voucher.xml)
+    else:
+        if batch:
+            send(batch)
+
+    # Invalid specs are reported as they are found, ahead of their batch
+    bulk.items.sort(key=lambda outcome: outcome.index)
+    return bulk
@@ -1,6 +1,22 @@
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 import xml.etree.ElementTree as ET
 import logging
+from contextlib import nullcontext
+from requestScheduler import get_scheduler, INTERACTIVE, IMPORT, BULK
+from xmlStream import iter_elements, decode_body, parse_xml_bytes, sanitize_xml, TallyErrorResponse
+from envelopeTemplates import envelope, element
+from importResult import import_result_or_error
+from bulkImport import import_masters, DEFAULT_BATCH_SIZE, DEFAULT_MAX_BATCH_BYTES
+from voucherImport import import_vouchers, DEFAULT_VOUCHER_BATCH_SIZE
+from incrementalSync import sync_collection, parse_company_alter_ids
+from responseCache import ResponseCache, alter_id_token
+from dateSharding import iter_date_shards, parse_range_date, DEFAULT_WINDOW_DAYS
+from fieldProjection import native_methods
+from tallyQuery import Query, _literal
+from multiGet import get_by_master_ids, get_by_names, get_by_numbers_and_dates, DEFAULT_CHUNK_SIZE
+from ledgerBalances import parse_ledger_balances
 import sys # For basic logging config
 
 # --- Logging Setup ---
@@ -11,37 +27,306 @@ logging.basicConfig(
 )
 
 class TallyClient:
-    def __init__(self, tally_url="http://localhost", tally_port=9000):
+    # Per-method (connect, read) timeouts in seconds. Methods not listed here use the
+    # client-wide connect_timeout/read_timeout. A read timeout of None waits indefinitely,
+    # which is what long report exports need.
+    DEFAULT_METHOD_TIMEOUTS = {
+        "test_connection": (5, 10),
+        "list_tally_companies": (10, 20),
+        "select_tally_company": (10, 25),
+    }
+
+    # Scheduler lane per method. Methods not listed here are interactive lookups.
+    DEFAULT_METHOD_LANES = {
+        "get_sales_report": BULK,
+        "get_ledgers_list": BULK,
+        "get_ledger_balances": BULK,
+        "get_stock_items_list": BULK,
+        "get_vouchers_by_type": BULK,
+        "get_sales_report_voucher_register": BULK,
+        "get_bill_receivables": BULK,
+        "get_ledger_vouchers": BULK,
+        "get_group_vouchers": BULK,
+        "get_stock_vouchers_summary": BULK,
+        "get_stock_ageing": BULK,
+        "get_list_of_accounts": BULK,
+        "iter_changed_objects": BULK,
+        "get_object_ids": BULK,
+        "query": BULK,
+        "query_bounds": BULK,
+        "query_page": BULK,
+        "aggregate": BULK,
+        "multi_get": BULK,
+        "create_ledger": IMPORT,
+        "create_receipt_voucher": IMPORT,
+        "create_stock_item": IMPORT,
+        "create_unit": IMPORT,
+        "create_company": IMPORT,
+        "configure_company": IMPORT,
+        "enable_gst": IMPORT,
+        "delete_ledger": IMPORT,
+        "delete_stock_item": IMPORT,
+        "update_unit": IMPORT,
+        "delete_unit": IMPORT,
+        "create_journal_voucher": IMPORT,
+        "update_voucher": IMPORT,
+        "cancel_voucher": IMPORT,
+        "create_group": IMPORT,
+        "update_group": IMPORT,
+        "delete_group": IMPORT,
+        "create_ledgers": IMPORT,
+        "create_groups": IMPORT,
+        "create_stock_items": IMPORT,
+        "create_units": IMPORT,
+        "delete_ledgers": IMPORT,
+        "delete_groups": IMPORT,
+        "delete_stock_items": IMPORT,
+        "delete_units": IMPORT,
+        "import_vouchers": IMPORT,
+    }
+
+    def __init__(self, tally_url="http://localhost", tally_port=9000, pool_connections=1, pool_maxsize=4,
+                 connect_timeout=10, read_timeout=None, method_timeouts=None, scheduler=None,
+                 method_lanes=None, raw_bytes=False, cache=None, raise_transport_errors=False):
         """
         Initialize TallyClient with server URL and port
         
         Args:
             tally_url (str): Tally server URL
             tally_port (int): Tally server port
+            pool_connections (int, optional): Number of host pools kept by the session. Default: 1
+            pool_maxsize (int, optional): Keep-alive connections kept open to Tally. Default: 4
+            connect_timeout (float, optional): Seconds to wait for the TCP connection. Default: 10
+            read_timeout (float, optional): Seconds to wait for Tally's response. Default: None (no limit)
+            method_timeouts (dict, optional): Per-method overrides, e.g. {"get_ledgers_list": (5, 60)}.
+                                              A bare number is used as both connect and read timeout.
+            scheduler (RequestScheduler or bool, optional): Scheduler that queues requests by priority.
+                                              Default: None (the scheduler shared by all clients of this
+                                              endpoint). Pass False to send requests unscheduled.
+            method_lanes (dict, optional): Per-method lane overrides, e.g. {"get_ledgers_list": "interactive"}
+            raw_bytes (bool, optional): Return response bodies as undecoded bytes instead of str.
+                                        "Error: ..." results are still str. Default: False
+            cache (ResponseCache or bool, optional): Read-through cache for master-data lists
+                                        (get_ledgers_list, get_groups_list, ...). Pass True for an
+                                        in-memory cache with the default TTLs. Default: None (no cache)
+            raise_transport_errors (bool, optional): Let connection errors and timeouts raise
+                                        requests.exceptions.RequestException instead of returning
+                                        an "Error: ..." string (used by TallyPool for failover).
+                                        Default: False
         """
         self.tally_url = tally_url
         self.tally_port = tally_port
         self.endpoint = f"{tally_url}:{tally_port}"
+        self.raw_bytes = raw_bytes
+        self.raise_transport_errors = raise_transport_errors
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.method_timeouts = dict(self.DEFAULT_METHOD_TIMEOUTS)
+        if method_timeouts:
+            self.method_timeouts.update(method_timeouts)
+        self.method_lanes = dict(self.DEFAULT_METHOD_LANES)
+        if method_lanes:
+            self.method_lanes.update(method_lanes)
+
+        # Tally processes one request at a time; the scheduler keeps quick lookups from
+        # queueing behind long exports. Shared per endpoint so all clients see one queue.
+        if scheduler is None:
+            scheduler = get_scheduler(self.endpoint)
+        self.scheduler = scheduler or None
+
+        # Cached lists are dropped when this client writes what they contain
+        self.cache = ResponseCache() if cache is True else (cache or None)
+
+        # One keep-alive session for every call, so repeated requests reuse the TCP
+        # connection to Tally instead of opening a new one each time.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the pooled connections held by this client
+        """
+        self.session.close()
+
+    def _timeout_for(self, method=None):
+        """
+        Resolve the (connect, read) timeout for a client method
         
-    def _send_request(self, xml_request):
+        Args:
+            method (str, optional): Name of the TallyClient method making the request
+            
+        Returns:
+            tuple: (connect_timeout, read_timeout)
+        """
+        timeout = self.method_timeouts.get(method) if method else None
+        if timeout is None:
+            return (self.connect_timeout, self.read_timeout)
+        if isinstance(timeout, (int, float)):
+            return (timeout, timeout)
+        return tuple(timeout)
+
+    def _slot(self, method=None):
         """
-        Send XML request to Tally server
+        Scheduler slot for a client method (a no-op context when scheduling is disabled)
+        """
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(self.method_lanes.get(method, INTERACTIVE))
+
+    def _post(self, xml_request, method=None, headers=None):
+        """
+        POST a request body to Tally over the pooled session
         
         Args:
-            xml_request (str): XML request string
+            xml_request (str or bytes): XML request
+            method (str, optional): Name of the calling method, used for timeout overrides
+            headers (dict, optional): Extra HTTP headers
             
         Returns:
-            str: XML response from Tally
+            requests.Response: Raw HTTP response
+        """
+        if isinstance(xml_request, str):
+            xml_request = xml_request.encode('utf-8')
+        with self._slot(method):
+            return self.session.post(self.endpoint, data=xml_request, headers=headers,
+                                     timeout=self._timeout_for(method))
+
+    def _stream_response(self, xml_request, method=None, chunk_size=65536, response_headers=None):
+        """
+        POST a request to Tally and yield the response body as it arrives
+        
+        The scheduler slot and the connection are held until the body has been read
+        (or the generator is closed). The bulk and import lanes allow one request at a
+        time, so the thread reading a stream cannot send another request of the same lane
+        until it is done: the scheduler raises RuntimeError instead of deadlocking.
+        
+        Args:
+            xml_request (str or bytes): XML request
+            method (str, optional): Name of the calling method, used for timeout and lane lookup
+            chunk_size (int, optional): Bytes per chunk. Default: 65536
+            response_headers (CaseInsensitiveDict, optional): Filled with the response headers
+                                                              before the first chunk is yielded
+            
+        Yields:
+            bytes: Response body chunks
+            
+        Raises:
+            requests.exceptions.RequestException: On connection errors, timeouts or a non-200 status
+        """
+        if isinstance(xml_request, str):
+            xml_request = xml_request.encode('utf-8')
+        with self._slot(method):
+            response = self.session.post(self.endpoint, data=xml_request, stream=True,
+                                         timeout=self._timeout_for(method))
+            try:
+                response.raise_for_status()
+                if response_headers is not None:
+                    response_headers.update(response.headers)
+                yield from response.iter_content(chunk_size)
+            finally:
+                response.close()
+
+    def _iter_response_elements(self, xml_request, tag, method=None):
+        """
+        Stream a request's response through an incremental parser
+        
+        Args:
+            xml_request (str or bytes): XML request
+            tag (str): Tag of the records to yield
+            method (str, optional): Name of the calling method
+            
+        Yields:
+            xml.etree.ElementTree.Element: One record at a time, cleared once the next is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails, or Tally answers with an
+                                                  error envelope (LINEERROR, STATUS other than 1)
+        """
+        headers = CaseInsensitiveDict()
+        elements = iter_elements(self._stream_response(xml_request, method=method, response_headers=headers),
+                                 tag, headers=headers, check_errors=True)
+        try:
+            yield from elements
+        except TallyErrorResponse as e:
+            # An error envelope holds no records; without this it would read as an empty result
+            raise requests.exceptions.RequestException(f"{method or 'request'}: {e}") from e
+        
+    def _send_request(self, xml_request, method=None):
         """
+        Send XML request to Tally server
+        
+        Args:
+            xml_request (str or bytes): XML request
+            method (str, optional): Name of the calling method, used for timeout overrides
+            
+        Returns:
+            str: XML response from Tally (bytes when the client was created with raw_bytes=True)
+            
+        Raises:
+            requests.exceptions.RequestException: Only with raise_transport_errors, on connection
+                                                  errors and timeouts
+        """
+        cache = self.cache
+        if cache is not None:
+            cached, token = cache.lookup(method, xml_request, self.raw_bytes, validator=self._alter_id_token)
+            if cached is not None:
+                return cached
         try:
-            response = requests.post(self.endpoint, data=xml_request)
+            response = self._post(xml_request, method=method)
             if response.status_code == 200:
-                return response.text
+                # Decode with the encoding Tally actually used rather than response.text,
+                # which falls back to ISO-8859-1 or charset guessing over the whole body
+                if self.raw_bytes:
+                    result = response.content
+                else:
+                    result = decode_body(response.content, response.headers.get('Content-Type'))
             else:
-                return f"Error: HTTP {response.status_code}"
+                result = f"Error: HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            if self.raise_transport_errors:
+                raise
+            result = f"Error: {str(e)}"
         except Exception as e:
-            return f"Error: {str(e)}"
+            result = f"Error: {str(e)}"
+        if cache is not None:
+            cache.put(method, xml_request, result, self.raw_bytes, token=token)
+            cache.after_request(method)
+        return result
+    
+    def _alter_id_token(self, dependencies):
+        """
+        Validation token of the cache: the loaded companies' alteration IDs named in dependencies
+        
+        Args:
+            dependencies (tuple): "master" and/or "voucher"
+            
+        Returns:
+            str: Token, or None if the probe failed
+        """
+        companies = self.get_company_alter_ids()
+        return alter_id_token(companies, dependencies) if isinstance(companies, dict) else None
     
+    def _send_import(self, xml_request, method=None):
+        """
+        Send an Import Data request and parse Tally's response
+        
+        Args:
+            xml_request (str or bytes): XML request
+            method (str, optional): Name of the calling method, used for timeout overrides
+            
+        Returns:
+            ImportResult: Parsed response, or the "Error: ..." string if the request failed
+        """
+        return import_result_or_error(self._send_request(xml_request, method=method))
+
     def test_connection(self):
         """
         Test connection to Tally server
@@ -50,7 +335,7 @@ class TallyClient:
             bool: True if connection successful, False otherwise
         """
         try:
-            response = requests.post(self.endpoint, data="")
+            response = self._post("", method="test_connection")
             return response.status_code == 200
         except:
             return False
@@ -62,7 +347,7 @@ class TallyClient:
         Returns:
             str: Current company name
         """
-        xml_request = """<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -84,9 +369,9 @@ class TallyClient:
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render()
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_current_company")
     
     # -------------------- Collections --------------------
     
@@ -97,7 +382,7 @@ class TallyClient:
         Returns:
             str: XML response with sales vouchers
         """
-        xml_request = """<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
 <HEADER>
 <VERSION>1</VERSION>
 <TALLYREQUEST>EXPORT</TALLYREQUEST>
@@ -116,9 +401,9 @@ class TallyClient:
 </TDL>
 </DESC>
 </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render()
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_sales_report")
     
     def get_companies_list(self, include_simple_companies=False):
         """
@@ -132,7 +417,7 @@ class TallyClient:
         """
         simple_companies_value = "No" if not include_simple_companies else "Yes"
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -156,23 +441,28 @@ class TallyClient:
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(simple_companies_value=simple_companies_value)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_companies_list")
     
-    def get_ledgers_list(self, company_name=None):
+    def get_ledgers_list(self, company_name=None, fields=None):
         """
         Get list of ledgers from Tally
         
         Args:
             company_name (str): Company name
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (Address, MasterID and every method)
             
         Returns:
             str: XML response with ledgers list
         """
-        company_element = f"<SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>" if company_name else ""
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        field_elements = native_methods(fields, "Ledger", b"<NATIVEMETHOD>Address</NATIVEMETHOD>"
+                                                          b"<NATIVEMETHOD>Masterid</NATIVEMETHOD>"
+                                                          b"<NATIVEMETHOD>*</NATIVEMETHOD>")
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -183,32 +473,105 @@ class TallyClient:
         <DESC>
             <STATICVARIABLES>
                 <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                {company_element}
+                {company_element:xml}
             </STATICVARIABLES>
             <TDL>
                 <TDLMESSAGE>
                     <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Ledgers">
                         <TYPE>Ledger</TYPE>
-                        <NATIVEMETHOD>Address</NATIVEMETHOD>
-                        <NATIVEMETHOD>Masterid</NATIVEMETHOD>
-                        <NATIVEMETHOD>*</NATIVEMETHOD>
+                        {field_elements:xml}
+                    </COLLECTION>
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render(company_element=company_element, field_elements=field_elements)
+        
+        return self._send_request(xml_request, method="get_ledgers_list")
+    
+    def get_ledger_balances(self, company_name=None, from_date=None, to_date=None, group_name=None):
+        """
+        Get opening/closing balances and period debit/credit totals of every ledger in one export
+        
+        Only the balance methods are exported, and the response is streamed into column arrays.
+        
+        Args:
+            company_name (str, optional): Company name. Default: None (current company)
+            from_date (str or datetime.date, optional): Period start. Default: None (Tally's current period)
+            to_date (str or datetime.date, optional): Period end. Default: None (Tally's current period)
+            group_name (str, optional): Only ledgers under this group, including its sub-groups. Default: None
+            
+        Returns:
+            LedgerBalances: Balances by ledger (see ledgerBalances)
+            
+        Raises:
+            ValueError: If only one date is given, or a date is not in a recognised format
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        if bool(from_date) != bool(to_date):
+            raise ValueError("from_date and to_date must be given together")
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        date_vars = b""
+        if from_date:
+            date_vars = envelope("""<SVFROMDATE TYPE="Date">{from_date}</SVFROMDATE>
+                <SVTODATE TYPE="Date">{to_date}</SVTODATE>""").render(
+                from_date=parse_range_date(from_date)[0].strftime("%Y%m%d"),
+                to_date=parse_range_date(to_date)[0].strftime("%Y%m%d"))
+        group_elements = b""
+        if group_name:
+            group_elements = element("CHILDOF", group_name) + b"<BELONGSTO>Yes</BELONGSTO>"
+        
+        xml_request = envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Collection</TYPE>
+        <ID>LedgerBalances</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                {company_element:xml}
+                {date_vars:xml}
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="LedgerBalances">
+                        <TYPE>Ledger</TYPE>
+                        {group_elements:xml}
+                        <NATIVEMETHOD>Name</NATIVEMETHOD>
+                        <NATIVEMETHOD>Parent</NATIVEMETHOD>
+                        <NATIVEMETHOD>MasterID</NATIVEMETHOD>
+                        <NATIVEMETHOD>OpeningBalance</NATIVEMETHOD>
+                        <NATIVEMETHOD>ClosingBalance</NATIVEMETHOD>
+                        <COMPUTE>PeriodDebits : $TBalDebits</COMPUTE>
+                        <COMPUTE>PeriodCredits : $TBalCredits</COMPUTE>
                     </COLLECTION>
                 </TDLMESSAGE>
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(company_element=company_element, date_vars=date_vars, group_elements=group_elements)
         
-        return self._send_request(xml_request)
+        return parse_ledger_balances(self._iter_response_elements(xml_request, "LEDGER",
+                                                                  method="get_ledger_balances"))
     
-    def get_stock_items_list(self):
+    def get_stock_items_list(self, fields=None):
         """
         Get list of stock items from Tally
         
+        Args:
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (MasterID and GUID)
+        
         Returns:
             str: XML response with stock items list
         """
-        xml_request = """<ENVELOPE>
+        field_elements = native_methods(fields, "StockItem", b"<NATIVEMETHOD>MasterID</NATIVEMETHOD>"
+                                                             b"<NATIVEMETHOD>GUID</NATIVEMETHOD>")
+        
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -222,16 +585,15 @@ class TallyClient:
                 <TDLMESSAGE>
                     <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="Yes" ISOPTION="No" ISINTERNAL="No" NAME="Custom List of StockItems">
                         <TYPE>StockItem</TYPE>
-                        <NATIVEMETHOD>MasterID</NATIVEMETHOD>
-                        <NATIVEMETHOD>GUID</NATIVEMETHOD>
+                        {field_elements:xml}
                     </COLLECTION>
                 </TDLMESSAGE>
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(field_elements=field_elements)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_stock_items_list")
     
     def get_vouchers_by_type(self, company_name, from_date, to_date, voucher_type="Attendance"):
         """
@@ -246,7 +608,28 @@ class TallyClient:
         Returns:
             str: XML response with vouchers
         """
-        xml_request = f"""<ENVELOPE>
+        xml_request = self._vouchers_by_type_request(company_name, from_date, to_date, voucher_type)
+        
+        return self._send_request(xml_request, method="get_vouchers_by_type")
+    
+    @staticmethod
+    def _vouchers_by_type_request(company_name, from_date, to_date, voucher_type, line_xml_tag=None):
+        """
+        Build the List Of Vouchers report used by get_vouchers_by_type
+        
+        Args:
+            company_name (str): Company name
+            from_date (str): From date (format: 01-Apr-2010)
+            to_date (str): To date (format: 04-Jun-2021)
+            voucher_type (str): Voucher type
+            line_xml_tag (str, optional): Wrap each voucher's fields in this tag. Default: None (flat fields)
+            
+        Returns:
+            bytes: XML request body
+        """
+        line_xml_tag_element = element("XMLTAG", line_xml_tag) if line_xml_tag else b""
+        
+        return envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -279,6 +662,7 @@ class TallyClient:
                         <LEFTFIELDS>MASTERID</LEFTFIELDS>
                         <LEFTFIELDS>VoucherNumber</LEFTFIELDS>
                         <LEFTFIELDS>Date</LEFTFIELDS>
+                        {line_xml_tag_element:xml}
                     </LINE>
                     <FIELD ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="MASTERID">
                         <SET>$MASTERID</SET>
@@ -296,14 +680,13 @@ class TallyClient:
                         <TYPE>Voucher</TYPE>
                         <FILTERS>VoucherType</FILTERS>
                     </COLLECTION>
-                    <SYSTEM TYPE="Formulae" NAME="VoucherType">$VoucherTypeName = "{voucher_type}"</SYSTEM>
+                    <SYSTEM TYPE="Formulae" NAME="VoucherType">$VoucherTypeName = {voucher_type}</SYSTEM>
                 </TDLMESSAGE>
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+</ENVELOPE>""").render(company_name=company_name, from_date=from_date, to_date=to_date,
+                       line_xml_tag_element=line_xml_tag_element, voucher_type=_literal(voucher_type, "str"))
     
     def get_groups_list(self):
         """
@@ -312,7 +695,7 @@ class TallyClient:
         Returns:
             str: XML response with groups list
         """
-        xml_request = """<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
      <HEADER>
             <VERSION>1</VERSION>
             <TALLYREQUEST>Export</TALLYREQUEST>
@@ -346,23 +729,26 @@ class TallyClient:
 </DESC>
 </BODY>
 </ENVELOPE>
-"""
+""").render()
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_groups_list")
     
-    def get_groups_list(self, company_name=None):
+    def get_groups_list(self, company_name=None, fields=None):
         """
         Get list of groups from Tally
 
         Args:
             company_name (str, optional): Company name. If None, uses the currently selected company.
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (Name, Parent and MasterID)
 
         Returns:
             str: XML response with groups list
         """
-        company_element = f"<SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>" if company_name else ""
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        field_elements = native_methods(fields, "Group", b"<FETCH>Name, Parent, MasterID</FETCH>")
 
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -373,21 +759,21 @@ class TallyClient:
         <DESC>
             <STATICVARIABLES>
                 <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                {company_element}
+                {company_element:xml}
             </STATICVARIABLES>
             <TDL>
                 <TDLMESSAGE>
                     <COLLECTION NAME="List of Groups" ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No">
                         <TYPE>Group</TYPE>
-                        <FETCH>Name, Parent, MasterID</FETCH>
+                        {field_elements:xml}
                     </COLLECTION>
                 </TDLMESSAGE>
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(company_element=company_element, field_elements=field_elements)
 
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_groups_list")
 
     # -------------------- Reports --------------------
     
@@ -401,9 +787,37 @@ class TallyClient:
             employee_name (str): Employee name
             
         Returns:
-            str: PDF data of payslip
+            bytes: PDF data of payslip
+        """
+        xml_request = self._payslip_request(from_date, to_date, employee_name)
+        
+        try:
+            # Bypass _send_request for this function to handle binary content
+            response = self._post(xml_request, method="get_payslip")
+            if response.status_code == 200:
+                # Return raw byte content for PDF
+                return response.content
+            else:
+                logging.error(f"Error fetching payslip: HTTP {response.status_code} - {response.text[:200]}...")
+                return f"Error: HTTP {response.status_code}"
+        except Exception as e:
+            logging.exception("Error occurred during get_payslip request.")
+            return f"Error: {str(e)}"
+    
+    @staticmethod
+    def _payslip_request(from_date, to_date, employee_name):
+        """
+        Build the SelectiveEmployeePaySlip export used by get_payslip
+        
+        Args:
+            from_date (str): From date (format: YYYYMMDD)
+            to_date (str): To date (format: YYYYMMDD)
+            employee_name (str): Employee name
+            
+        Returns:
+            bytes: XML request body
         """
-        xml_request = f"""<ENVELOPE>
+        return envelope("""<ENVELOPE>
 <HEADER>
 <TALLYREQUEST>Export Data</TALLYREQUEST>
 </HEADER>
@@ -420,20 +834,7 @@ class TallyClient:
 </REQUESTDESC>
 </EXPORTDATA>
 </BODY>
-</ENVELOPE>"""
-        
-        try:
-            # Send request specifically for this function to handle binary content
-            response = requests.post(self.endpoint, data=xml_request)
-            if response.status_code == 200:
-                # Return raw byte content for PDF
-                return response.content
-            else:
-                logging.error(f"Error fetching payslip: HTTP {response.status_code} - {response.text[:200]}...")
-                return f"Error: HTTP {response.status_code}"
-        except Exception as e:
-            logging.exception("Error occurred during get_payslip request.")
-            return f"Error: {str(e)}"
+</ENVELOPE>""").render(from_date=from_date, to_date=to_date, employee_name=employee_name)
     
     def get_sales_report_voucher_register(self, from_date, to_date, company_name, voucher_type="Sales"):
         """
@@ -448,7 +849,7 @@ class TallyClient:
         Returns:
             str: XML response with sales report
         """
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
   <HEADER>
     <VERSION>1</VERSION>
     <TALLYREQUEST>EXPORT</TALLYREQUEST>
@@ -466,9 +867,10 @@ class TallyClient:
       </STATICVARIABLES>
     </DESC>
   </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(from_date=from_date, to_date=to_date, company_name=company_name,
+                       voucher_type=voucher_type)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_sales_report_voucher_register")
     
     def get_bill_receivables(self, from_date, to_date, company_name):
         """
@@ -482,7 +884,7 @@ class TallyClient:
         Returns:
             str: XML response with bill receivables
         """
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Export Data</TALLYREQUEST>
     </HEADER>
@@ -500,11 +902,11 @@ class TallyClient:
             </REQUESTDESC>
         </EXPORTDATA>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(from_date=from_date, to_date=to_date, company_name=company_name)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_bill_receivables")
     
-    def get_ledger_vouchers(self, from_date, to_date, ledger_name="Sales"):
+    def get_ledger_vouchers(self, from_date, to_date, ledger_name="Sales", fields=None):
         """
         Get vouchers for a specific ledger
         
@@ -512,11 +914,15 @@ class TallyClient:
             from_date (str): From date
             to_date (str): To date
             ledger_name (str): Ledger name (default: Sales)
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (every method)
             
         Returns:
             str: XML response with ledger vouchers
         """
-        xml_request = f"""<ENVELOPE>
+        field_elements = native_methods(fields, "Voucher", b"<NATIVEMETHOD>*</NATIVEMETHOD>")
+        
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -536,7 +942,7 @@ class TallyClient:
                     <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Vouchers">
                         <TYPE> Vouchers</TYPE>
                         <Childof>{ledger_name}</Childof>
-                        <NATIVEMETHOD>*</NATIVEMETHOD>
+                        {field_elements:xml}
                     
                     </COLLECTION>
   
@@ -544,11 +950,12 @@ class TallyClient:
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(from_date=from_date, to_date=to_date, ledger_name=ledger_name,
+                       field_elements=field_elements)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_ledger_vouchers")
     
-    def get_group_vouchers(self, from_date, to_date, group_name="Sales Accounts"):
+    def get_group_vouchers(self, from_date, to_date, group_name="Sales Accounts", fields=None):
         """
         Get vouchers for a specific group
         
@@ -556,11 +963,15 @@ class TallyClient:
             from_date (str): From date
             to_date (str): To date
             group_name (str): Group name (default: Sales Accounts)
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (every method)
             
         Returns:
             str: XML response with group vouchers
         """
-        xml_request = f"""<ENVELOPE>
+        field_elements = native_methods(fields, "Voucher", b"<NATIVEMETHOD>*</NATIVEMETHOD>")
+        
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -580,7 +991,7 @@ class TallyClient:
                     <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Vouchers">
                         <TYPE> Vouchers : Group</TYPE>
                         <Childof>{group_name}</Childof>
-                        <NATIVEMETHOD>*</NATIVEMETHOD>
+                        {field_elements:xml}
                     
                     </COLLECTION>
   
@@ -588,9 +999,10 @@ class TallyClient:
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(from_date=from_date, to_date=to_date, group_name=group_name,
+                       field_elements=field_elements)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_group_vouchers")
     
     def get_stock_vouchers_summary(self, stock_item_name, explode_vnum=True, explode_flag=False):
         """
@@ -607,7 +1019,7 @@ class TallyClient:
         explode_vnum_value = "Yes" if explode_vnum else "No"
         explode_flag_value = "Yes" if explode_flag else "No"
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
 <HEADER>
 <VERSION>1</VERSION>
 <TALLYREQUEST>Export</TALLYREQUEST>
@@ -624,9 +1036,10 @@ class TallyClient:
 </STATICVARIABLES>
 </DESC>
 </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(explode_vnum_value=explode_vnum_value, explode_flag_value=explode_flag_value,
+                       stock_item_name=stock_item_name)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_stock_vouchers_summary")
     
     def get_stock_ageing(self, stock_group_name, from_date, to_date):
         """
@@ -640,7 +1053,7 @@ class TallyClient:
         Returns:
             str: XML response with stock ageing report
         """
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
 <HEADER>
 <VERSION>1</VERSION>
 <TALLYREQUEST>Export</TALLYREQUEST>
@@ -656,9 +1069,9 @@ class TallyClient:
 </STATICVARIABLES>
 </DESC>
 </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(stock_group_name=stock_group_name, from_date=from_date, to_date=to_date)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_stock_ageing")
     
     def get_list_of_accounts(self, from_date="", to_date=""):
         """
@@ -671,7 +1084,7 @@ class TallyClient:
         Returns:
             str: XML response with list of accounts
         """
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Export data</TALLYREQUEST>
     </HEADER>
@@ -687,149 +1100,639 @@ class TallyClient:
             </REQUESTDESC>
         </EXPORTDATA>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(from_date=from_date, to_date=to_date)
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_list_of_accounts")
     
-    # -------------------- Objects --------------------
+    # -------------------- Streaming --------------------
+    # Each iter_* generator holds its scheduler slot until it is exhausted or closed; read
+    # it to the end (or close it) before sending another request of its lane on the same thread.
     
-    def get_ledger_by_name(self, ledger_name, from_date=None, to_date=None):
+    def iter_sales_report(self):
         """
-        Get ledger by name
+        Stream all Sales Vouchers for Current Period one voucher at a time
         
-        Args:
-            ledger_name (str): Ledger name
-            from_date (str, optional): From date (format: YYYYMMDD)
-            to_date (str, optional): To date (format: YYYYMMDD)
+        Yields:
+            xml.etree.ElementTree.Element: One VOUCHER element. It is cleared once the next
+                                           voucher is requested, so copy out what you need first.
             
-        Returns:
-            str: XML response with ledger details
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
         """
-        date_vars = ""
-        if from_date and to_date:
-            date_vars = f"""<SVFROMDATE TYPE="Date">{from_date}</SVFROMDATE>
-                <SVTODATE TYPE="Date">{to_date}</SVTODATE>"""
-        
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <VERSION>1</VERSION>
-        <TALLYREQUEST>Export</TALLYREQUEST>
-        <TYPE>Collection</TYPE>
-        <ID>Ledgers</ID>
-    </HEADER>
-    <BODY>
-        <DESC>
-            <STATICVARIABLES>
-                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                {date_vars}
-            </STATICVARIABLES>
-            <TDL>
-                <TDLMESSAGE>
-                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Ledgers">
-                        <TYPE>Ledger</TYPE>
-                        <NATIVEMETHOD>Address</NATIVEMETHOD>
-                        <NATIVEMETHOD>*</NATIVEMETHOD>
-                        <FILTERS>Ledgerfilter</FILTERS>
-                    </COLLECTION>
-                    <SYSTEM TYPE="Formulae" NAME="Ledgerfilter">$Name="{ledger_name}"</SYSTEM>
-                </TDLMESSAGE>
-            </TDL>
-        </DESC>
-    </BODY>
-</ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+        request = _build_request("get_sales_report")
+        return self._iter_response_elements(request.xml_request, "VOUCHER", method="get_sales_report")
     
-    def get_voucher_by_master_id(self, master_id, company_name=None):
+    def iter_ledgers_list(self, company_name=None, fields=None):
         """
-        Get voucher by master ID
+        Stream the ledgers list one ledger at a time
         
         Args:
-            master_id (str): Master ID of voucher
-            company_name (str, optional): Company name
+            company_name (str): Company name
+            fields (str or list, optional): Preset or method names to export, as for get_ledgers_list
             
-        Returns:
-            str: XML response with voucher details
+        Yields:
+            xml.etree.ElementTree.Element: One LEDGER element, cleared once the next ledger is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        request = _build_request("get_ledgers_list", company_name, fields)
+        return self._iter_response_elements(request.xml_request, "LEDGER", method="get_ledgers_list")
+    
+    def iter_stock_items_list(self, fields=None):
         """
-        company_element = f"<SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>" if company_name else ""
+        Stream the stock items list one stock item at a time
         
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <VERSION>1</VERSION>
-        <TALLYREQUEST>EXPORT</TALLYREQUEST>
-        <TYPE>Object</TYPE>
-        <SUBTYPE>VOUCHER</SUBTYPE>
-        <ID TYPE="Name">ID:'{master_id}'</ID>
-    </HEADER>
-    <BODY>
-        <DESC>
-            <STATICVARIABLES>
-            {company_element}
-                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                <SVViewName>Accounting Voucher View</SVViewName>
-            </STATICVARIABLES>
-            <FETCHLIST>
-                <FETCH>*</FETCH>
-                
-            </FETCHLIST>
-        </DESC>
-    </BODY>
-</ENVELOPE>"""
+        Args:
+            fields (str or list, optional): Preset or method names to export, as for get_stock_items_list
         
-        return self._send_request(xml_request)
+        Yields:
+            xml.etree.ElementTree.Element: One STOCKITEM element, cleared once the next item is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        request = _build_request("get_stock_items_list", fields)
+        return self._iter_response_elements(request.xml_request, "STOCKITEM", method="get_stock_items_list")
     
-    def get_voucher_by_number_and_date(self, voucher_date, voucher_number, company_name=None):
+    def iter_vouchers_by_type(self, company_name, from_date, to_date, voucher_type="Attendance"):
         """
-        Get voucher by number and date
+        Stream vouchers by type one voucher at a time
         
         Args:
-            voucher_date (str): Voucher date (format: DD-MMM-YYYY)
-            voucher_number (str): Voucher number
-            company_name (str, optional): Company name
+            company_name (str): Company name
+            from_date (str): From date (format: 01-Apr-2010)
+            to_date (str): To date (format: 04-Jun-2021)
+            voucher_type (str): Voucher type (default: Attendance)
             
-        Returns:
-            str: XML response with voucher details
+        Yields:
+            xml.etree.ElementTree.Element: One VOUCHER element with MASTERID, VOUCHERNUMBER and DATE
+                                           children, cleared once the next voucher is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
         """
-        company_element = f"<SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>" if company_name else ""
-        
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <VERSION>1</VERSION>
-        <TALLYREQUEST>EXPORT</TALLYREQUEST>
-        <TYPE>Object</TYPE>
-        <SUBTYPE>VOUCHER</SUBTYPE>
-        <ID TYPE="Name">Date:'{voucher_date}':VoucherNumber:'{voucher_number}'</ID>
-    </HEADER>
-    <BODY>
-        <DESC>
-            <STATICVARIABLES>
-            {company_element}
-                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
-                <SVViewName>Accounting Voucher View</SVViewName>
-            </STATICVARIABLES>
-            <FETCHLIST>
-                <FETCH>*</FETCH>
-                
-            </FETCHLIST>
-        </DESC>
-    </BODY>
-</ENVELOPE>"""
+        xml_request = self._vouchers_by_type_request(company_name, from_date, to_date, voucher_type,
+                                                     line_xml_tag="VOUCHER")
+        return self._iter_response_elements(xml_request, "VOUCHER", method="get_vouchers_by_type")
+    
+    def iter_ledger_vouchers(self, from_date, to_date, ledger_name="Sales", fields=None):
+        """
+        Stream vouchers for a specific ledger one voucher at a time
         
-        return self._send_request(xml_request)
+        Args:
+            from_date (str): From date
+            to_date (str): To date
+            ledger_name (str): Ledger name (default: Sales)
+            fields (str or list, optional): Preset or method names to export. Default: None (every method)
+            
+        Yields:
+            xml.etree.ElementTree.Element: One VOUCHER element, cleared once the next voucher is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        request = _build_request("get_ledger_vouchers", from_date, to_date, ledger_name, fields)
+        return self._iter_response_elements(request.xml_request, "VOUCHER", method="get_ledger_vouchers")
     
-    def get_stock_item_by_master_id(self, master_id):
+    def iter_group_vouchers(self, from_date, to_date, group_name="Sales Accounts", fields=None):
         """
-        Get stock item by master ID
+        Stream vouchers for a specific group one voucher at a time
         
         Args:
-            master_id (str): Master ID of stock item
+            from_date (str): From date
+            to_date (str): To date
+            group_name (str): Group name (default: Sales Accounts)
+            fields (str or list, optional): Preset or method names to export. Default: None (every method)
             
-        Returns:
-            str: XML response with stock item details
+        Yields:
+            xml.etree.ElementTree.Element: One VOUCHER element, cleared once the next voucher is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
         """
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <VERSION>1</VERSION>
+        request = _build_request("get_group_vouchers", from_date, to_date, group_name, fields)
+        return self._iter_response_elements(request.xml_request, "VOUCHER", method="get_group_vouchers")
+    
+    # Date-range methods iter_sharded can split, and the element each one streams
+    SHARDED_METHODS = {
+        "get_vouchers_by_type": "VOUCHER",
+        "get_ledger_vouchers": "VOUCHER",
+        "get_group_vouchers": "VOUCHER",
+    }
+    
+    def iter_sharded(self, method, from_date, to_date, window_days=DEFAULT_WINDOW_DAYS, adaptive=True,
+                     progress=None, **arguments):
+        """
+        Stream a date-range export as a sequence of smaller windows
+        
+        Long ranges make Tally freeze or time out when exported in one request. The range is
+        split into windows (a month to start with, resized from Tally's response times when
+        adaptive) that are requested one after another and streamed as one sequence of
+        VOUCHER elements (see dateSharding.iter_date_shards).
+        
+        Args:
+            method (str): "get_vouchers_by_type", "get_ledger_vouchers" or "get_group_vouchers"
+                          (the Voucher Register report has no VOUCHER elements to stream)
+            from_date (str): From date, in the format the method takes
+            to_date (str): To date, in the same format
+            window_days (int, optional): Days per shard (the starting window when adaptive). Default: 31
+            adaptive (bool, optional): Resize windows from response times and sizes. Default: True
+            progress (ShardProgress, optional): Resume from and record progress. Default: None
+            **arguments: The method's other arguments, e.g. company_name, voucher_type or ledger_name
+            
+        Yields:
+            xml.etree.ElementTree.Element: One VOUCHER element, cleared once the next voucher is requested
+            
+        Raises:
+            ValueError: If the method cannot be sharded or a date is not recognised
+            requests.exceptions.RequestException: If a shard fails and cannot be split further
+        """
+        if method not in self.SHARDED_METHODS:
+            raise ValueError(f"{method} cannot be sharded by date")
+        tag = self.SHARDED_METHODS[method]
+        
+        def fetch(shard_from, shard_to):
+            if method == "get_vouchers_by_type":
+                xml_request = self._vouchers_by_type_request(arguments["company_name"], shard_from, shard_to,
+                                                             arguments.get("voucher_type", "Attendance"),
+                                                             line_xml_tag="VOUCHER")
+            else:
+                xml_request = _build_request(method, from_date=shard_from, to_date=shard_to, **arguments).xml_request
+            return self._iter_response_elements(xml_request, tag, method=method)
+        
+        return iter_date_shards(fetch, from_date, to_date, window_days, adaptive, progress)
+    
+    # -------------------- Incremental Sync --------------------
+    
+    def iter_changed_objects(self, object_type, min_alter_id=0, company_name=None, fields=None):
+        """
+        Stream the objects of a type whose AlterID is above min_alter_id
+        
+        Args:
+            object_type (str): Tally object type, e.g. "Ledger", "Group", "StockItem", "Voucher"
+            min_alter_id (int, optional): Only objects altered after this AlterID. Default: 0 (all)
+            company_name (str, optional): Company name. Default: None (current company)
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export besides MasterID and AlterID. Default: None (every method)
+            
+        Yields:
+            xml.etree.ElementTree.Element: One object element (LEDGER, VOUCHER, ...) with MASTERID
+                                           and ALTERID, cleared once the next object is requested
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        xml_request = self._changed_objects_request(object_type, min_alter_id, company_name, fields=fields)
+        return self._iter_response_elements(xml_request, object_type.upper(), method="iter_changed_objects")
+    
+    def get_object_ids(self, object_type, company_name=None):
+        """
+        MasterIDs of every object of a type (only the IDs are exported)
+        
+        Args:
+            object_type (str): Tally object type, e.g. "Ledger" or "Voucher"
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            set: MasterIDs (int)
+            
+        Raises:
+            requests.exceptions.RequestException: If the request to Tally fails
+        """
+        xml_request = self._changed_objects_request(object_type, 0, company_name, fetch_all=False)
+        ids = set()
+        for elem in self._iter_response_elements(xml_request, object_type.upper(), method="get_object_ids"):
+            master_id = (elem.findtext("MASTERID") or "").strip()
+            if master_id.isdigit():
+                ids.add(int(master_id))
+        return ids
+    
+    def count_objects(self, object_type, company_name=None):
+        """
+        Number of objects of a type, counted by Tally
+        
+        Args:
+            object_type (str): Tally object type, e.g. "Ledger" or "Voucher"
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            int: Object count, or an "Error: ..." string
+        """
+        response = self._send_request(self._object_count_request(object_type, company_name), method="count_objects")
+        if isinstance(response, str) and response.startswith("Error:"):
+            return response
+        try:
+            root = parse_xml_bytes(response) if isinstance(response, bytes) else ET.fromstring(sanitize_xml(response))
+        except ET.ParseError as e:
+            return f"Error: Unreadable object count: {e}"
+        count = (root.findtext(".//COUNT") or "").strip().replace(",", "")
+        if not count.isdigit():
+            return "Error: No object count in response"
+        return int(count)
+    
+    def get_company_alter_ids(self):
+        """
+        Last master and voucher alteration IDs of every loaded company.
+        
+        The export holds three values per company, so it is a cheap way to find out whether
+        anything changed before refetching lists or syncing.
+        
+        Returns:
+            dict: {company_name: CompanyAlterIds}, or an "Error: ..." string
+        """
+        response = self._send_request(self._company_alter_ids_request(), method="get_company_alter_ids")
+        if isinstance(response, str) and response.startswith("Error:"):
+            return response
+        try:
+            return parse_company_alter_ids(response)
+        except ET.ParseError as e:
+            return f"Error: Unreadable company AlterIDs: {e}"
+    
+    def probe_alter_ids(self, company_name=None):
+        """
+        Last master and voucher alteration IDs of one company
+        
+        Args:
+            company_name (str, optional): Company name. Default: None (the only loaded company)
+            
+        Returns:
+            CompanyAlterIds: master_alter_id and voucher_alter_id, or an "Error: ..." string
+        """
+        companies = self.get_company_alter_ids()
+        if not isinstance(companies, dict):
+            return companies
+        if company_name:
+            return companies.get(company_name) or f"Error: Company '{company_name}' is not loaded"
+        if len(companies) != 1:
+            return f"Error: {len(companies)} companies are loaded; pass company_name"
+        return next(iter(companies.values()))
+    
+    def sync_changes(self, kind, state, company_name=None, reconcile="auto", probe=True):
+        """
+        Incrementally sync one kind of object against saved watermarks
+        
+        Only objects altered since the last sync are exported, and deletions are found by
+        comparing MasterID sets (see incrementalSync.sync_collection). With probe, a sync
+        whose company alteration ID has not moved costs a single tiny request.
+        
+        Args:
+            kind (str): "ledgers", "groups", "stock_items" or "vouchers"
+            state (SyncState): Watermarks from the previous run (updated in place; save it afterwards)
+            company_name (str, optional): Company name. Default: None (current company)
+            reconcile (str, optional): Deletion check: "auto" (only when Tally's object count
+                                       disagrees), "always" or "never". Default: "auto"
+            probe (bool, optional): Check the company's alteration IDs first. Default: True
+            
+        Returns:
+            ChangeSet: changed (records), deleted (MasterIDs) and the new AlterID watermark
+        """
+        return sync_collection(self, kind, state, company_name, reconcile, probe)
+    
+    @staticmethod
+    def _changed_objects_request(object_type, min_alter_id=0, company_name=None, fetch_all=True, fields=None):
+        """
+        Build a collection export of the objects whose AlterID is above min_alter_id
+        
+        Args:
+            object_type (str): Tally object type
+            min_alter_id (int, optional): AlterID watermark. Default: 0 (all objects)
+            company_name (str, optional): Company name. Default: None (current company)
+            fetch_all (bool, optional): Export every native method; False exports only
+                                        MasterID and AlterID. Default: True
+            fields (str or list, optional): Projection to export instead of every method. Default: None
+            
+        Returns:
+            bytes: XML request body
+        """
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        all_methods = b"<NATIVEMETHOD>*</NATIVEMETHOD>" if fetch_all else b""
+        if fetch_all and object_type == "Voucher":
+            all_methods += b"<NATIVEMETHOD>AllLedgerEntries</NATIVEMETHOD>"
+        all_methods = native_methods(fields, object_type, all_methods)
+        
+        return envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Collection</TYPE>
+        <ID>Changed Objects</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                {company_element:xml}
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Changed Objects">
+                        <TYPE>{object_type}</TYPE>
+                        <NATIVEMETHOD>MasterID</NATIVEMETHOD>
+                        <NATIVEMETHOD>AlterID</NATIVEMETHOD>
+                        {all_methods:xml}
+                        <FILTERS>AboveAlterID</FILTERS>
+                    </COLLECTION>
+                    <SYSTEM TYPE="Formulae" NAME="AboveAlterID">$AlterID &gt; {min_alter_id}</SYSTEM>
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render(company_element=company_element, object_type=object_type, all_methods=all_methods,
+                       min_alter_id=int(min_alter_id))
+    
+    @staticmethod
+    def _object_count_request(object_type, company_name=None):
+        """
+        Build a report that returns the number of objects of a type as <COUNT>
+        
+        Args:
+            object_type (str): Tally object type
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            bytes: XML request body
+        """
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        
+        return envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Data</TYPE>
+        <ID>Object Count</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                {company_element:xml}
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <REPORT ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Object Count">
+                        <FORMS>Object Count</FORMS>
+                    </REPORT>
+                    <FORM ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Object Count">
+                        <TOPPARTS>Object Count</TOPPARTS>
+                        <XMLTAG>ObjectCount</XMLTAG>
+                    </FORM>
+                    <PART ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Object Count">
+                        <TOPLINES>Object Count</TOPLINES>
+                    </PART>
+                    <LINE ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Object Count">
+                        <LEFTFIELDS>Object Count</LEFTFIELDS>
+                    </LINE>
+                    <FIELD ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Object Count">
+                        <SET>$$NumItems:CountedObjects</SET>
+                        <XMLTAG>COUNT</XMLTAG>
+                    </FIELD>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="CountedObjects">
+                        <TYPE>{object_type}</TYPE>
+                    </COLLECTION>
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render(company_element=company_element, object_type=object_type)
+    
+    @staticmethod
+    def _company_alter_ids_request():
+        """
+        Build a collection export of each loaded company's name, AltMstId and AltVchId
+        
+        Returns:
+            bytes: XML request body
+        """
+        return envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Collection</TYPE>
+        <ID>Company AlterIDs</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Company AlterIDs">
+                        <TYPE>Company</TYPE>
+                        <NATIVEMETHOD>Name</NATIVEMETHOD>
+                        <NATIVEMETHOD>AltMstId</NATIVEMETHOD>
+                        <NATIVEMETHOD>AltVchId</NATIVEMETHOD>
+                    </COLLECTION>
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render()
+    
+    # -------------------- Queries --------------------
+    
+    def vouchers(self, company_name=None):
+        """
+        Start a voucher query whose filters run inside Tally
+        
+        Example:
+            client.vouchers().where(type="Sales", amount__gte=10000, ledger="X").between("20240401", "20250331")
+        
+        Args:
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            Query: Query over vouchers (see tallyQuery.Query)
+        """
+        return Query(self, "vouchers", company_name)
+    
+    def ledgers(self, company_name=None):
+        """
+        Start a ledger query whose filters run inside Tally
+        
+        Args:
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            Query: Query over ledgers (see tallyQuery.Query)
+        """
+        return Query(self, "ledgers", company_name)
+    
+    def groups(self, company_name=None):
+        """
+        Start a group query whose filters run inside Tally
+        
+        Args:
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            Query: Query over groups (see tallyQuery.Query)
+        """
+        return Query(self, "groups", company_name)
+    
+    def stock_items(self, company_name=None):
+        """
+        Start a stock item query whose filters run inside Tally
+        
+        Args:
+            company_name (str, optional): Company name. Default: None (current company)
+            
+        Returns:
+            Query: Query over stock items (see tallyQuery.Query)
+        """
+        return Query(self, "stock_items", company_name)
+    
+    # -------------------- Objects --------------------
+    
+    def get_ledger_by_name(self, ledger_name, from_date=None, to_date=None, fields=None):
+        """
+        Get ledger by name
+        
+        Args:
+            ledger_name (str): Ledger name
+            from_date (str, optional): From date (format: YYYYMMDD)
+            to_date (str, optional): To date (format: YYYYMMDD)
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (Address and every method)
+            
+        Returns:
+            str: XML response with ledger details
+        """
+        field_elements = native_methods(fields, "Ledger", b"<NATIVEMETHOD>Address</NATIVEMETHOD>"
+                                                          b"<NATIVEMETHOD>*</NATIVEMETHOD>")
+        date_vars = b""
+        if from_date and to_date:
+            date_vars = envelope("""<SVFROMDATE TYPE="Date">{from_date}</SVFROMDATE>
+                <SVTODATE TYPE="Date">{to_date}</SVTODATE>""").render(from_date=from_date, to_date=to_date)
+        
+        xml_request = envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>Export</TALLYREQUEST>
+        <TYPE>Collection</TYPE>
+        <ID>Ledgers</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                {date_vars:xml}
+            </STATICVARIABLES>
+            <TDL>
+                <TDLMESSAGE>
+                    <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="Ledgers">
+                        <TYPE>Ledger</TYPE>
+                        {field_elements:xml}
+                        <FILTERS>Ledgerfilter</FILTERS>
+                    </COLLECTION>
+                    <SYSTEM TYPE="Formulae" NAME="Ledgerfilter">$Name={ledger_name}</SYSTEM>
+                </TDLMESSAGE>
+            </TDL>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render(date_vars=date_vars, ledger_name=_literal(ledger_name, "str"),
+                       field_elements=field_elements)
+        
+        return self._send_request(xml_request, method="get_ledger_by_name")
+    
+    def get_voucher_by_master_id(self, master_id, company_name=None):
+        """
+        Get voucher by master ID
+        
+        Args:
+            master_id (str): Master ID of voucher
+            company_name (str, optional): Company name
+            
+        Returns:
+            str: XML response with voucher details
+        """
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        
+        xml_request = envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>EXPORT</TALLYREQUEST>
+        <TYPE>Object</TYPE>
+        <SUBTYPE>VOUCHER</SUBTYPE>
+        <ID TYPE="Name">ID:'{master_id}'</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+            {company_element:xml}
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                <SVViewName>Accounting Voucher View</SVViewName>
+            </STATICVARIABLES>
+            <FETCHLIST>
+                <FETCH>*</FETCH>
+                
+            </FETCHLIST>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render(master_id=master_id, company_element=company_element)
+        
+        return self._send_request(xml_request, method="get_voucher_by_master_id")
+    
+    def get_voucher_by_number_and_date(self, voucher_date, voucher_number, company_name=None):
+        """
+        Get voucher by number and date
+        
+        Args:
+            voucher_date (str): Voucher date (format: DD-MMM-YYYY)
+            voucher_number (str): Voucher number
+            company_name (str, optional): Company name
+            
+        Returns:
+            str: XML response with voucher details
+        """
+        company_element = element("SVCURRENTCOMPANY", company_name) if company_name else b""
+        
+        xml_request = envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
+        <TALLYREQUEST>EXPORT</TALLYREQUEST>
+        <TYPE>Object</TYPE>
+        <SUBTYPE>VOUCHER</SUBTYPE>
+        <ID TYPE="Name">Date:'{voucher_date}':VoucherNumber:'{voucher_number}'</ID>
+    </HEADER>
+    <BODY>
+        <DESC>
+            <STATICVARIABLES>
+            {company_element:xml}
+                <SVEXPORTFORMAT>$$SysName:XML</SVEXPORTFORMAT>
+                <SVViewName>Accounting Voucher View</SVViewName>
+            </STATICVARIABLES>
+            <FETCHLIST>
+                <FETCH>*</FETCH>
+                
+            </FETCHLIST>
+        </DESC>
+    </BODY>
+</ENVELOPE>""").render(voucher_date=voucher_date, voucher_number=voucher_number,
+                       company_element=company_element)
+        
+        return self._send_request(xml_request, method="get_voucher_by_number_and_date")
+    
+    def get_stock_item_by_master_id(self, master_id, fields=None):
+        """
+        Get stock item by master ID
+        
+        Args:
+            master_id (str): Master ID of stock item
+            fields (str or list, optional): Preset ("id-only", "summary", "full") or method names to
+                                            export. Default: None (every method)
+            
+        Returns:
+            str: XML response with stock item details
+            
+        Raises:
+            ValueError: If master_id is not a whole number
+        """
+        field_elements = native_methods(fields, "StockItem", b"<NATIVEMETHOD>*</NATIVEMETHOD>")
+        xml_request = envelope("""<ENVELOPE>
+    <HEADER>
+        <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
         <TYPE>Collection</TYPE>
         <ID>CustColl</ID>
@@ -842,7 +1745,7 @@ class TallyClient:
                 <TDLMESSAGE>
                     <COLLECTION ISMODIFY="No" ISFIXED="No" ISINITIALIZE="No" ISOPTION="No" ISINTERNAL="No" NAME="CustColl">
                         <TYPE>masters</TYPE>
-                        <NATIVEMETHOD>*</NATIVEMETHOD>
+                        {field_elements:xml}
                         <FILTERS>filter</FILTERS>
                     </COLLECTION>
                     <SYSTEM TYPE="Formulae" NAME="filter">$Masterid={master_id}</SYSTEM>
@@ -850,9 +1753,86 @@ class TallyClient:
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(master_id=int(master_id), field_elements=field_elements)
+        
+        return self._send_request(xml_request, method="get_stock_item_by_master_id")
+    
+    def get_vouchers_by_master_ids(self, master_ids, company_name=None, fields="summary",
+                                   chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Get many vouchers by master ID, one filtered request per chunk of IDs
+        
+        Args:
+            master_ids (iterable): Master IDs of the vouchers
+            company_name (str, optional): Company name. Default: None (current company)
+            fields (str or list, optional): Preset or method names to export. Default: "summary"
+            chunk_size (int, optional): Master IDs per request. Default: 200
+            
+        Returns:
+            MultiGetResult: Voucher records keyed by master ID, and the missing IDs (see multiGet)
+            
+        Raises:
+            requests.exceptions.RequestException: If a request to Tally fails
+        """
+        return get_by_master_ids(self.vouchers(company_name).fields(fields), master_ids, chunk_size)
+    
+    def get_vouchers_by_number_and_date(self, pairs, company_name=None, fields="summary",
+                                        chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Get many vouchers by (date, voucher number), one filtered request per chunk of pairs
+        
+        Args:
+            pairs (iterable): (voucher_date, voucher_number) tuples
+            company_name (str, optional): Company name. Default: None (current company)
+            fields (str or list, optional): Preset or method names to export. Default: "summary"
+            chunk_size (int, optional): Pairs per request. Default: 200
+            
+        Returns:
+            MultiGetResult: Voucher records keyed by pair, and the missing pairs (see multiGet)
+            
+        Raises:
+            ValueError: If a date is not in a recognised format
+            requests.exceptions.RequestException: If a request to Tally fails
+        """
+        return get_by_numbers_and_dates(self.vouchers(company_name).fields(fields), pairs, chunk_size)
+    
+    def get_stock_items_by_master_ids(self, master_ids, company_name=None, fields="summary",
+                                      chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Get many stock items by master ID, one filtered request per chunk of IDs
         
-        return self._send_request(xml_request)
+        Args:
+            master_ids (iterable): Master IDs of the stock items
+            company_name (str, optional): Company name. Default: None (current company)
+            fields (str or list, optional): Preset or method names to export. Default: "summary"
+            chunk_size (int, optional): Master IDs per request. Default: 200
+            
+        Returns:
+            MultiGetResult: StockItem records keyed by master ID, and the missing IDs (see multiGet)
+            
+        Raises:
+            requests.exceptions.RequestException: If a request to Tally fails
+        """
+        return get_by_master_ids(self.stock_items(company_name).fields(fields), master_ids, chunk_size)
+    
+    def get_ledgers_by_name(self, ledger_names, company_name=None, fields="summary",
+                            chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Get many ledgers by name, one filtered request per chunk of names
+        
+        Args:
+            ledger_names (iterable): Ledger names
+            company_name (str, optional): Company name. Default: None (current company)
+            fields (str or list, optional): Preset or method names to export. Default: "summary"
+            chunk_size (int, optional): Names per request. Default: 200
+            
+        Returns:
+            MultiGetResult: Ledger records keyed by name, and the missing names (see multiGet)
+            
+        Raises:
+            requests.exceptions.RequestException: If a request to Tally fails
+        """
+        return get_by_names(self.ledgers(company_name).fields(fields), ledger_names, chunk_size)
     
     def get_license_info(self):
         """
@@ -861,7 +1841,7 @@ class TallyClient:
         Returns:
             str: XML response with license information
         """
-        xml_request = """<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <VERSION>1</VERSION>
         <TALLYREQUEST>Export</TALLYREQUEST>
@@ -897,9 +1877,9 @@ class TallyClient:
             </TDL>
         </DESC>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render()
         
-        return self._send_request(xml_request)
+        return self._send_request(xml_request, method="get_license_info")
 
     def create_ledger(self, name, parent=None, address=None, country=None, state=None, mobile=None, gstin=None):
         """
@@ -915,43 +1895,39 @@ class TallyClient:
             gstin (str, optional): GST Identification Number. Default: None
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
+        """
+        xml_request = self._import_request(self._ledger_master(name, parent, address, country, state, mobile, gstin))
+        
+        return self._send_import(xml_request, method="create_ledger")
+
+    @staticmethod
+    def _ledger_master(name, parent=None, address=None, country=None, state=None, mobile=None, gstin=None):
+        """
+        Build the LEDGER object used by create_ledger and create_ledgers
+        
+        Returns:
+            bytes: LEDGER element
         """
         # Building the optional elements
-        parent_element = f"<PARENT>{parent}</PARENT>" if parent else ""
-        address_element = f"<ADDRESS>{address}</ADDRESS>" if address else ""
-        country_element = f"<COUNTRYOFRESIDENCE>{country}</COUNTRYOFRESIDENCE>" if country else ""
-        state_element = f"<LEDSTATENAME>{state}</LEDSTATENAME>" if state else ""
-        mobile_element = f"<LEDGERMOBILE>{mobile}</LEDGERMOBILE>" if mobile else ""
-        gstin_element = f"<PARTYGSTIN>{gstin}</PARTYGSTIN>" if gstin else ""
-        
-        xml_request = f"""<ENVELOPE>
-        <HEADER>
-            <TALLYREQUEST>Import Data</TALLYREQUEST>
-        </HEADER>
-        <BODY>
-            <IMPORTDATA>
-                <REQUESTDESC>
-                    <REPORTNAME>All Masters</REPORTNAME>
-                </REQUESTDESC>
-                <REQUESTDATA>
-                    <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                        <LEDGER Action="Create">
-                            <NAME>{name}</NAME>
-                            {parent_element}
-                            {address_element}
-                            {country_element}
-                            {state_element}
-                            {mobile_element}
-                            {gstin_element}
-                        </LEDGER>
-                    </TALLYMESSAGE>
-                </REQUESTDATA>
-            </IMPORTDATA>
-        </BODY>
-    </ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+        parent_element = element("PARENT", parent) if parent else b""
+        address_element = element("ADDRESS", address) if address else b""
+        country_element = element("COUNTRYOFRESIDENCE", country) if country else b""
+        state_element = element("LEDSTATENAME", state) if state else b""
+        mobile_element = element("LEDGERMOBILE", mobile) if mobile else b""
+        gstin_element = element("PARTYGSTIN", gstin) if gstin else b""
+        
+        return envelope("""<LEDGER Action="Create">
+            <NAME>{name}</NAME>
+            {parent_element:xml}
+            {address_element:xml}
+            {country_element:xml}
+            {state_element:xml}
+            {mobile_element:xml}
+            {gstin_element:xml}
+        </LEDGER>""").render(name=name, parent_element=parent_element, address_element=address_element,
+                             country_element=country_element, state_element=state_element,
+                             mobile_element=mobile_element, gstin_element=gstin_element)
 
     def create_receipt_voucher(self, party_ledger_name, amount, date=None, narration="", voucher_number=None):
         """
@@ -965,7 +1941,20 @@ class TallyClient:
             voucher_number (str, optional): Voucher number. Default: None (auto-generated)
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
+        """
+        xml_request = self._import_request(
+            self._receipt_voucher(party_ledger_name, amount, date, narration, voucher_number))
+        
+        return self._send_import(xml_request, method="create_receipt_voucher")
+
+    @staticmethod
+    def _receipt_voucher(party_ledger_name, amount, date=None, narration="", voucher_number=None):
+        """
+        Build the VOUCHER object of a receipt (see create_receipt_voucher)
+        
+        Returns:
+            bytes: Voucher element
         """
         # Default to today's date if not provided
         if not date:
@@ -973,48 +1962,31 @@ class TallyClient:
             date = datetime.now().strftime("%Y%m%d")
         
         # Optional voucher number
-        voucher_number_element = f"<VOUCHERNUMBER>{voucher_number}</VOUCHERNUMBER>" if voucher_number else "<VOUCHERNUMBER></VOUCHERNUMBER>"
-        
-        xml_request = f"""<ENVELOPE>
-        <HEADER>
-            <TALLYREQUEST>Import Data</TALLYREQUEST>
-        </HEADER>
-        <BODY>
-            <IMPORTDATA>
-                <REQUESTDESC>
-                    <REPORTNAME>All Masters</REPORTNAME>
-                </REQUESTDESC>
-                <REQUESTDATA>
-                    <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                        <VOUCHER ACTION="Create" VCHTYPE=" Receipt ">
-                            <VOUCHERTYPENAME>Receipt</VOUCHERTYPENAME>
-                            <DATE>{date}</DATE>
-                            {voucher_number_element}
-                            <PARTYLEDGERNAME>{party_ledger_name}</PARTYLEDGERNAME>
-                            <NARRATION>{narration}</NARRATION>
-                            <EFFECTIVEDATE>{date}</EFFECTIVEDATE>
-                            <ALLLEDGERENTRIES.LIST>
-                                <LEDGERNAME>{party_ledger_name}</LEDGERNAME>
-                                <REMOVEZEROENTRIES>NO</REMOVEZEROENTRIES>
-                                <LEDGERFROMITEM>NO</LEDGERFROMITEM>
-                                <ISDEEMEDPOSITIVE>NO</ISDEEMEDPOSITIVE>
-                                <AMOUNT>{amount}</AMOUNT>
-                            </ALLLEDGERENTRIES.LIST>
-                            <ALLLEDGERENTRIES.LIST>
-                                <LEDGERNAME>Cash</LEDGERNAME>
-                                <REMOVEZEROENTRIES>NO</REMOVEZEROENTRIES>
-                                <LEDGERFROMITEM>NO</LEDGERFROMITEM>
-                                <ISDEEMEDPOSITIVE>YES</ISDEEMEDPOSITIVE>
-                                <AMOUNT>-{amount}</AMOUNT>
-                            </ALLLEDGERENTRIES.LIST>
-                        </VOUCHER>
-                    </TALLYMESSAGE>
-                </REQUESTDATA>
-            </IMPORTDATA>
-        </BODY>
-    </ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+        voucher_number_element = element("VOUCHERNUMBER", voucher_number) if voucher_number else b"<VOUCHERNUMBER></VOUCHERNUMBER>"
+        
+        return envelope("""<VOUCHER ACTION="Create" VCHTYPE=" Receipt ">
+            <VOUCHERTYPENAME>Receipt</VOUCHERTYPENAME>
+            <DATE>{date}</DATE>
+            {voucher_number_element:xml}
+            <PARTYLEDGERNAME>{party_ledger_name}</PARTYLEDGERNAME>
+            <NARRATION>{narration}</NARRATION>
+            <EFFECTIVEDATE>{date}</EFFECTIVEDATE>
+            <ALLLEDGERENTRIES.LIST>
+                <LEDGERNAME>{party_ledger_name}</LEDGERNAME>
+                <REMOVEZEROENTRIES>NO</REMOVEZEROENTRIES>
+                <LEDGERFROMITEM>NO</LEDGERFROMITEM>
+                <ISDEEMEDPOSITIVE>NO</ISDEEMEDPOSITIVE>
+                <AMOUNT>{amount}</AMOUNT>
+            </ALLLEDGERENTRIES.LIST>
+            <ALLLEDGERENTRIES.LIST>
+                <LEDGERNAME>Cash</LEDGERNAME>
+                <REMOVEZEROENTRIES>NO</REMOVEZEROENTRIES>
+                <LEDGERFROMITEM>NO</LEDGERFROMITEM>
+                <ISDEEMEDPOSITIVE>YES</ISDEEMEDPOSITIVE>
+                <AMOUNT>-{amount}</AMOUNT>
+            </ALLLEDGERENTRIES.LIST>
+        </VOUCHER>""").render(date=date, voucher_number_element=voucher_number_element,
+                              party_ledger_name=party_ledger_name, narration=narration, amount=amount)
 
     def create_stock_item(self, name, base_unit, opening_balance=0, hsn_code=None, gst_rate=None):
         """
@@ -1028,15 +2000,28 @@ class TallyClient:
             gst_rate (float, optional): GST rate percentage. Default: None
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
+        """
+        xml_request = self._import_request(
+            self._stock_item_master(name, base_unit, opening_balance, hsn_code, gst_rate))
+        
+        return self._send_import(xml_request, method="create_stock_item")
+
+    @staticmethod
+    def _stock_item_master(name, base_unit, opening_balance=0, hsn_code=None, gst_rate=None):
+        """
+        Build the STOCKITEM object used by create_stock_item and create_stock_items
+        
+        Returns:
+            bytes: STOCKITEM element
         """
         # GST details are complex, only include if HSN code and GST rate are provided
-        gst_details = ""
+        gst_details = b""
         if hsn_code and gst_rate:
             # Calculate CGST and SGST as half of the GST rate
             half_rate = gst_rate / 2
             
-            gst_details = f"""
+            gst_details = envelope("""
             <GSTAPPLICABLE>&#4; Applicable</GSTAPPLICABLE>
             <GSTDETAILS.LIST>
                 <APPLICABLEFROM>20200401</APPLICABLEFROM>
@@ -1065,32 +2050,15 @@ class TallyClient:
                         <GSTRATEVALUATIONTYPE>Based on Value</GSTRATEVALUATIONTYPE>
                     </RATEDETAILS.LIST>
                 </STATEWISEDETAILS.LIST>
-            </GSTDETAILS.LIST>"""
-        
-        xml_request = f"""<ENVELOPE>
-        <HEADER>
-            <TALLYREQUEST>Import Data</TALLYREQUEST>
-        </HEADER>
-        <BODY>
-            <IMPORTDATA>
-                <REQUESTDESC>
-                    <REPORTNAME>All Masters</REPORTNAME>
-                </REQUESTDESC>
-                <REQUESTDATA>
-                    <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                        <STOCKITEM Action="Create">
-                            <NAME>{name}</NAME>
-                            <BASEUNITS>{base_unit}</BASEUNITS>
-                            <OPENINGBALANCE>{opening_balance}</OPENINGBALANCE>
-                            {gst_details}
-                        </STOCKITEM>
-                    </TALLYMESSAGE>
-                </REQUESTDATA>
-            </IMPORTDATA>
-        </BODY>
-    </ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+            </GSTDETAILS.LIST>""").render(hsn_code=hsn_code, half_rate=half_rate, gst_rate=gst_rate)
+        
+        return envelope("""<STOCKITEM Action="Create">
+            <NAME>{name}</NAME>
+            <BASEUNITS>{base_unit}</BASEUNITS>
+            <OPENINGBALANCE>{opening_balance}</OPENINGBALANCE>
+            {gst_details:xml}
+        </STOCKITEM>""").render(name=name, base_unit=base_unit, opening_balance=opening_balance,
+                                gst_details=gst_details)
 
     def create_unit(self, name, is_simple_unit=True):
         """
@@ -1101,32 +2069,62 @@ class TallyClient:
             is_simple_unit (bool, optional): Whether it's a simple unit. Default: True
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
+        """
+        xml_request = self._import_request(self._unit_master(name, is_simple_unit))
+        
+        return self._send_import(xml_request, method="create_unit")
+
+    @staticmethod
+    def _unit_master(name, is_simple_unit=True):
+        """
+        Build the UNIT object used by create_unit and create_units
+        
+        Returns:
+            bytes: UNIT element
         """
         is_simple = "true" if is_simple_unit else "false"
         
-        xml_request = f"""<ENVELOPE>
-        <HEADER>
-            <TALLYREQUEST>Import Data</TALLYREQUEST>
-        </HEADER>
-        <BODY>
-            <IMPORTDATA>
-                <REQUESTDESC>
-                    <REPORTNAME>All Masters</REPORTNAME>
-                </REQUESTDESC>
-                <REQUESTDATA>
-                    <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                        <UNIT Action="Create">
-                            <ISSIMPLEUNIT>{is_simple}</ISSIMPLEUNIT>
-                            <NAME>{name}</NAME>
-                        </UNIT>
-                    </TALLYMESSAGE>
-                </REQUESTDATA>
-            </IMPORTDATA>
-        </BODY>
-    </ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+        return envelope("""<UNIT Action="Create">
+            <ISSIMPLEUNIT>{is_simple}</ISSIMPLEUNIT>
+            <NAME>{name}</NAME>
+        </UNIT>""").render(is_simple=is_simple, name=name)
+
+    @staticmethod
+    def _import_request(messages, company_name=None, report_name="All Masters"):
+        """
+        Build an Import Data request carrying one or more objects
+        
+        Args:
+            messages (bytes or list): Object XML (LEDGER, GROUP, VOUCHER, ...), or a list of them
+            company_name (str, optional): Target company. Default: None (current company)
+            report_name (str, optional): "All Masters" or "Vouchers". Default: "All Masters"
+            
+        Returns:
+            bytes: XML request body
+        """
+        static_variables = envelope("""<STATICVARIABLES>
+                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
+                </STATICVARIABLES>""").render(company_name=company_name) if company_name else b""
+        
+        return envelope("""<ENVELOPE>
+    <HEADER>
+        <TALLYREQUEST>Import Data</TALLYREQUEST>
+    </HEADER>
+    <BODY>
+        <IMPORTDATA>
+            <REQUESTDESC>
+                <REPORTNAME>{report_name}</REPORTNAME>
+                {static_variables:xml}
+            </REQUESTDESC>
+            <REQUESTDATA>
+                <TALLYMESSAGE xmlns:UDF="TallyUDF">
+                    {messages:xml}
+                </TALLYMESSAGE>
+            </REQUESTDATA>
+        </IMPORTDATA>
+    </BODY>
+</ENVELOPE>""").render(report_name=report_name, static_variables=static_variables, messages=messages)
 
     # Example usage of parsing XML response
     def parse_xml_response(self, xml_response):
@@ -1134,13 +2132,16 @@ class TallyClient:
         Parse XML response from Tally
         
         Args:
-            xml_response (str): XML response string
+            xml_response (str or bytes): XML response string, or raw response bytes
             
         Returns:
             dict: Parsed XML response as dictionary
         """
         try:
-            root = ET.fromstring(xml_response)
+            if isinstance(xml_response, bytes):
+                root = parse_xml_bytes(xml_response)
+            else:
+                root = ET.fromstring(sanitize_xml(xml_response))
             # Implement parsing logic based on specific requirements
             # This is a simple example that will need customization based on the actual XML structure
             result = {}
@@ -1182,28 +2183,26 @@ class TallyClient:
             enable_inventory (bool, optional): Enable inventory. Default: True
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
         # Set default mailing name if not provided
         if not mailing_name:
             mailing_name = company_name
             
         # Process optional address list
-        address_element = ""
+        address_element = b""
         if address_list and isinstance(address_list, list):
-            address_lines = ""
-            for addr in address_list:
-                address_lines += f"<ADDRESS>{addr}</ADDRESS>\n"
+            address_lines = [element("ADDRESS", addr) for addr in address_list]
             # Note: Tally often expects ADDRESS.LIST within the COMPANY tag directly
-            address_element = f"""<ADDRESS.LIST TYPE="String">
-                {address_lines}
-            </ADDRESS.LIST>"""
+            address_element = envelope("""<ADDRESS.LIST TYPE="String">
+                {address_lines:xml}
+            </ADDRESS.LIST>""").render(address_lines=address_lines)
             
         # Process other optional elements
-        state_element = f"<STATENAME>{state}</STATENAME>" if state else "" # Changed tag to STATENAME
-        pincode_element = f"<PINCODE>{pincode}</PINCODE>" if pincode else ""
-        country_element = f"<COUNTRYNAME>{country}</COUNTRYNAME>" if country else "" # Changed tag to COUNTRYNAME
-        email_element = f"<EMAIL>{email}</EMAIL>" if email else ""
+        state_element = element("STATENAME", state) if state else b"" # Changed tag to STATENAME
+        pincode_element = element("PINCODE", pincode) if pincode else b""
+        country_element = element("COUNTRYNAME", country) if country else b"" # Changed tag to COUNTRYNAME
+        email_element = element("EMAIL", email) if email else b""
         
         # Convert boolean settings to Yes/No
         bill_wise_value = "Yes" if enable_bill_wise else "No"
@@ -1213,7 +2212,7 @@ class TallyClient:
         # XML structure based on Postman collection hints and common practices
         # Using STARTINGFROM for Financial Year and BOOKSFROM for Books Beginning
         # Using YYYYMMDD date format
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Import Data</TALLYREQUEST>
     </HEADER>
@@ -1230,11 +2229,11 @@ class TallyClient:
                     <COMPANY Action="Create">
                         <NAME>{company_name}</NAME>
                         <MAILINGNAME>{mailing_name}</MAILINGNAME>
-                        {address_element}
-                        {state_element}
-                        {pincode_element}
-                        {country_element}
-                        {email_element}
+                        {address_element:xml}
+                        {state_element:xml}
+                        {pincode_element:xml}
+                        {country_element:xml}
+                        {email_element:xml}
                         <STARTINGFROM>{financial_year_from}</STARTINGFROM>
                         <BOOKSFROM>{books_from}</BOOKSFROM>
                         <BASECURRENCYSYMBOL>{base_currency_symbol}</BASECURRENCYSYMBOL>
@@ -1247,9 +2246,16 @@ class TallyClient:
             </REQUESTDATA>
         </IMPORTDATA>
     </BODY>
-</ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+</ENVELOPE>""").render(company_name=company_name, mailing_name=mailing_name,
+                       address_element=address_element, state_element=state_element,
+                       pincode_element=pincode_element, country_element=country_element,
+                       email_element=email_element, financial_year_from=financial_year_from,
+                       books_from=books_from, base_currency_symbol=base_currency_symbol,
+                       base_currency_formal_name=base_currency_formal_name,
+                       bill_wise_value=bill_wise_value, cost_centers_value=cost_centers_value,
+                       inventory_value=inventory_value)
+        
+        return self._send_import(xml_request, method="create_company")
 
     def configure_company(self, company_name, enable_inventory=None, enable_bill_wise=None, 
                          enable_cost_centers=None, enable_interest_calc=None):
@@ -1264,34 +2270,34 @@ class TallyClient:
             enable_interest_calc (bool, optional): Enable interest calculation. Default: None (no change)
             
         Returns:
-            str: XML response confirming update
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
         # Build feature elements based on provided parameters
         features = []
         
         if enable_inventory is not None:
             inventory_value = "Yes" if enable_inventory else "No"
-            features.append(f"<ISINVENTORYENABLED>{inventory_value}</ISINVENTORYENABLED>")
+            features.append(element("ISINVENTORYENABLED", inventory_value))
             
         if enable_bill_wise is not None:
             bill_wise_value = "Yes" if enable_bill_wise else "No"
-            features.append(f"<ISBILLWISEON>{bill_wise_value}</ISBILLWISEON>")
+            features.append(element("ISBILLWISEON", bill_wise_value))
             
         if enable_cost_centers is not None:
             cost_centers_value = "Yes" if enable_cost_centers else "No"
-            features.append(f"<ISCOSTCENTRESON>{cost_centers_value}</ISCOSTCENTRESON>")
+            features.append(element("ISCOSTCENTRESON", cost_centers_value))
             
         if enable_interest_calc is not None:
             interest_value = "Yes" if enable_interest_calc else "No"
-            features.append(f"<ISINTERESTON>{interest_value}</ISINTERESTON>")
+            features.append(element("ISINTERESTON", interest_value))
             
         # If no features were specified, return early
         if not features:
             return "Error: No configuration parameters specified"
             
-        features_xml = "\n".join(features)
+        features_xml = b"".join(features)
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Import Data</TALLYREQUEST>
     </HEADER>
@@ -1306,15 +2312,15 @@ class TallyClient:
             <REQUESTDATA>
                 <TALLYMESSAGE xmlns:UDF="TallyUDF">
                     <COMPANY NAME="{company_name}" ACTION="Alter">
-                        {features_xml}
+                        {features_xml:xml}
                     </COMPANY>
                 </TALLYMESSAGE>
             </REQUESTDATA>
         </IMPORTDATA>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(company_name=company_name, features_xml=features_xml)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="configure_company")
 
     def enable_gst(self, company_name, state_name, gst_registration_type="Regular", 
                   gstin=None, applicable_from="20250401"):
@@ -1329,15 +2335,15 @@ class TallyClient:
             applicable_from (str, optional): GST applicable from date (format: YYYYMMDD). Default: 20250401
             
         Returns:
-            str: XML response confirming update
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
         # GSTIN is required for Regular registration
         if gst_registration_type == "Regular" and not gstin:
             return "Error: GSTIN is required for Regular GST registration type"
             
-        gstin_element = f"<GSTIN>{gstin}</GSTIN>" if gstin else ""
+        gstin_element = element("GSTIN", gstin) if gstin else b""
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Import Data</TALLYREQUEST>
     </HEADER>
@@ -1355,7 +2361,7 @@ class TallyClient:
                         <ISGSTENABLED>Yes</ISGSTENABLED>
                         <STATENAME>{state_name}</STATENAME>
                         <GSTREGISTRATIONTYPE>{gst_registration_type}</GSTREGISTRATIONTYPE>
-                        {gstin_element}
+                        {gstin_element:xml}
                         <APPLICABLEFROMGST>{applicable_from}</APPLICABLEFROMGST>
                         <SETALTERGSTDETAILS>Yes</SETALTERGSTDETAILS>
                         <HASSLABRATE>No</HASSLABRATE>
@@ -1365,9 +2371,11 @@ class TallyClient:
             </REQUESTDATA>
         </IMPORTDATA>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(company_name=company_name, state_name=state_name,
+                       gst_registration_type=gst_registration_type, gstin_element=gstin_element,
+                       applicable_from=applicable_from)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="enable_gst")
 
     # -------------------- Entity Management --------------------
 
@@ -1380,31 +2388,25 @@ class TallyClient:
             ledger_name (str): Name of the ledger to delete
             
         Returns:
-            str: XML response confirming deletion
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>All Masters</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <LEDGER NAME="{ledger_name}" ACTION="Delete">
-                    </LEDGER>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
+        xml_request = self._import_request(self._delete_master("LEDGER", ledger_name), company_name)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="delete_ledger")
+
+    @staticmethod
+    def _delete_master(tag, name):
+        """
+        Build a delete object for a master, e.g. <LEDGER NAME="..." ACTION="Delete">
+        
+        Args:
+            tag (str): Master type tag (LEDGER, GROUP, STOCKITEM, UNIT)
+            name (str): Name of the master
+            
+        Returns:
+            bytes: Master element
+        """
+        return envelope(f'<{tag} NAME="{{name}}" ACTION="Delete"></{tag}>').render(name=name)
 
     def delete_stock_item(self, company_name, stock_item_name):
         """
@@ -1415,31 +2417,11 @@ class TallyClient:
             stock_item_name (str): Name of the stock item to delete
             
         Returns:
-            str: XML response confirming deletion
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>All Masters</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <STOCKITEM NAME="{stock_item_name}" ACTION="Delete">
-                    </STOCKITEM>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
+        xml_request = self._import_request(self._delete_master("STOCKITEM", stock_item_name), company_name)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="delete_stock_item")
 
     def update_unit(self, company_name, unit_name, decimal_places=None, gst_uqc_code=None):
         """
@@ -1452,24 +2434,24 @@ class TallyClient:
             gst_uqc_code (str, optional): GST UQC code. Default: None (no change)
             
         Returns:
-            str: XML response confirming update
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
         # Build elements based on provided parameters
         elements = []
         
         if decimal_places is not None:
-            elements.append(f"<DECIMALPLACES>{decimal_places}</DECIMALPLACES>")
+            elements.append(element("DECIMALPLACES", decimal_places))
             
         if gst_uqc_code is not None:
-            elements.append(f"<ISGSTREPUOM>{gst_uqc_code}</ISGSTREPUOM>")
+            elements.append(element("ISGSTREPUOM", gst_uqc_code))
             
         # If no elements were specified, return early
         if not elements:
             return "Error: No update parameters specified"
             
-        elements_xml = "\n".join(elements)
+        elements_xml = b"".join(elements)
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Import Data</TALLYREQUEST>
     </HEADER>
@@ -1484,15 +2466,15 @@ class TallyClient:
             <REQUESTDATA>
                 <TALLYMESSAGE xmlns:UDF="TallyUDF">
                     <UNIT NAME="{unit_name}" ACTION="Alter">
-                        {elements_xml}
+                        {elements_xml:xml}
                     </UNIT>
                 </TALLYMESSAGE>
             </REQUESTDATA>
         </IMPORTDATA>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(company_name=company_name, unit_name=unit_name, elements_xml=elements_xml)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="update_unit")
 
     def delete_unit(self, company_name, unit_name):
         """
@@ -1503,31 +2485,11 @@ class TallyClient:
             unit_name (str): Name of the unit to delete
             
         Returns:
-            str: XML response confirming deletion
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>All Masters</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <UNIT NAME="{unit_name}" ACTION="Delete">
-                    </UNIT>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
+        xml_request = self._import_request(self._delete_master("UNIT", unit_name), company_name)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="delete_unit")
 
     # -------------------- Voucher Management --------------------
 
@@ -1547,7 +2509,20 @@ class TallyClient:
             narration (str, optional): Narration for the voucher. Default: ""
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
+        """
+        xml_request = self._import_request(self._journal_voucher(entries, date, voucher_number, narration),
+                                           company_name, report_name="Vouchers")
+        
+        return self._send_import(xml_request, method="create_journal_voucher")
+
+    @staticmethod
+    def _journal_voucher(entries, date=None, voucher_number=None, narration=""):
+        """
+        Build the VOUCHER object of a journal (see create_journal_voucher)
+        
+        Returns:
+            bytes: Voucher element
         """
         # Default to today's date if not provided
         if not date:
@@ -1555,7 +2530,7 @@ class TallyClient:
             date = datetime.now().strftime("%Y%m%d")
         
         # Optional voucher number
-        voucher_number_element = f"<VOUCHERNUMBER>{voucher_number}</VOUCHERNUMBER>" if voucher_number else ""
+        voucher_number_element = element("VOUCHERNUMBER", voucher_number) if voucher_number else b""
         
         # Create ledger entries
         ledger_entries = []
@@ -1569,45 +2544,26 @@ class TallyClient:
             # Adjust sign based on is_debit
             amount_value = -amount if entry.get('is_debit', True) else amount
             
-            ledger_entry = f"""<ALLLEDGERENTRIES.LIST>
-                <LEDGERNAME>{entry.get('ledger_name', '')}</LEDGERNAME>
+            ledger_entry = envelope("""<ALLLEDGERENTRIES.LIST>
+                <LEDGERNAME>{ledger_name}</LEDGERNAME>
                 <ISDEEMEDPOSITIVE>{is_deemed_positive}</ISDEEMEDPOSITIVE>
                 <AMOUNT>{amount_value}</AMOUNT>
-            </ALLLEDGERENTRIES.LIST>"""
+            </ALLLEDGERENTRIES.LIST>""").render(ledger_name=entry.get('ledger_name', ''),
+                                                is_deemed_positive=is_deemed_positive, amount_value=amount_value)
             
             ledger_entries.append(ledger_entry)
         
-        ledger_entries_xml = "\n".join(ledger_entries)
-        
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>Vouchers</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <VOUCHER VCHTYPE="Journal" ACTION="Create">
-                        <DATE>{date}</DATE>
-                        <VOUCHERTYPENAME>Journal</VOUCHERTYPENAME>
-                        {voucher_number_element}
-                        <NARRATION>{narration}</NARRATION>
-                        <PERSISTEDVIEW>Accounting Voucher View</PERSISTEDVIEW>
-                        {ledger_entries_xml}
-                    </VOUCHER>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+        ledger_entries_xml = b"".join(ledger_entries)
+        
+        return envelope("""<VOUCHER VCHTYPE="Journal" ACTION="Create">
+            <DATE>{date}</DATE>
+            <VOUCHERTYPENAME>Journal</VOUCHERTYPENAME>
+            {voucher_number_element:xml}
+            <NARRATION>{narration}</NARRATION>
+            <PERSISTEDVIEW>Accounting Voucher View</PERSISTEDVIEW>
+            {ledger_entries_xml:xml}
+        </VOUCHER>""").render(date=date, voucher_number_element=voucher_number_element, narration=narration,
+                              ledger_entries_xml=ledger_entries_xml)
 
     def update_voucher(self, company_name, master_id, narration=None, voucher_type=None):
         """
@@ -1620,48 +2576,46 @@ class TallyClient:
             voucher_type (str, optional): Voucher type name. Default: None (no change)
             
         Returns:
-            str: XML response confirming update
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
-        # Build elements based on provided parameters
-        elements = []
-        
-        if narration is not None:
-            elements.append(f"<NARRATION>{narration}</NARRATION>")
-            
-        if voucher_type is not None:
-            elements.append(f"<VOUCHERTYPENAME>{voucher_type}</VOUCHERTYPENAME>")
-            
         # If no elements were specified, return early
-        if not elements:
+        if narration is None and voucher_type is None:
             return "Error: No update parameters specified"
+        
+        xml_request = self._import_request(self._alter_voucher(master_id, narration, voucher_type),
+                                           company_name, report_name="Vouchers")
+        
+        return self._send_import(xml_request, method="update_voucher")
+
+    @staticmethod
+    def _alter_voucher(master_id, narration=None, voucher_type=None):
+        """
+        Build the VOUCHER object that alters a voucher (see update_voucher)
+        
+        Returns:
+            bytes: Voucher element
             
-        elements_xml = "\n".join(elements)
+        Raises:
+            ValueError: If there is nothing to update
+        """
+        # Build elements based on provided parameters
+        elements = []
         
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>Vouchers</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <VOUCHER ACTION="Alter">
-                        <MASTERID>{master_id}</MASTERID>
-                        {elements_xml}
-                    </VOUCHER>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
+        if narration is not None:
+            elements.append(element("NARRATION", narration))
+            
+        if voucher_type is not None:
+            elements.append(element("VOUCHERTYPENAME", voucher_type))
+            
+        if not elements:
+            raise ValueError("No update parameters specified")
+            
+        elements_xml = b"".join(elements)
         
-        return self._send_request(xml_request)
+        return envelope("""<VOUCHER ACTION="Alter">
+            <MASTERID>{master_id}</MASTERID>
+            {elements_xml:xml}
+        </VOUCHER>""").render(master_id=master_id, elements_xml=elements_xml)
 
     def cancel_voucher(self, company_name, master_id):
         """
@@ -1672,32 +2626,23 @@ class TallyClient:
             master_id (str): Master ID of the voucher
             
         Returns:
-            str: XML response confirming cancellation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>Vouchers</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <VOUCHER ACTION="Cancel">
-                        <MASTERID>{master_id}</MASTERID>
-                    </VOUCHER>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
+        xml_request = self._import_request(self._cancel_voucher(master_id), company_name, report_name="Vouchers")
+        
+        return self._send_import(xml_request, method="cancel_voucher")
+
+    @staticmethod
+    def _cancel_voucher(master_id):
+        """
+        Build the VOUCHER object that cancels a voucher (see cancel_voucher)
         
-        return self._send_request(xml_request)
+        Returns:
+            bytes: Voucher element
+        """
+        return envelope("""<VOUCHER ACTION="Cancel">
+            <MASTERID>{master_id}</MASTERID>
+        </VOUCHER>""").render(master_id=master_id)
 
     # -------------------- Group Management --------------------
 
@@ -1714,42 +2659,35 @@ class TallyClient:
             is_addable (bool, optional): Allow direct entries to this group. Default: True
             
         Returns:
-            str: XML response confirming creation
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
+        """
+        xml_request = self._import_request(
+            self._group_master(group_name, parent_group, enable_bill_wise, is_addable), company_name)
+        
+        return self._send_import(xml_request, method="create_group")
+
+    @staticmethod
+    def _group_master(group_name, parent_group, enable_bill_wise=None, is_addable=True):
+        """
+        Build the GROUP object used by create_group and create_groups
+        
+        Returns:
+            bytes: GROUP element
         """
         # Build optional elements
-        bill_wise_element = ""
+        bill_wise_element = b""
         if enable_bill_wise is not None:
             bill_wise_value = "Yes" if enable_bill_wise else "No"
-            bill_wise_element = f"<ISBILLWISEON>{bill_wise_value}</ISBILLWISEON>"
+            bill_wise_element = element("ISBILLWISEON", bill_wise_value)
             
         is_addable_value = "Yes" if is_addable else "No"
         
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>All Masters</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <GROUP NAME="{group_name}" ACTION="Create">
-                        <PARENT>{parent_group}</PARENT>
-                        {bill_wise_element}
-                        <ISADDABLE>{is_addable_value}</ISADDABLE>
-                    </GROUP>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
-        
-        return self._send_request(xml_request)
+        return envelope("""<GROUP NAME="{group_name}" ACTION="Create">
+            <PARENT>{parent_group}</PARENT>
+            {bill_wise_element:xml}
+            <ISADDABLE>{is_addable_value}</ISADDABLE>
+        </GROUP>""").render(group_name=group_name, parent_group=parent_group,
+                            bill_wise_element=bill_wise_element, is_addable_value=is_addable_value)
 
     def update_group(self, company_name, group_name, parent_group=None, 
                     enable_bill_wise=None, is_addable=None):
@@ -1764,29 +2702,29 @@ class TallyClient:
             is_addable (bool, optional): Allow direct entries to this group. Default: None (no change)
             
         Returns:
-            str: XML response confirming update
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
         # Build elements based on provided parameters
         elements = []
         
         if parent_group is not None:
-            elements.append(f"<PARENT>{parent_group}</PARENT>")
+            elements.append(element("PARENT", parent_group))
             
         if enable_bill_wise is not None:
             bill_wise_value = "Yes" if enable_bill_wise else "No"
-            elements.append(f"<ISBILLWISEON>{bill_wise_value}</ISBILLWISEON>")
+            elements.append(element("ISBILLWISEON", bill_wise_value))
             
         if is_addable is not None:
             is_addable_value = "Yes" if is_addable else "No"
-            elements.append(f"<ISADDABLE>{is_addable_value}</ISADDABLE>")
+            elements.append(element("ISADDABLE", is_addable_value))
             
         # If no elements were specified, return early
         if not elements:
             return "Error: No update parameters specified"
             
-        elements_xml = "\n".join(elements)
+        elements_xml = b"".join(elements)
         
-        xml_request = f"""<ENVELOPE>
+        xml_request = envelope("""<ENVELOPE>
     <HEADER>
         <TALLYREQUEST>Import Data</TALLYREQUEST>
     </HEADER>
@@ -1801,15 +2739,15 @@ class TallyClient:
             <REQUESTDATA>
                 <TALLYMESSAGE xmlns:UDF="TallyUDF">
                     <GROUP NAME="{group_name}" ACTION="Alter">
-                        {elements_xml}
+                        {elements_xml:xml}
                     </GROUP>
                 </TALLYMESSAGE>
             </REQUESTDATA>
         </IMPORTDATA>
     </BODY>
-</ENVELOPE>"""
+</ENVELOPE>""").render(company_name=company_name, group_name=group_name, elements_xml=elements_xml)
         
-        return self._send_request(xml_request)
+        return self._send_import(xml_request, method="update_group")
 
     def delete_group(self, company_name, group_name):
         """
@@ -1820,40 +2758,194 @@ class TallyClient:
             group_name (str): Name of the group to delete
             
         Returns:
-            str: XML response confirming deletion
+            ImportResult: Tally's counts and line errors ("Error: ..." string if the request failed)
         """
-        xml_request = f"""<ENVELOPE>
-    <HEADER>
-        <TALLYREQUEST>Import Data</TALLYREQUEST>
-    </HEADER>
-    <BODY>
-        <IMPORTDATA>
-            <REQUESTDESC>
-                <REPORTNAME>All Masters</REPORTNAME>
-                <STATICVARIABLES>
-                    <SVCURRENTCOMPANY>{company_name}</SVCURRENTCOMPANY>
-                </STATICVARIABLES>
-            </REQUESTDESC>
-            <REQUESTDATA>
-                <TALLYMESSAGE xmlns:UDF="TallyUDF">
-                    <GROUP NAME="{group_name}" ACTION="Delete">
-                    </GROUP>
-                </TALLYMESSAGE>
-            </REQUESTDATA>
-        </IMPORTDATA>
-    </BODY>
-</ENVELOPE>"""
+        xml_request = self._import_request(self._delete_master("GROUP", group_name), company_name)
+        
+        return self._send_import(xml_request, method="delete_group")
+
+    # -------------------- Bulk Import --------------------
+
+    def create_ledgers(self, ledgers, company_name=None, batch_size=DEFAULT_BATCH_SIZE,
+                       max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Create many ledgers, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            ledgers (iterable): Dicts with create_ledger's arguments (name, parent, address, country,
+                                state, mobile, gstin), consumed lazily
+            company_name (str, optional): Target company. Default: None (current company)
+            batch_size (int, optional): Maximum ledgers per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per ledger in input order, and the ImportResult of each request
+        """
+        masters = ((ledger["name"], self._ledger_master(**ledger)) for ledger in ledgers)
+        return import_masters(self, masters, "created", company_name, batch_size, max_batch_bytes,
+                              method="create_ledgers")
+
+    def create_groups(self, company_name, groups, batch_size=DEFAULT_BATCH_SIZE,
+                      max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Create many groups, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            company_name (str): Name of the company
+            groups (iterable): Dicts with create_group's arguments (group_name, parent_group,
+                               enable_bill_wise, is_addable), consumed lazily
+            batch_size (int, optional): Maximum groups per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per group in input order, and the ImportResult of each request
+        """
+        masters = ((group["group_name"], self._group_master(**group)) for group in groups)
+        return import_masters(self, masters, "created", company_name, batch_size, max_batch_bytes,
+                              method="create_groups")
+
+    def create_stock_items(self, stock_items, company_name=None, batch_size=DEFAULT_BATCH_SIZE,
+                           max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Create many stock items, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            stock_items (iterable): Dicts with create_stock_item's arguments (name, base_unit,
+                                    opening_balance, hsn_code, gst_rate), consumed lazily
+            company_name (str, optional): Target company. Default: None (current company)
+            batch_size (int, optional): Maximum stock items per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per stock item in input order, and the ImportResult of each request
+        """
+        masters = ((item["name"], self._stock_item_master(**item)) for item in stock_items)
+        return import_masters(self, masters, "created", company_name, batch_size, max_batch_bytes,
+                              method="create_stock_items")
+
+    def create_units(self, units, company_name=None, batch_size=DEFAULT_BATCH_SIZE,
+                     max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Create many units, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            units (iterable): Unit names, or dicts with create_unit's arguments (name, is_simple_unit)
+            company_name (str, optional): Target company. Default: None (current company)
+            batch_size (int, optional): Maximum units per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per unit in input order, and the ImportResult of each request
+        """
+        units = ({"name": unit} if isinstance(unit, str) else unit for unit in units)
+        masters = ((unit["name"], self._unit_master(**unit)) for unit in units)
+        return import_masters(self, masters, "created", company_name, batch_size, max_batch_bytes,
+                              method="create_units")
+
+    def delete_ledgers(self, company_name, ledger_names, batch_size=DEFAULT_BATCH_SIZE,
+                       max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Delete many ledgers, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            company_name (str): Name of the company
+            ledger_names (iterable): Names of the ledgers to delete
+            batch_size (int, optional): Maximum ledgers per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per ledger in input order, and the ImportResult of each request
+        """
+        return self._delete_masters("LEDGER", company_name, ledger_names, batch_size, max_batch_bytes,
+                                    method="delete_ledgers")
+
+    def delete_groups(self, company_name, group_names, batch_size=DEFAULT_BATCH_SIZE,
+                      max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Delete many groups, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            company_name (str): Name of the company
+            group_names (iterable): Names of the groups to delete
+            batch_size (int, optional): Maximum groups per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per group in input order, and the ImportResult of each request
+        """
+        return self._delete_masters("GROUP", company_name, group_names, batch_size, max_batch_bytes,
+                                    method="delete_groups")
+
+    def delete_stock_items(self, company_name, stock_item_names, batch_size=DEFAULT_BATCH_SIZE,
+                           max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Delete many stock items, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            company_name (str): Name of the company
+            stock_item_names (iterable): Names of the stock items to delete
+            batch_size (int, optional): Maximum stock items per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per stock item in input order, and the ImportResult of each request
+        """
+        return self._delete_masters("STOCKITEM", company_name, stock_item_names, batch_size, max_batch_bytes,
+                                    method="delete_stock_items")
+
+    def delete_units(self, company_name, unit_names, batch_size=DEFAULT_BATCH_SIZE,
+                     max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        """
+        Delete many units, packing up to batch_size of them into each Import Data request
+        
+        Args:
+            company_name (str): Name of the company
+            unit_names (iterable): Names of the units to delete
+            batch_size (int, optional): Maximum units per request. Default: 500
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per unit in input order, and the ImportResult of each request
+        """
+        return self._delete_masters("UNIT", company_name, unit_names, batch_size, max_batch_bytes,
+                                    method="delete_units")
+
+    def _delete_masters(self, tag, company_name, names, batch_size, max_batch_bytes, method):
+        masters = ((name, self._delete_master(tag, name)) for name in names)
+        return import_masters(self, masters, "deleted", company_name, batch_size, max_batch_bytes, method=method)
+
+    def import_vouchers(self, company_name, vouchers, batch_size=DEFAULT_VOUCHER_BATCH_SIZE, adaptive=True,
+                        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES, sequential_ids=False):
+        """
+        Create, alter and cancel many vouchers, several per Import Data request
         
-        return self._send_request(xml_request)
+        Args:
+            company_name (str): Name of the company
+            vouchers (iterable): Voucher specs, consumed lazily. Each is a dict with an "action"
+                                 ("journal" (default), "receipt", "alter" or "cancel") and the
+                                 arguments of create_journal_voucher, create_receipt_voucher,
+                                 update_voucher or cancel_voucher (without company_name), e.g.
+                                 {"action": "cancel", "master_id": "1042"}
+            batch_size (int, optional): Vouchers per request; the starting size when adaptive. Default: 100
+            adaptive (bool, optional): Grow or shrink batches so each request takes about 10 seconds.
+                                       Default: True
+            max_batch_bytes (int, optional): Approximate maximum request size. Default: 2 MB
+            sequential_ids (bool, optional): Infer the MasterIDs of every voucher in a fully created
+                                             batch from LASTVCHID (only while no one else posts to the
+                                             company). Default: False (only the last one gets it)
+            
+        Returns:
+            BulkImportResult: One ImportOutcome per spec in input order, with master_id where known,
+                              and the ImportResult of each request
+        """
+        return import_vouchers(self, vouchers, company_name, batch_size=batch_size, adaptive=adaptive,
+                               max_batch_bytes=max_batch_bytes, sequential_ids=sequential_ids)
 
     def list_tally_companies(self):
         """
         Retrieves a list of all companies loaded in Tally using the requests library.
         Exports the predefined collection 'List of Companies'. Requires a company to be selected first.
 
-        Args:
-            tally_url (str): The URL of the Tally XML RPC server.
-
         Returns:
             list: A list of company names, or an empty list if unable to connect/find.
             None: Returns None if a significant error occurs.
@@ -1861,7 +2953,36 @@ class TallyClient:
         tally_url = self.endpoint
         logging.info("Attempting to list all companies via Collection export...")
         headers = {'Content-Type': 'application/xml'}
-        request_xml = """
+
+        try:
+            response = self._post(self._list_companies_request(), method="list_tally_companies", headers=headers)
+            return self._parse_company_list(response.content, response.headers.get('Content-Type'))
+
+        except requests.exceptions.ConnectionError:
+            logging.error(f"Connection refused. Is Tally running/configured on {tally_url}?")
+            return None
+        except requests.exceptions.Timeout:
+            logging.error(f"Request timed out connecting to Tally on {tally_url}.")
+            return None
+        except requests.exceptions.RequestException as e:
+            error_detail = ""
+            if e.response is not None:
+                error_detail = f" HTTP Status: {e.response.status_code}. Response: {e.response.text[:200]}..."
+            logging.error(f"Request exception listing companies: {e}{error_detail}")
+            return None
+        except Exception as e:
+            logging.exception("Unexpected error occurred while listing companies.") # Log full traceback
+            return None
+
+    @staticmethod
+    def _list_companies_request():
+        """
+        Build the 'List of Companies' collection export used by list_tally_companies
+
+        Returns:
+            bytes: XML request body
+        """
+        return envelope("""
         <ENVELOPE>
             <HEADER>
                 <VERSION>1</VERSION>
@@ -1880,68 +3001,68 @@ class TallyClient:
                 </DESC>
             </BODY>
         </ENVELOPE>
+        """).render()
+
+    @staticmethod
+    def _parse_company_list(response_xml, content_type=None):
+        """
+        Parse the response of the 'List of Companies' export
+
+        Args:
+            response_xml (str or bytes): XML response from Tally
+            content_type (str, optional): Content-Type header, used when response_xml is bytes
+
+        Returns:
+            list: Sorted list of company names
+            None: If Tally reported an error or the response could not be parsed
         """
+        # Only the head is decoded for the checks and log messages below
+        snippet = response_xml if isinstance(response_xml, str) else decode_body(response_xml[:512], content_type)
+        logging.debug("List Companies Raw Response:\n%s", response_xml) # Log raw response at debug level
 
+        if not response_xml or not snippet.strip().startswith('<ENVELOPE>'):
+            logging.warning(f"Received unexpected response format listing companies: {snippet[:100]}...")
+            return None
+
+        companies = []
         try:
-            response = requests.post(tally_url, data=request_xml.encode('utf-8'), headers=headers, timeout=20)
-            response_xml = response.text
-            logging.debug(f"List Companies Raw Response:\n{response_xml}") # Log raw response at debug level
+            if isinstance(response_xml, bytes):
+                root = parse_xml_bytes(response_xml, content_type)
+            else:
+                root = ET.fromstring(sanitize_xml(response_xml))
 
-            if not response_xml or not response_xml.strip().startswith('<ENVELOPE>'):
-                logging.warning(f"Received unexpected response format listing companies: {response_xml[:100]}...")
+            status = root.findtext('.//HEADER/STATUS')
+            if status and status.strip() != '1':
+                error_nodes = root.findall('.//BODY/DATA/LINEERROR')
+                if error_nodes:
+                    errors = ", ".join([err.text.strip() for err in error_nodes if err.text])
+                    logging.error(f"Tally reported errors listing companies: {errors}")
+                else:
+                    logging.error(f"Tally returned status {status} listing companies. Response: {snippet[:200]}...")
                 return None
 
-            companies = []
-            try:
-                root = ET.fromstring(response_xml)
-
-                status = root.findtext('.//HEADER/STATUS')
-                if status and status.strip() != '1':
-                    error_nodes = root.findall('.//BODY/DATA/LINEERROR')
-                    if error_nodes:
-                        errors = ", ".join([err.text.strip() for err in error_nodes if err.text])
-                        logging.error(f"Tally reported errors listing companies: {errors}")
-                    else:
-                        logging.error(f"Tally returned status {status} listing companies. Response: {response_xml[:200]}...")
-                    return None
-
-                # Expecting <COLLECTION><COMPANY><NAME>...</NAME></COMPANY>...</COLLECTION>
-                name_elements = root.findall('.//COLLECTION/COMPANY/NAME')
-                if not name_elements:
-                    # Fallback check for simpler structure just in case
-                    name_elements = root.findall('.//NAME')
-
-                for name_element in name_elements:
-                    if name_element.text:
-                        companies.append(name_element.text.strip())
-
-                companies = sorted(list(set(companies)))
-                logging.info(f"Successfully listed companies: {companies}")
-                return companies
-
-            except ET.ParseError as e:
-                logging.error(f"Error parsing Tally XML response for list companies: {e}")
-                logging.error(f"Received Content Snippet:\n{response_xml[:500]}...")
-                return None
-            except Exception as e:
-                logging.exception("Unexpected error during XML processing for list companies.") # Log full traceback
-                return None
+            # Expecting <COLLECTION><COMPANY><NAME>...</NAME></COMPANY>...</COLLECTION>
+            name_elements = root.findall('.//COLLECTION/COMPANY/NAME')
+            if not name_elements:
+                # Fallback check for simpler structure just in case
+                name_elements = root.findall('.//NAME')
 
-        except requests.exceptions.ConnectionError:
-            logging.error(f"Connection refused. Is Tally running/configured on {tally_url}?")
-            return None
-        except requests.exceptions.Timeout:
-            logging.error(f"Request timed out connecting to Tally on {tally_url}.")
-            return None
-        except requests.exceptions.RequestException as e:
-            error_detail = ""
-            if e.response is not None:
-                error_detail = f" HTTP Status: {e.response.status_code}. Response: {e.response.text[:200]}..."
-            logging.error(f"Request exception listing companies: {e}{error_detail}")
+            for name_element in name_elements:
+                if name_element.text:
+                    companies.append(name_element.text.strip())
+
+            companies = sorted(list(set(companies)))
+            logging.info(f"Successfully listed companies: {companies}")
+            return companies
+
+        except ET.ParseError as e:
+            logging.error(f"Error parsing Tally XML response for list companies: {e}")
+            logging.error(f"Received Content Snippet:\n{snippet[:500]}...")
             return None
         except Exception as e:
-            logging.exception("Unexpected error occurred while listing companies.") # Log full traceback
+            logging.exception("Unexpected error during XML processing for list companies.") # Log full traceback
             return None
+
     def select_tally_company(self, company_name):
         """
         Selects a specific company in Tally using the requests library.
@@ -1949,7 +3070,6 @@ class TallyClient:
 
         Args:
             company_name (str): The exact name of the company to select.
-            tally_url (str): The URL of the Tally XML RPC server.
 
         Returns:
             bool: True if the company was selected successfully (or assumed based on response), False otherwise.
@@ -1957,7 +3077,44 @@ class TallyClient:
         tally_url = self.endpoint
         logging.info(f"Attempting to select company: '{company_name}'")
         headers = {'Content-Type': 'application/xml'}
-        request_xml = f"""
+
+        if self.cache is not None:
+            # Requests without an explicit company will now be answered for a different one
+            self.cache.after_request("select_tally_company")
+
+        try:
+            response = self._post(self._select_company_request(company_name), method="select_tally_company", headers=headers)
+            return self._parse_select_company_response(
+                company_name, decode_body(response.content, response.headers.get('Content-Type')))
+
+        except requests.exceptions.ConnectionError:
+            logging.error(f"Connection refused selecting '{company_name}'. Is Tally running/configured on {tally_url}?")
+            return False
+        except requests.exceptions.Timeout:
+            logging.error(f"Request timed out selecting '{company_name}' on {tally_url}.")
+            return False
+        except requests.exceptions.RequestException as e:
+            error_detail = ""
+            if e.response is not None:
+                error_detail = f" HTTP Status: {e.response.status_code}. Response: {e.response.text[:200]}..."
+            logging.error(f"Request exception selecting company '{company_name}': {e}{error_detail}")
+            return False
+        except Exception as e:
+            logging.exception(f"Unexpected error occurred while selecting company '{company_name}'.") # Log full traceback
+            return False
+
+    @staticmethod
+    def _select_company_request(company_name):
+        """
+        Build the Trial Balance export used by select_tally_company
+
+        Args:
+            company_name (str): The exact name of the company to select.
+
+        Returns:
+            bytes: XML request body
+        """
+        return envelope("""
         <ENVELOPE>
             <HEADER>
                 <VERSION>1</VERSION>
@@ -1974,50 +3131,92 @@ class TallyClient:
                 </DESC>
             </BODY>
         </ENVELOPE>
+        """).render(company_name=company_name)
+
+    @staticmethod
+    def _parse_select_company_response(company_name, response_xml):
+        """
+        Interpret Tally's response to a select company request
+
+        Args:
+            company_name (str): The company that was selected.
+            response_xml (str): XML response from Tally
+
+        Returns:
+            bool: True if the company was selected, False otherwise.
         """
+        logging.debug(f"Select Company '{company_name}' Raw Response:\n{response_xml}") # Log raw response
+
+        # Check 1: Empty Envelope means success for this specific method
+        if response_xml.strip() == "<ENVELOPE></ENVELOPE>":
+            logging.info(f"Received empty ENVELOPE selecting '{company_name}'. Assuming success.")
+            return True
+
+        # Check 2: Any other response format suggests failure
+        logging.warning(f"Did not receive expected empty ENVELOPE for select company '{company_name}'. Response: {response_xml[:200]}...")
 
+        # Optional: Try parsing to log specific errors if present
         try:
-            response = requests.post(tally_url, data=request_xml.encode('utf-8'), headers=headers, timeout=25)
-            response_xml = response.text
-            logging.debug(f"Select Company '{company_name}' Raw Response:\n{response_xml}") # Log raw response
+            root = ET.fromstring(sanitize_xml(response_xml))
+            status = root.findtext('.//HEADER/STATUS')
+            errors = root.findall('.//BODY/DATA/LINEERROR')
+            error_text = ", ".join([e.text.strip() for e in errors if e.text])
+            logging.warning(f"Select company '{company_name}' failed. Status: {status}. Errors: {error_text}")
+        except ET.ParseError:
+            logging.warning(f"Select company '{company_name}' failed. Response was not valid XML.")
+        except Exception as parse_e:
+            logging.warning(f"Select company '{company_name}' failed. Error processing unexpected response: {parse_e}")
 
-            # Check 1: Empty Envelope means success for this specific method
-            if response_xml.strip() == "<ENVELOPE></ENVELOPE>":
-                logging.info(f"Received empty ENVELOPE selecting '{company_name}'. Assuming success.")
-                return True
+        return False # Explicitly return False if empty envelope wasn't received
 
-            # Check 2: Any other response format suggests failure
-            logging.warning(f"Did not receive expected empty ENVELOPE for select company '{company_name}'. Response: {response_xml[:200]}...")
 
-            # Optional: Try parsing to log specific errors if present
-            try:
-                root = ET.fromstring(response_xml)
-                status = root.findtext('.//HEADER/STATUS')
-                errors = root.findall('.//BODY/DATA/LINEERROR')
-                error_text = ", ".join([e.text.strip() for e in errors if e.text])
-                logging.warning(f"Select company '{company_name}' failed. Status: {status}. Errors: {error_text}")
-            except ET.ParseError:
-                logging.warning(f"Select company '{company_name}' failed. Response was not valid XML.")
-            except Exception as parse_e:
-                logging.warning(f"Select company '{company_name}' failed. Error processing unexpected response: {parse_e}")
-
-            return False # Explicitly return False if empty envelope wasn't received
+class _CapturedRequest:
+    """
+    Envelope recorded by _RequestRecorder in place of sending it
+    """
+    __slots__ = ("xml_request", "method", "is_import")
 
-        except requests.exceptions.ConnectionError:
-            logging.error(f"Connection refused selecting '{company_name}'. Is Tally running/configured on {tally_url}?")
-            return False
-        except requests.exceptions.Timeout:
-            logging.error(f"Request timed out selecting '{company_name}' on {tally_url}.")
-            return False
-        except requests.exceptions.RequestException as e:
-            error_detail = ""
-            if e.response is not None:
-                error_detail = f" HTTP Status: {e.response.status_code}. Response: {e.response.text[:200]}..."
-            logging.error(f"Request exception selecting company '{company_name}': {e}{error_detail}")
-            return False
-        except Exception as e:
-            logging.exception(f"Unexpected error occurred while selecting company '{company_name}'.") # Log full traceback
-            return False
+    def __init__(self, xml_request, method=None, is_import=False):
+        self.xml_request = xml_request
+        self.method = method
+        self.is_import = is_import  # The response is parsed into an ImportResult
+
+
+class _RequestRecorder(TallyClient):
+    """
+    TallyClient whose transport hands the envelope back instead of sending it.
+
+    Lets other transports (e.g. AsyncTallyClient) reuse the envelope-building code of
+    every TallyClient method without duplicating the XML templates.
+    """
+
+    def __init__(self):
+        # No session: nothing is ever sent
+        pass
+
+    def _send_request(self, xml_request, method=None):
+        return _CapturedRequest(xml_request, method)
+
+    def _send_import(self, xml_request, method=None):
+        return _CapturedRequest(xml_request, method, is_import=True)
+
+
+_RECORDER = _RequestRecorder()
+
+
+def _build_request(method_name, *args, **kwargs):
+    """
+    Build the request a TallyClient method would send, without sending it
+
+    Args:
+        method_name (str): Name of a TallyClient method that goes through _send_request
+        *args, **kwargs: Arguments for that method
+
+    Returns:
+        _CapturedRequest: The envelope and method name, or the method's own return value
+                          when it returns early (e.g. "Error: No update parameters specified")
+    """
+    return getattr(_RECORDER, method_name)(*args, **kwargs)
 
 # Example usage:
 if __name__ == "__main__":
@@ -0,0 +1,349 @@
+import codecs
+import itertools
+import re
+import xml.etree.ElementTree as ET
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Encodings expat detects and decodes on its own when given raw bytes
+_EXPAT_NATIVE = {"utf-8", "utf-8-sig", "utf-16", "utf-16-le", "utf-16-be", "ascii"}
+# ...of which these keep control characters as single bytes, so bytes can be sanitized directly
+_ASCII_NATIVE = {"utf-8", "utf-8-sig", "ascii"}
+_XML_DECLARATION_ENCODING = re.compile(rb'^<\?xml[^>]*?encoding=["\']([A-Za-z0-9._-]+)["\']')
+
+
+def detect_encoding(head, content_type=None):
+    """
+    Work out the encoding of a Tally response once, from its first bytes and Content-Type
+
+    Checked in order: byte order mark, UTF-16 byte pattern, charset in the Content-Type
+    header, XML declaration, then UTF-8 (Tally's default).
+
+    Args:
+        head (bytes): First bytes of the response (a few hundred are enough)
+        content_type (str, optional): Content-Type header of the response
+
+    Returns:
+        str: Python codec name. BOM-carrying encodings are returned as "utf-8-sig"/"utf-16"
+             so decoding strips the BOM.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if head[:2] == b"<\x00":
+        return "utf-16-le"
+    if head[:2] == b"\x00<":
+        return "utf-16-be"
+    if content_type:
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return _normalize_encoding(value.strip('"\''))
+    match = _XML_DECLARATION_ENCODING.match(head.lstrip())
+    if match:
+        return _normalize_encoding(match.group(1).decode("ascii"))
+    return "utf-8"
+
+
+def _normalize_encoding(name):
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return "utf-8"
+
+
+def decode_body(content, content_type=None):
+    """
+    Decode a response body to str using detect_encoding
+
+    Args:
+        content (bytes): Response body
+        content_type (str, optional): Content-Type header of the response
+
+    Returns:
+        str: Decoded text (undecodable bytes are replaced)
+    """
+    return content.decode(detect_encoding(content[:512], content_type), errors="replace")
+
+
+def parse_xml_bytes(content, content_type=None, sanitize=True):
+    """
+    Parse a response body straight from bytes, without decoding it to str first
+
+    Args:
+        content (bytes): Response body
+        content_type (str, optional): Content-Type header of the response
+        sanitize (bool, optional): Strip characters XML forbids before parsing. Default: True
+
+    Returns:
+        xml.etree.ElementTree.Element: Root element
+    """
+    encoding = detect_encoding(content[:512], content_type)
+    if encoding in _ASCII_NATIVE or (encoding in _EXPAT_NATIVE and not sanitize):
+        return ET.fromstring(sanitize_xml(content) if sanitize else content)
+    # UTF-16 and encodings expat does not know are parsed from str
+    text = content.decode(encoding, errors="replace")
+    return ET.fromstring(sanitize_xml(text) if sanitize else text)
+
+
+# Characters XML 1.0 forbids: C0 controls other than tab, LF and CR
+_INVALID_CONTROL_BYTES = bytes(c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D))
+# Character references to those, and to U+FFFE/U+FFFF and surrogates, e.g. Tally's "&#4;"
+_INVALID_CHAR_REF = (
+    r"&#(?:0*(?:[0-8]|1[124-9]|2[0-9]|3[01]|6553[45]"
+    r"|5529[6-9]|55[3-9][0-9]{2}|56[0-9]{3}|57[0-2][0-9]{2}|573[0-3][0-9]|5734[0-3])"
+    r"|[xX]0*(?:[0-8bBcCeEfF]|1[0-9a-fA-F]|[fF]{3}[eEfF]|[dD][89a-fA-F][0-9a-fA-F]{2}));"
+)
+_INVALID_CHAR_REF_BYTES = re.compile(_INVALID_CHAR_REF.encode("ascii"))
+_INVALID_CHAR_REF_STR = re.compile(_INVALID_CHAR_REF)
+# U+FFFE, U+FFFF and (ill-formed) surrogates as UTF-8 bytes, which a one-byte translate cannot reach
+_INVALID_UTF8 = re.compile(rb"\xef\xbf[\xbe\xbf]|\xed[\xa0-\xbf][\x80-\xbf]")
+# Characters (not bytes) XML forbids besides the C0 controls: surrogates, U+FFFE and U+FFFF
+_INVALID_CHARACTERS = list(range(0xD800, 0xE000)) + [0xFFFE, 0xFFFF]
+# An "&" at the end of a chunk that may be the start of a character reference, or the
+# first bytes of one of the UTF-8 sequences above
+_PARTIAL_CHAR_REF_BYTES = re.compile(rb"(?:&(?:#(?:[xX][0-9a-fA-F]*|[0-9]*))?|\xef\xbf?|\xed[\xa0-\xbf]?)$")
+_PARTIAL_CHAR_REF_STR = re.compile(r"&(?:#(?:[xX][0-9a-fA-F]*|[0-9]*))?$")
+# Longest partial reference held back between chunks
+_MAX_PARTIAL_CHAR_REF = 32
+
+
+class XmlSanitizer:
+    """
+    Streaming filter that removes (or remaps) characters XML 1.0 forbids.
+
+    Tally emits raw control characters and references such as "&#4;" that make every
+    XML parser fail. feed() takes chunks of bytes (UTF-8 or ASCII; U+FFFE, U+FFFF and
+    surrogates are removed as UTF-8 sequences) or str and returns the cleaned chunk. A character reference split across two
+    chunks is held back until the next feed(). The work is one bytes.translate() pass;
+    the reference regex only runs on chunks containing "&#", so clean input costs little
+    more than a copy.
+    """
+
+    def __init__(self, replacement=""):
+        """
+        Initialize XmlSanitizer
+
+        Args:
+            replacement (str, optional): Single character to put in place of each invalid
+                                         character, or "" to remove them. Default: ""
+        """
+        if len(replacement) > 1:
+            raise ValueError("replacement must be a single character or empty")
+        self.replacement = replacement
+        if replacement:
+            self._byte_table = bytes.maketrans(
+                _INVALID_CONTROL_BYTES, replacement.encode("ascii") * len(_INVALID_CONTROL_BYTES))
+            self._byte_delete = b""
+        else:
+            self._byte_table = None
+            self._byte_delete = _INVALID_CONTROL_BYTES
+        self._str_table = dict.fromkeys(list(_INVALID_CONTROL_BYTES) + _INVALID_CHARACTERS, replacement or None)
+        self._pending = None
+        self._empty = b""  # empty value of the stream's type, for flush()
+
+    def clean(self, data):
+        """
+        Sanitize a complete document or chunk with no reference split at its end
+
+        Args:
+            data (bytes or str): XML data
+
+        Returns:
+            bytes or str: Sanitized data, same type as the input
+        """
+        if isinstance(data, str):
+            data = data.translate(self._str_table)
+            # A one-character scan is much faster than searching for "&#" directly
+            if "#" in data and "&#" in data:
+                data = _INVALID_CHAR_REF_STR.sub(self.replacement, data)
+            return data
+        data = data.translate(self._byte_table, self._byte_delete)
+        if b"\xef\xbf" in data or b"\xed" in data:
+            data = _INVALID_UTF8.sub(self.replacement.encode("ascii"), data)
+        if b"#" in data and b"&#" in data:
+            data = _INVALID_CHAR_REF_BYTES.sub(self.replacement.encode("ascii"), data)
+        return data
+
+    def feed(self, chunk):
+        """
+        Sanitize the next chunk of a stream
+
+        Args:
+            chunk (bytes or str): Next chunk; all chunks of a stream must have the same type
+
+        Returns:
+            bytes or str: Sanitized data that is safe to pass on to the parser
+        """
+        self._empty = chunk[:0]
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = None
+        partial = _PARTIAL_CHAR_REF_STR if isinstance(chunk, str) else _PARTIAL_CHAR_REF_BYTES
+        match = partial.search(chunk, max(0, len(chunk) - _MAX_PARTIAL_CHAR_REF))
+        if match:
+            self._pending = chunk[match.start():]
+            chunk = chunk[:match.start()]
+        return self.clean(chunk)
+
+    def flush(self):
+        """
+        Sanitize and return whatever feed() held back at the end of the stream
+
+        Returns:
+            bytes or str: Remaining data (empty if nothing was held back)
+        """
+        pending, self._pending = self._pending, None
+        return self.clean(pending) if pending else self._empty
+
+
+def sanitize_xml(data, replacement=""):
+    """
+    Remove (or remap) characters XML 1.0 forbids from a whole document
+
+    Args:
+        data (bytes or str): XML data; bytes must be in an ASCII-compatible encoding such as UTF-8
+        replacement (str, optional): Single character to put in place of each invalid character. Default: ""
+
+    Returns:
+        bytes or str: Sanitized data, same type as the input
+    """
+    return XmlSanitizer(replacement).clean(data)
+
+
+def iter_sanitized(chunks, replacement=""):
+    """
+    Sanitize a stream of chunks
+
+    Args:
+        chunks (iterable): Iterable of bytes (ASCII-compatible encoding) or str chunks
+        replacement (str, optional): Single character to put in place of each invalid character. Default: ""
+
+    Yields:
+        bytes or str: Sanitized chunks
+    """
+    sanitizer = XmlSanitizer(replacement)
+    for chunk in chunks:
+        cleaned = sanitizer.feed(chunk)
+        if cleaned:
+            yield cleaned
+    tail = sanitizer.flush()
+    if tail:
+        yield tail
+
+
+def _to_expat_chunks(chunks, headers=None, sanitize=True):
+    """
+    Prepare response chunks for an XMLPullParser. The encoding is detected once, on the
+    first chunk. ASCII-compatible bodies expat can decode are passed on as bytes; UTF-16
+    (when sanitizing) and encodings expat does not know are decoded incrementally and
+    passed on as str.
+    """
+    chunks = iter(chunks)
+    for first in chunks:
+        if first:
+            break
+    else:
+        return
+    chunks = itertools.chain((first,), chunks)
+    content_type = headers.get("Content-Type") if headers is not None else None
+    encoding = detect_encoding(first[:512], content_type)
+    # expat honours an encoding named in the XML declaration on its own
+    declared = encoding not in _EXPAT_NATIVE and _XML_DECLARATION_ENCODING.match(first.lstrip())
+    if encoding in _ASCII_NATIVE or declared or (encoding in _EXPAT_NATIVE and not sanitize):
+        yield from iter_sanitized(chunks) if sanitize else chunks
+        return
+    text_chunks = _iter_decoded(chunks, encoding)
+    yield from iter_sanitized(text_chunks) if sanitize else text_chunks
+
+
+def _iter_decoded(chunks, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+class TallyErrorResponse(ValueError):
+    """
+    Tally answered with an error envelope (HEADER/STATUS other than 1, or LINEERROR lines)
+    instead of the requested data
+    """
+
+    def __init__(self, status=None, line_errors=()):
+        self.status = status
+        self.line_errors = list(line_errors)
+        detail = "; ".join(self.line_errors) or f"status {status}"
+        super().__init__(f"Tally returned an error: {detail}")
+
+
+def iter_elements(chunks, tag, headers=None, sanitize=True, check_errors=False):
+    """
+    Incrementally parse an XML byte stream and yield every element with the given tag
+
+    Each yielded element is complete (all its children parsed). Once the caller asks for
+    the next one it is cleared and detached from the tree, and so is everything parsed
+    outside a matching element, so memory stays bounded by the size of one record no
+    matter how long the stream is.
+
+    Args:
+        chunks (iterable): Iterable of bytes chunks, e.g. response.iter_content()
+        tag (str): Tag of the records to yield, e.g. "VOUCHER"
+        headers (mapping, optional): Response headers, read when the first chunk arrives
+                                     to pick up a Content-Type charset
+        sanitize (bool, optional): Strip characters XML forbids before parsing. Default: True
+        check_errors (bool, optional): Raise on an error envelope instead of yielding nothing. Default: False
+
+    Yields:
+        xml.etree.ElementTree.Element: One record at a time. Copy out what you need before
+                                       advancing; the element is cleared afterwards.
+
+    Raises:
+        TallyErrorResponse: With check_errors, at the end of a stream that held a LINEERROR outside
+                            a record or a HEADER/STATUS other than 1
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    depth_in_match = 0
+    status = None
+    line_errors = []
+
+    def drain():
+        nonlocal depth_in_match, status
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                if depth_in_match or elem.tag == tag:
+                    depth_in_match += 1
+                continue
+
+            stack.pop()
+            if depth_in_match:
+                depth_in_match -= 1
+                if depth_in_match:
+                    # Still inside a record; its children are kept until the record is done
+                    continue
+                yield elem
+            elif check_errors:
+                if elem.tag == "LINEERROR":
+                    line_errors.append(" ".join((elem.text or "").split()))
+                elif elem.tag == "STATUS" and stack and stack[-1].tag == "HEADER":
+                    status = (elem.text or "").strip()
+            # Completed elements outside a record are no longer needed either. The parser
+            # builds ahead of the events we read, so finished children are detached from
+            # the front of their parent.
+            elem.clear()
+            if stack and len(stack[-1]) and stack[-1][0] is elem:
+                del stack[-1][0]
+
+    for chunk in _to_expat_chunks(chunks, headers, sanitize):
+        if chunk:
+            parser.feed(chunk)
+            yield from drain()
+    parser.close()
+    yield from drain()
+    if line_errors or (status is not None and status != "1"):
+        raise TallyErrorResponse(status, line_errors)